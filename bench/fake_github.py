@@ -0,0 +1,618 @@
+"""
+Servidor local que imita las partes de la API de GitHub que usa github_lib.
+
+Implementa los endpoints de repositorios, Contents, Git Data (blobs, trees,
+commits, refs), descargas raw y tarballs, con latencia, ancho de banda y
+límites de peticiones configurables. Solo para pruebas y benchmarks en CPython.
+
+Se puede usar en el mismo proceso (FakeGitHub(...).start()) o en un proceso
+aparte con serve(), para que la memoria del servidor no se mezcle con la del
+cliente medido (ver run_bench.py).
+"""
+import base64
+import gzip
+import hashlib
+import io
+import json
+import tarfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit, parse_qs, unquote
+
+
+def git_blob_sha(data):
+    h = hashlib.sha1(b"blob %d\0" % len(data))
+    h.update(data)
+    return h.hexdigest()
+
+
+class Store:
+    """Estado en memoria de todos los repositorios falsos."""
+
+    def __init__(self, user="bench"):
+        self.user = user
+        self.lock = threading.RLock()
+        self.repos = {}
+        self.blobs = {}
+        self.trees = {}
+        self.commits = {}
+        self.counter = 0
+
+    def _sha(self, *parts):
+        self.counter += 1
+        h = hashlib.sha1(str(self.counter).encode())
+        for p in parts:
+            h.update(repr(p).encode())
+        return h.hexdigest()
+
+    def put_tree(self, entries):
+        sha = hashlib.sha1(json.dumps(sorted(entries.items())).encode()).hexdigest()
+        self.trees[sha] = dict(entries)
+        return sha
+
+    def create_repo(self, owner, name, private=False, description=None, auto_init=True):
+        # Sin auto_init el repositorio queda vacío, sin ramas, como en GitHub
+        branches = {}
+        if auto_init:
+            data = ("# %s\n" % name).encode()
+            sha = git_blob_sha(data)
+            self.blobs[sha] = data
+            tree_sha = self.put_tree({"README.md": sha})
+            commit = self._sha("commit", tree_sha)
+            self.commits[commit] = {"tree": tree_sha, "parents": [], "message": "init"}
+            branches["main"] = commit
+        repo = {
+            "name": name,
+            "full_name": "%s/%s" % (owner, name),
+            "private": private,
+            "description": description,
+            "owner": {"login": owner},
+            "default_branch": "main",
+            "language": None,
+            "branches": branches,
+        }
+        self.repos[(owner, name)] = repo
+        return repo
+
+    def head_tree(self, repo, ref):
+        branches = repo["branches"]
+        if ref in branches:
+            commit = branches[ref]
+        elif ref in self.commits:
+            commit = ref
+        elif ref in self.trees:
+            return ref, self.trees[ref]
+        else:
+            return None, None
+        tree_sha = self.commits[commit]["tree"]
+        return tree_sha, self.trees[tree_sha]
+
+    def commit_files(self, repo, branch, changes, message):
+        """changes: path -> bytes o None (borrar)."""
+        _, tree = self.head_tree(repo, branch)
+        tree = dict(tree or {})
+        for path, data in changes.items():
+            if data is None:
+                tree.pop(path, None)
+            else:
+                sha = git_blob_sha(data)
+                self.blobs[sha] = data
+                tree[path] = sha
+        tree_sha = self.put_tree(tree)
+        parent = repo["branches"].get(branch)
+        commit = self._sha("commit", tree_sha, parent)
+        self.commits[commit] = {"tree": tree_sha, "parents": [parent] if parent else [],
+                                "message": message}
+        repo["branches"][branch] = commit
+        return commit
+
+
+def repo_json(base, repo):
+    out = {k: v for k, v in repo.items() if k != "branches"}
+    out["html_url"] = "https://github.com/%s" % repo["full_name"]
+    out["url"] = "%s/repos/%s" % (base, repo["full_name"])
+    # Relleno para parecerse al tamaño real de un objeto repo (~100 campos)
+    for i in range(90):
+        out["extra_field_%02d" % i] = "https://api.github.com/repos/%s/x%d" % (repo["full_name"], i)
+    return out
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server_version = "FakeGitHub/1.0"
+
+    def log_message(self, *a):
+        pass
+
+    # --- utilidades -------------------------------------------------------
+    @property
+    def cfg(self):
+        return self.server.cfg
+
+    @property
+    def store(self):
+        return self.server.store
+
+    def base(self):
+        return "http://%s:%d" % self.server.server_address[:2]
+
+    def _body(self):
+        n = int(self.headers.get("Content-Length") or 0)
+        data = self.rfile.read(n) if n else b""
+        self.server.stats["bytes_received"] += n
+        return data
+
+    def _json_body(self):
+        data = self._body()
+        return json.loads(data) if data else {}
+
+    def send(self, status, body=b"", ctype="application/json", headers=None, etag=True):
+        if not isinstance(body, (bytes, bytearray)):
+            body = json.dumps(body).encode()
+        extra = dict(headers or {})
+        if etag and status == 200 and self.command == "GET":
+            tag = '"%s"' % hashlib.sha1(body).hexdigest()
+            extra["ETag"] = tag
+            if self.headers.get("If-None-Match") == tag:
+                status, body = 304, b""
+        if (status == 200 and body and "gzip" in (self.headers.get("Accept-Encoding") or "")
+                and ctype.startswith("application/json")):
+            body = gzip.compress(body)
+            extra["Content-Encoding"] = "gzip"
+        self._rate_headers(extra, counted=status != 304)
+        latency = self.cfg.get("latency", 0)
+        if latency:
+            time.sleep(latency)
+        self.send_response(status)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        for k, v in extra.items():
+            self.send_header(k, v)
+        self.end_headers()
+        self._write(body)
+        self.server.stats["bytes_sent"] += len(body)
+
+    def _write(self, body):
+        bw = self.cfg.get("bandwidth")
+        if not bw:
+            self.wfile.write(body)
+            return
+        step = 4096
+        for i in range(0, len(body), step):
+            part = body[i:i + step]
+            self.wfile.write(part)
+            time.sleep(len(part) / float(bw))
+
+    def _rate_headers(self, extra, counted=True):
+        rl = self.server.rate
+        with self.server.store.lock:
+            now = time.time()
+            if now >= rl["reset"]:
+                rl["reset"] = now + rl["window"]
+                rl["remaining"] = rl["limit"]
+            if counted and rl["remaining"] > 0:
+                rl["remaining"] -= 1
+            extra["X-RateLimit-Limit"] = str(rl["limit"])
+            extra["X-RateLimit-Remaining"] = str(rl["remaining"])
+            extra["X-RateLimit-Reset"] = str(int(rl["reset"]))
+
+    def _limited(self):
+        rl = self.server.rate
+        with self.server.store.lock:
+            if time.time() >= rl["reset"]:
+                return False
+            return rl["remaining"] <= 0
+
+    def not_found(self):
+        self.send(404, {"message": "Not Found"})
+
+    # --- despacho ---------------------------------------------------------
+    def handle_one(self):
+        self.server.stats["requests"] += 1
+        self.server.stats["by_method"][self.command] = self.server.stats["by_method"].get(self.command, 0) + 1
+        if self.headers.get("Connection", "").lower() != "close":
+            self.close_connection = False
+        u = urlsplit(self.path)
+        self.query = parse_qs(u.query)
+        parts = [unquote(p) for p in u.path.split("/") if p]
+        if self._limited() and not parts[:1] == ["_raw"]:
+            self._body()  # descartar el cuerpo para poder reutilizar la conexión
+            extra = {"Retry-After": str(max(1, int(self.server.rate["reset"] - time.time()) + 1))}
+            self._rate_headers(extra, counted=False)
+            self.send_response(403)
+            payload = json.dumps({"message": "API rate limit exceeded"}).encode()
+            self.send_header("Content-Length", str(len(payload)))
+            for k, v in extra.items():
+                self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(payload)
+            return
+        try:
+            self.route(parts)
+        except Exception as e:  # pragma: no cover - depuración
+            import traceback
+            traceback.print_exc()
+            self.send(500, {"message": str(e)})
+
+    do_GET = do_POST = do_PUT = do_PATCH = do_DELETE = handle_one
+
+    def route(self, p):
+        m = self.command
+        s = self.store
+        if p == ["user", "repos"]:
+            if m == "POST":
+                d = self._json_body()
+                with s.lock:
+                    if (s.user, d["name"]) in s.repos:
+                        return self.send(422, {"message": "name already exists on this account"})
+                    repo = s.create_repo(s.user, d["name"], d.get("private", False),
+                                         d.get("description"), d.get("auto_init", False))
+                return self.send(201, repo_json(self.base(), repo))
+            return self.list_repos(s.user)
+        if len(p) == 3 and p[0] == "users" and p[2] == "repos":
+            return self.list_repos(p[1])
+        if p[:1] == ["_raw"] and len(p) >= 5:
+            return self.raw(p[1], p[2], p[3], "/".join(p[4:]))
+        if p[:1] == ["_codeload"] and len(p) == 4:
+            return self.codeload(p[1], p[2], p[3])
+        if len(p) >= 3 and p[0] == "repos":
+            repo = s.repos.get((p[1], p[2]))
+            if repo is None:
+                self._body()
+                return self.not_found()
+            rest = p[3:]
+            if not rest:
+                if m == "GET":
+                    return self.send(200, repo_json(self.base(), repo))
+                if m == "PATCH":
+                    d = self._json_body()
+                    with s.lock:
+                        if "name" in d:
+                            del s.repos[(p[1], p[2])]
+                            repo["name"] = d["name"]
+                            repo["full_name"] = "%s/%s" % (p[1], d["name"])
+                            s.repos[(p[1], d["name"])] = repo
+                        for k in ("description", "private"):
+                            if k in d:
+                                repo[k] = d[k]
+                    return self.send(200, repo_json(self.base(), repo))
+                if m == "DELETE":
+                    self._body()
+                    with s.lock:
+                        del s.repos[(p[1], p[2])]
+                    return self.send(204)
+            if rest[0] == "contents":
+                return self.contents(repo, "/".join(rest[1:]))
+            if rest[0] == "branches" and len(rest) == 2:
+                commit = repo["branches"].get(rest[1])
+                if not commit:
+                    return self.not_found()
+                c = s.commits[commit]
+                return self.send(200, {"name": rest[1], "commit": {
+                    "sha": commit, "commit": {"tree": {"sha": c["tree"]}, "message": c["message"]}}})
+            if rest[0] == "tarball" and len(rest) <= 2:
+                ref = rest[1] if len(rest) == 2 else repo["default_branch"]
+                self.send(302, b"", headers={
+                    "Location": "%s/_codeload/%s/%s/%s" % (self.base(), p[1], p[2], ref)}, etag=False)
+                return
+            if rest[0] == "git":
+                return self.git(repo, rest[1:])
+        self._body()
+        return self.not_found()
+
+    def list_repos(self, owner):
+        s = self.store
+        per_page = int(self.query.get("per_page", ["30"])[0])
+        page = int(self.query.get("page", ["1"])[0])
+        with s.lock:
+            repos = sorted((r for (o, _), r in s.repos.items() if o == owner), key=lambda r: r["name"])
+        chunk = repos[(page - 1) * per_page: page * per_page]
+        headers = {}
+        if page * per_page < len(repos):
+            path = urlsplit(self.path).path
+            headers["Link"] = '<%s%s?per_page=%d&page=%d>; rel="next"' % (
+                self.base(), path, per_page, page + 1)
+        return self.send(200, [repo_json(self.base(), r) for r in chunk], headers=headers)
+
+    def contents(self, repo, path):
+        s = self.store
+        m = self.command
+        branch = self.query.get("ref", [repo["default_branch"]])[0]
+        if m == "PUT":
+            d = self._json_body()
+            branch = d.get("branch", branch)
+            with s.lock:
+                _, tree = s.head_tree(repo, branch)
+                if tree is None:
+                    # La API de contenidos solo crea la rama si el repositorio está vacío
+                    if repo["branches"]:
+                        return self.not_found()
+                    tree = {}
+                old = tree.get(path)
+                if old and d.get("sha") != old:
+                    return self.send(409 if d.get("sha") else 422,
+                                     {"message": "sha wasn't supplied" if not d.get("sha") else "conflict"})
+                data = base64.b64decode(d["content"])
+                commit = s.commit_files(repo, branch, {path: data}, d["message"])
+            return self.send(201 if not old else 200, {
+                "content": {"path": path, "sha": git_blob_sha(data), "name": path.split("/")[-1]},
+                "commit": {"sha": commit, "tree": {"sha": s.commits[commit]["tree"]}}})
+        if m == "DELETE":
+            d = self._json_body()
+            with s.lock:
+                _, tree = s.head_tree(repo, d.get("branch", branch))
+                if path not in tree:
+                    return self.not_found()
+                commit = s.commit_files(repo, d.get("branch", branch), {path: None}, d["message"])
+            return self.send(200, {"commit": {"sha": commit}})
+        with s.lock:
+            _, tree = s.head_tree(repo, branch)
+        if tree is None:
+            return self.not_found()
+        if path in tree:
+            data = s.blobs[tree[path]]
+            accept = self.headers.get("Accept", "")
+            if "raw" in accept:
+                return self.send_raw(data)
+            info = {
+                "type": "file", "name": path.split("/")[-1], "path": path,
+                "sha": tree[path], "size": len(data),
+                "download_url": "%s/_raw/%s/%s/%s" % (self.base(), repo["owner"]["login"], repo["name"],
+                                                       branch + "/" + path),
+            }
+            if len(data) <= self.cfg.get("contents_limit", 1024 * 1024):
+                info["encoding"] = "base64"
+                info["content"] = base64.encodebytes(data).decode()
+            else:
+                info["encoding"] = "none"
+                info["content"] = ""
+            return self.send(200, info)
+        prefix = path.rstrip("/") + "/" if path else ""
+        names = {}
+        for p in tree:
+            if p.startswith(prefix):
+                head = p[len(prefix):].split("/")[0]
+                names[head] = "dir" if "/" in p[len(prefix):] else "file"
+        if not names:
+            return self.not_found()
+        return self.send(200, [{"name": n, "path": prefix + n, "type": t} for n, t in sorted(names.items())])
+
+    def send_raw(self, data):
+        rng = self.headers.get("Range")
+        tag = '"%s"' % hashlib.sha1(data).hexdigest()
+        if_range = self.headers.get("If-Range")
+        if rng and rng.startswith("bytes=") and (if_range is None or if_range == tag):
+            start = int(rng[6:].split("-")[0])
+            if start >= len(data):
+                return self.send(416, b"", ctype="application/octet-stream", etag=False,
+                                 headers={"Content-Range": "bytes */%d" % len(data)})
+            return self.send(206, data[start:], ctype="application/octet-stream", etag=False,
+                             headers={"Content-Range": "bytes %d-%d/%d" % (start, len(data) - 1, len(data)),
+                                      "ETag": tag})
+        return self.send(200, data, ctype="application/octet-stream")
+
+    def raw(self, owner, name, branch, path):
+        s = self.store
+        repo = s.repos.get((owner, name))
+        if repo is None:
+            return self.not_found()
+        with s.lock:
+            _, tree = s.head_tree(repo, branch)
+        if not tree or path not in tree:
+            return self.not_found()
+        return self.send_raw(s.blobs[tree[path]])
+
+    def codeload(self, owner, name, ref):
+        s = self.store
+        repo = s.repos.get((owner, name))
+        ref = ref[:-7] if ref.endswith(".tar.gz") else ref
+        with s.lock:
+            _, tree = s.head_tree(repo, ref)
+            commit = repo["branches"].get(ref, ref)
+        if tree is None:
+            return self.not_found()
+        buf = io.BytesIO()
+        top = "%s-%s-%s" % (owner, name, commit[:7])
+        # Como GitHub: cabecera pax global con el SHA del commit
+        with tarfile.open(fileobj=buf, mode="w:gz", format=tarfile.PAX_FORMAT,
+                          pax_headers={"comment": commit}) as tar:
+            dirs = set()
+            for path in sorted(tree):
+                parts = path.split("/")
+                for i in range(1, len(parts)):
+                    d = "/".join(parts[:i])
+                    if d not in dirs:
+                        dirs.add(d)
+                        ti = tarfile.TarInfo(top + "/" + d)
+                        ti.type = tarfile.DIRTYPE
+                        tar.addfile(ti)
+                data = s.blobs[tree[path]]
+                ti = tarfile.TarInfo(top + "/" + path)
+                ti.size = len(data)
+                tar.addfile(ti, io.BytesIO(data))
+        return self.send(200, buf.getvalue(), ctype="application/x-gzip", etag=False)
+
+    def git(self, repo, p):
+        s = self.store
+        m = self.command
+        if m == "POST" and not repo["branches"] and p[:1] in (["blobs"], ["trees"], ["commits"]):
+            self._body()
+            return self.send(409, {"message": "Git Repository is empty."})
+        if p == ["refs"] and m == "POST":
+            d = self._json_body()
+            with s.lock:
+                if not d["ref"].startswith("refs/heads/") or d["sha"] not in s.commits:
+                    return self.send(422, {"message": "Invalid request"})
+                branch = d["ref"][len("refs/heads/"):]
+                if branch in repo["branches"]:
+                    return self.send(422, {"message": "Reference already exists"})
+                repo["branches"][branch] = d["sha"]
+            return self.send(201, {"ref": d["ref"], "object": {"sha": d["sha"], "type": "commit"}})
+        if p[:1] == ["blobs"]:
+            if m == "POST":
+                d = self._json_body()
+                data = base64.b64decode(d["content"]) if d.get("encoding") == "base64" else d["content"].encode()
+                sha = git_blob_sha(data)
+                with s.lock:
+                    s.blobs[sha] = data
+                return self.send(201, {"sha": sha, "url": "x"})
+            data = s.blobs.get(p[1])
+            if data is None:
+                return self.not_found()
+            if "raw" in self.headers.get("Accept", ""):
+                return self.send_raw(data)
+            return self.send(200, {"sha": p[1], "size": len(data), "encoding": "base64",
+                                   "content": base64.encodebytes(data).decode()})
+        if p[:1] == ["trees"]:
+            if m == "POST":
+                d = self._json_body()
+                with s.lock:
+                    base = dict(s.trees.get(d.get("base_tree"), {})) if d.get("base_tree") else {}
+                    for e in d["tree"]:
+                        if "content" in e:
+                            data = e["content"].encode()
+                            sha = git_blob_sha(data)
+                            s.blobs[sha] = data
+                            base[e["path"]] = sha
+                        elif e.get("sha") is None:
+                            base.pop(e["path"], None)
+                        else:
+                            if e["sha"] not in s.blobs:
+                                return self.send(422, {"message": "bad sha"})
+                            base[e["path"]] = e["sha"]
+                    sha = s.put_tree(base)
+                return self.send(201, {"sha": sha})
+            with s.lock:
+                tree_sha, tree = s.head_tree(repo, p[1])
+            if tree is None:
+                return self.not_found()
+            entries = []
+            dirs = set()
+            for path in sorted(tree):
+                parts = path.split("/")
+                for i in range(1, len(parts)):
+                    dd = "/".join(parts[:i])
+                    if dd not in dirs:
+                        dirs.add(dd)
+                        entries.append({"path": dd, "mode": "040000", "type": "tree", "sha": "0" * 40})
+                entries.append({"path": path, "mode": "100644", "type": "blob", "sha": tree[path],
+                                "size": len(s.blobs[tree[path]]), "url": "x" * 60})
+            return self.send(200, {"sha": tree_sha, "tree": entries, "truncated": False})
+        if p[:1] == ["commits"]:
+            if m == "POST":
+                d = self._json_body()
+                with s.lock:
+                    sha = s._sha("commit", d["tree"], d.get("parents"))
+                    s.commits[sha] = {"tree": d["tree"], "parents": d.get("parents", []),
+                                      "message": d["message"]}
+                return self.send(201, {"sha": sha, "tree": {"sha": d["tree"]}})
+            c = s.commits.get(p[1])
+            if not c:
+                return self.not_found()
+            return self.send(200, {"sha": p[1], "tree": {"sha": c["tree"]}, "message": c["message"]})
+        if p[:1] in (["ref"], ["refs"]) and p[1:2] == ["heads"]:
+            branch = "/".join(p[2:])
+            if m == "PATCH":
+                d = self._json_body()
+                with s.lock:
+                    cur = repo["branches"].get(branch)
+                    if cur is None:
+                        return self.not_found()
+                    if not d.get("force") and cur not in self._ancestors(d["sha"]):
+                        return self.send(422, {"message": "Update is not a fast forward"})
+                    repo["branches"][branch] = d["sha"]
+                return self.send(200, {"ref": "refs/heads/" + branch, "object": {"sha": d["sha"]}})
+            cur = repo["branches"].get(branch)
+            if cur is None:
+                return self.not_found()
+            return self.send(200, {"ref": "refs/heads/" + branch, "object": {"sha": cur, "type": "commit"}})
+        self._body()
+        return self.not_found()
+
+    def _ancestors(self, sha):
+        seen = set()
+        stack = [sha]
+        while stack:
+            c = stack.pop()
+            if c in seen or c not in self.store.commits:
+                continue
+            seen.add(c)
+            stack.extend(self.store.commits[c]["parents"])
+        return seen
+
+
+class FakeGitHub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0, bandwidth=None, rate_limit=5000, rate_window=3600,
+                 user="bench"):
+        super().__init__(("127.0.0.1", port), Handler)
+        self.cfg = {"latency": latency, "bandwidth": bandwidth}
+        self.store = Store(user)
+        self.rate = {"limit": rate_limit, "remaining": rate_limit, "window": rate_window,
+                     "reset": time.time() + rate_window}
+        self.reset_stats()
+
+    def seed(self, spec):
+        """
+        Prepara el estado inicial a partir de una lista de tuplas:
+
+            ("repo", owner, name)
+            ("repos", owner, count)            -> repo0000, repo0001, ...
+            ("files", owner, name, prefix, n, size)
+        """
+        s = self.store
+        with s.lock:
+            for item in spec:
+                kind, owner = item[0], item[1]
+                if kind == "repo":
+                    s.create_repo(owner, item[2])
+                elif kind == "repos":
+                    for i in range(item[2]):
+                        s.create_repo(owner, "repo%04d" % i)
+                elif kind == "files":
+                    _, _, name, prefix, n, size = item
+                    repo = s.repos.get((owner, name)) or s.create_repo(owner, name)
+                    changes = {}
+                    for i in range(n):
+                        data = (b"%d:" % i) * (size // 2 + 1)
+                        changes[prefix + "f%d.bin" % i] = data[:size]
+                    s.commit_files(repo, "main", changes, "seed")
+                else:
+                    raise ValueError("semilla desconocida: %r" % (item,))
+
+    def reset_stats(self):
+        self.stats = {"requests": 0, "bytes_sent": 0, "bytes_received": 0, "by_method": {}}
+
+    @property
+    def url(self):
+        return "http://%s:%d" % self.server_address[:2]
+
+    def start(self):
+        t = threading.Thread(target=self.serve_forever, daemon=True)
+        t.start()
+        return self
+
+
+def serve(conn, options=None, seed=()):
+    """
+    Ejecuta el servidor en un proceso aparte controlado por una Pipe de
+    multiprocessing. Envía su URL al arrancar y responde a los comandos
+    "stats", "reset" y "stop".
+    """
+    server = FakeGitHub(**(options or {}))
+    server.seed(seed)
+    server.start()
+    conn.send(server.url)
+    while True:
+        cmd = conn.recv()
+        if cmd == "stats":
+            conn.send(server.stats)
+        elif cmd == "reset":
+            server.reset_stats()
+            conn.send(True)
+        else:
+            break
+    server.shutdown()
+    conn.send(True)
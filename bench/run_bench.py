@@ -0,0 +1,349 @@
+"""
+Benchmarks de github_lib sin dispositivo, sin red y sin token.
+
+Ejecuta github_lib en CPython (con los sustitutos de bench/shims para los
+módulos de MicroPython) contra un servidor local que imita la API de GitHub
+(bench/fake_github.py) y mide cada escenario:
+
+    wall_s          tiempo total en segundos
+    requests        peticiones recibidas por el servidor
+    bytes_sent      bytes de cuerpo enviados por el cliente
+    bytes_received  bytes de cuerpo recibidos por el cliente
+    peak_mem        pico de memoria del cliente (tracemalloc, bytes)
+
+Uso:
+    python bench/run_bench.py                           # todos los escenarios
+    python bench/run_bench.py upload list --files 50 --size 4096
+    python bench/run_bench.py --latency 0.05 --bandwidth 200000
+    python bench/run_bench.py --output actual.json --baseline anterior.json
+
+Con --baseline se compara con un resultado anterior y el proceso termina
+con código 1 si algún escenario empeora más de --tolerance.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(BENCH_DIR, 'shims'), os.path.dirname(BENCH_DIR), BENCH_DIR]
+
+if not hasattr(sys, 'print_exception'):
+    import traceback
+    sys.print_exception = lambda e, f=None: traceback.print_exception(type(e), e, e.__traceback__)
+
+import fake_github  # noqa: E402
+import github_lib  # noqa: E402
+
+OWNER = 'bench'
+REPO = 'demo'
+
+
+def file_data(i, size):
+    """Mismo contenido que genera la semilla 'files' de fake_github"""
+    return ((b'%d:' % i) * (size // 2 + 1))[:size]
+
+
+def make_files(base, n, size):
+    os.makedirs(base, exist_ok=True)
+    for i in range(n):
+        with open(os.path.join(base, 'f%d.bin' % i), 'wb') as f:
+            f.write(file_data(i, size))
+
+
+def local_pairs(base, prefix):
+    return [(os.path.join(base, name), prefix + name) for name in sorted(os.listdir(base))]
+
+
+# --- Escenarios -----------------------------------------------------------
+# Cada escenario tiene setup(args, workdir) -> semilla del servidor y
+# run(manager, args, workdir) -> True si la operación terminó bien, o un
+# dict con 'ok' y métricas propias que se añaden al resultado.
+
+def _upload_setup(args, workdir):
+    make_files(os.path.join(workdir, 'up'), args.files, args.size)
+    return [('repo', OWNER, REPO)]
+
+
+def _upload_run(manager, args, workdir):
+    files = local_pairs(os.path.join(workdir, 'up'), 'up/')
+    result = manager.upload_files(OWNER, REPO, files)
+    return result.get('commit') is not None
+
+
+def _upload_each_run(manager, args, workdir):
+    ok = True
+    for local_path, remote_path in local_pairs(os.path.join(workdir, 'up'), 'up/'):
+        result = manager.upload_file(OWNER, REPO, local_path, remote_path)
+        ok = ok and 'error' not in result
+    return ok
+
+
+def _sync_setup(args, workdir):
+    make_files(os.path.join(workdir, 'sync'), args.files, args.size)
+    return [('files', OWNER, REPO, 'sync/', args.files, args.size)]
+
+
+def _sync_run(manager, args, workdir):
+    plan = manager.sync(OWNER, REPO, os.path.join(workdir, 'sync'), remote_prefix='sync')
+    return 'error' not in plan and not (plan['added'] or plan['modified'] or plan['deleted'])
+
+
+def _list_setup(args, workdir):
+    return [('repos', OWNER, args.repos)]
+
+
+def _list_run(manager, args, workdir):
+    count = 0
+    for repo in manager.iter_repositories():
+        if 'error' in repo:
+            return False
+        count += 1
+    return count == args.repos
+
+
+def _tree_setup(args, workdir):
+    return [('files', OWNER, REPO, 'tree/', args.files, args.size)]
+
+
+def _tree_run(manager, args, workdir):
+    index = manager.get_remote_tree(OWNER, REPO)
+    return index is not None and len(index) == args.files + 1
+
+
+def _download_setup(args, workdir):
+    return [('files', OWNER, REPO, 'dl/', 1, args.download_size)]
+
+
+def _download_run(manager, args, workdir):
+    local_path = os.path.join(workdir, 'f0.bin')
+    if manager.download_file(OWNER, REPO, 'dl/f0.bin', local_path) is not True:
+        return False
+    # Verificación por bloques para no inflar el pico de memoria medido
+    pattern = b'0:' * 32768
+    remaining = args.download_size
+    with open(local_path, 'rb') as f:
+        while remaining:
+            block = f.read(min(remaining, len(pattern)))
+            if not block or block != pattern[:len(block)]:
+                return False
+            remaining -= len(block)
+        return not f.read(1)
+
+
+def _checkout_setup(args, workdir):
+    return [('files', OWNER, REPO, 'src/', args.files, args.size)]
+
+
+def _checkout_run(manager, args, workdir):
+    result = manager.download_tree(OWNER, REPO, remote_prefix='src',
+                                   local_dir=os.path.join(workdir, 'checkout'))
+    return result.get('files') == args.files
+
+
+def _startup_setup(args, workdir):
+    return [('repo', OWNER, REPO)]
+
+
+def _startup_run(manager, args, workdir):
+    # En otro intérprete: aquí los módulos ya están importados
+    output = subprocess.run(
+        [sys.executable, os.path.join(BENCH_DIR, 'startup.py'), manager.api_base_url, OWNER, REPO],
+        capture_output=True, text=True)
+    if output.returncode != 0 and not output.stdout:
+        print(output.stderr, file=sys.stderr)
+        return False
+    report = json.loads(output.stdout.strip().splitlines()[-1])
+    return {
+        'ok': output.returncode == 0,
+        'import_ms': report['import_total_ms'],
+        'first_request_ms': report['first_request_ms'],
+    }
+
+
+SCENARIOS = {
+    'upload': ('Subir N archivos de tamaño S en un commit (upload_files)', _upload_setup, _upload_run),
+    'upload_each': ('Subir N archivos con un PUT cada uno (upload_file)', _upload_setup, _upload_each_run),
+    'sync_noop': ('Sincronizar N archivos que ya están al día (sync)', _sync_setup, _sync_run),
+    'list': ('Listar R repositorios (iter_repositories)', _list_setup, _list_run),
+    'tree': ('Índice de una rama con N archivos (get_remote_tree)', _tree_setup, _tree_run),
+    'download': ('Descargar un archivo de D bytes (download_file)', _download_setup, _download_run),
+    'checkout': ('Descargar una carpeta con N archivos en un tarball (download_tree)',
+                 _checkout_setup, _checkout_run),
+    'startup': ('Importar las bibliotecas y hacer la primera petición (bench/startup.py)',
+                _startup_setup, _startup_run),
+}
+
+
+# --- Ejecución ------------------------------------------------------------
+
+def server_options(args):
+    return {
+        'latency': args.latency,
+        'bandwidth': args.bandwidth,
+        'rate_limit': args.rate_limit,
+        'rate_window': args.rate_window,
+        'user': OWNER,
+    }
+
+
+def run_once(name, args):
+    """Ejecuta un escenario con un servidor nuevo en otro proceso"""
+    _, setup, run = SCENARIOS[name]
+    workdir = tempfile.mkdtemp(prefix='bench_')
+    parent, child = multiprocessing.Pipe()
+    process = multiprocessing.Process(
+        target=fake_github.serve, args=(child, server_options(args), setup(args, workdir)))
+    process.start()
+    try:
+        url = parent.recv()
+        manager = github_lib.GitHubRepoManager('bench-token', api_base_url=url)
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            extra = run(manager, args, workdir)
+            if not isinstance(extra, dict):
+                extra = {'ok': extra}
+            ok = bool(extra.pop('ok'))
+        finally:
+            wall = time.perf_counter() - start
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            manager.close()
+
+        parent.send('stats')
+        stats = parent.recv()
+        parent.send('stop')
+        parent.recv()
+    finally:
+        process.join(5)
+        if process.is_alive():
+            process.terminate()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    result = {
+        'ok': ok,
+        'wall_s': round(wall, 4),
+        'requests': stats['requests'],
+        'bytes_sent': stats['bytes_received'],
+        'bytes_received': stats['bytes_sent'],
+        'peak_mem': peak,
+        'by_method': stats['by_method'],
+    }
+    result.update(extra)
+    return result
+
+
+def run_scenario(name, args):
+    """Repite el escenario y se queda con la ejecución más rápida"""
+    best = None
+    for _ in range(args.repeat):
+        result = run_once(name, args)
+        if best is None or result['wall_s'] < best['wall_s']:
+            best = result
+    return best
+
+
+def compare(results, baseline, tolerance):
+    """
+    Compara con un resultado anterior.
+
+    Returns:
+        list: Descripción de cada métrica que empeoró más de la tolerancia
+    """
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get('results', {}).get(name)
+        if not previous:
+            continue
+        if previous.get('ok') and not current['ok']:
+            regressions.append(f"{name}: el escenario ya no termina correctamente")
+        # Las peticiones son deterministas: cualquier aumento es una regresión
+        if current['requests'] > previous['requests']:
+            regressions.append(f"{name}: requests {previous['requests']} -> {current['requests']}")
+        for key in ('bytes_sent', 'bytes_received', 'peak_mem', 'wall_s',
+                    'import_ms', 'first_request_ms'):
+            before = previous.get(key)
+            if before and key in current and current[key] > before * (1 + tolerance):
+                regressions.append(f"{name}: {key} {before} -> {current[key]}")
+    return regressions
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmarks de github_lib contra un servidor local de la API de GitHub',
+        epilog='Escenarios: ' + '; '.join(f'{k}: {v[0]}' for k, v in SCENARIOS.items()))
+    parser.add_argument('scenarios', nargs='*', metavar='escenario',
+                        help='Escenarios a ejecutar (por defecto todos)')
+    parser.add_argument('--files', type=int, default=20, help='N: número de archivos')
+    parser.add_argument('--size', type=int, default=2048, help='S: bytes por archivo')
+    parser.add_argument('--repos', type=int, default=1000, help='R: repositorios a listar')
+    parser.add_argument('--download-size', type=int, default=5 * 1024 * 1024,
+                        help='D: bytes del archivo a descargar')
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help='Segundos de latencia por respuesta')
+    parser.add_argument('--bandwidth', type=int, default=None,
+                        help='Ancho de banda de bajada en bytes/s (sin límite por defecto)')
+    parser.add_argument('--rate-limit', type=int, default=5000,
+                        help='Peticiones permitidas por ventana')
+    parser.add_argument('--rate-window', type=int, default=3600,
+                        help='Duración de la ventana del límite en segundos')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Repeticiones por escenario (se guarda la más rápida)')
+    parser.add_argument('--output', help='Archivo donde guardar el resultado JSON')
+    parser.add_argument('--baseline', help='Resultado JSON anterior con el que comparar')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='Empeoramiento relativo permitido frente a --baseline')
+    args = parser.parse_args(argv)
+    for name in args.scenarios:
+        if name not in SCENARIOS:
+            parser.error(f"escenario desconocido: {name} (disponibles: {', '.join(SCENARIOS)})")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    names = args.scenarios or list(SCENARIOS)
+
+    results = {}
+    for name in names:
+        print(f"Ejecutando {name}...", file=sys.stderr)
+        results[name] = run_scenario(name, args)
+
+    report = {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'parameters': {k: v for k, v in vars(args).items()
+                       if k not in ('scenarios', 'output', 'baseline')},
+        'results': results,
+    }
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print('REGRESIÓN ' + line, file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0 if all(r['ok'] for r in results.values()) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
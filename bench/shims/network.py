@@ -0,0 +1,38 @@
+"""
+Sustituto mínimo del módulo network de MicroPython: una interfaz WLAN que
+siempre está conectada a la red local.
+"""
+STA_IF = 0
+AP_IF = 1
+STAT_GOT_IP = 1010
+
+
+class WLAN:
+    def __init__(self, interface=STA_IF):
+        self._active = False
+
+    def active(self, value=None):
+        if value is not None:
+            self._active = bool(value)
+        return self._active
+
+    def isconnected(self):
+        return True
+
+    def connect(self, *args, **kwargs):
+        pass
+
+    def disconnect(self):
+        pass
+
+    def status(self, *args):
+        return STAT_GOT_IP
+
+    def ifconfig(self, config=None):
+        return ('127.0.0.1', '255.0.0.0', '127.0.0.1', '127.0.0.1')
+
+    def config(self, *args, **kwargs):
+        return None
+
+    def scan(self):
+        return []
@@ -0,0 +1,2 @@
+"""Sustituto de ubinascii para ejecutar github_lib en CPython (benchmarks)."""
+from binascii import *  # noqa: F401,F403
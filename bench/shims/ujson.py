@@ -0,0 +1,2 @@
+"""Sustituto de ujson para ejecutar github_lib en CPython (benchmarks)."""
+from json import *  # noqa: F401,F403
@@ -0,0 +1,94 @@
+"""
+Tiempo de arranque: cuánto cuesta importar las bibliotecas y cuánto se tarda
+hasta la primera petición a la API.
+
+Funciona en la placa (MicroPython, con los .py o los .mpy de
+tools/build_mpy.py) y en CPython (con los sustitutos de bench/shims).
+Importar main_git no debe conectar la red ni crear el gestor; si lo hace,
+el resultado lo marca con "import_side_effects": true.
+
+Uso:
+    python bench/startup.py                                   # solo importación
+    python bench/startup.py http://127.0.0.1:8000 bench demo  # y primera petición
+    mpremote run bench/startup.py                             # en la placa
+
+Imprime una línea JSON con los milisegundos de cada importación
+(import_ms), el total, la memoria usada por los módulos si se puede medir
+y first_request_ms (crear el gestor y hacer GET del repositorio).
+"""
+import gc
+import sys
+
+try:
+    from time import ticks_us, ticks_diff
+except ImportError:
+    import time
+
+    def ticks_us():
+        return int(time.perf_counter() * 1000000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+if sys.implementation.name != 'micropython':
+    import os
+    BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+    sys.path[:0] = [os.path.join(BENCH_DIR, 'shims'), os.path.dirname(BENCH_DIR)]
+
+try:
+    import ujson as json
+except ImportError:
+    import json
+
+# En el orden en que los importa main_git
+MODULES = ('github_http', 'github_lib', 'network_iot', 'main_git')
+
+
+def _mem_alloc():
+    return gc.mem_alloc() if hasattr(gc, 'mem_alloc') else None
+
+
+def measure_imports():
+    result = {}
+    gc.collect()
+    before = _mem_alloc()
+    total = 0
+    for name in MODULES:
+        start = ticks_us()
+        __import__(name)
+        ms = ticks_diff(ticks_us(), start) / 1000
+        result[name] = round(ms, 2)
+        total += ms
+    gc.collect()
+    after = _mem_alloc()
+    main_git = sys.modules['main_git']
+    return {
+        'import_ms': result,
+        'import_total_ms': round(total, 2),
+        'import_mem': after - before if before is not None else None,
+        'import_side_effects': main_git.net is not None or main_git.repo_manager is not None,
+    }
+
+
+def measure_first_request(url, owner, repo):
+    import github_lib
+    start = ticks_us()
+    manager = github_lib.GitHubRepoManager('bench-token', api_base_url=url)
+    info = manager.get_repository_info(owner, repo)
+    ms = ticks_diff(ticks_us(), start) / 1000
+    manager.close()
+    return {'first_request_ms': round(ms, 2), 'first_request_ok': 'error' not in info}
+
+
+def main(argv):
+    report = measure_imports()
+    if len(argv) > 1:
+        owner = argv[2] if len(argv) > 2 else 'bench'
+        repo = argv[3] if len(argv) > 3 else 'demo'
+        report.update(measure_first_request(argv[1], owner, repo))
+    print(json.dumps(report))
+    return 0 if not report['import_side_effects'] and report.get('first_request_ok', True) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv))
@@ -0,0 +1,482 @@
+# github_async.py
+try:
+    import asyncio
+except ImportError:
+    import uasyncio as asyncio
+import ujson
+import github_http
+from github_lib import RateLimiter, file_json_body, remove_file, replace_file
+
+
+def _current_loop():
+    """Bucle de eventos actual (CPython crea uno nuevo en cada asyncio.run)"""
+    if hasattr(asyncio, 'get_running_loop'):
+        return asyncio.get_running_loop()
+    return asyncio.get_event_loop()
+
+
+class _AsyncConnection:
+    """Conexión keep-alive abierta con asyncio.open_connection"""
+    def __init__(self, key, reader, writer):
+        self.key = key
+        self.reader = reader
+        self.writer = writer
+        self.loop = _current_loop()
+        self.last_used = github_http._now_ms()
+
+    def close(self):
+        try:
+            self.writer.close()
+        except:
+            pass
+
+
+class AsyncGitHubRepoManager:
+    """
+    Variante asíncrona de GitHubRepoManager (uasyncio en el dispositivo,
+    asyncio en CPython) para solapar la latencia de varias peticiones.
+
+    Como máximo max_in_flight peticiones están en vuelo a la vez, cada una
+    por su propia conexión keep-alive. GitHub penaliza con límites
+    secundarios a los clientes con mucha concurrencia, por eso el valor por
+    defecto es bajo.
+    """
+    def __init__(self, token, max_in_flight=4, chunk_size=1536, idle_timeout=20,
+                 api_base_url="https://api.github.com", timeout=github_http.DEFAULT_TIMEOUT):
+        """
+        Inicializa el cliente asíncrono.
+
+        Args:
+            token (str): Token de acceso personal de GitHub
+            max_in_flight (int, opcional): Peticiones simultáneas como máximo
+            chunk_size (int, opcional): Bytes leídos de flash por bloque al subir
+                                        archivos (se redondea a múltiplo de 3)
+            idle_timeout (int, opcional): Segundos máximos de inactividad de una conexión
+            api_base_url (str, opcional): URL base de la API (GitHub Enterprise o un
+                                          servidor local para pruebas y benchmarks)
+            timeout (float, opcional): Segundos máximos de espera al conectar y en
+                                       cada lectura o escritura (None sin límite)
+        """
+        self.token = token
+        self.timeout = timeout
+        self.api_base_url = api_base_url.rstrip('/')
+        self.headers = {
+            'Authorization': f'token {token}',
+            'Content-Type': 'application/json',
+            'User-Agent': 'MicroPython-GitHub-Client',
+            'Accept': 'application/vnd.github.v3+json'
+        }
+        self.max_in_flight = max(1, max_in_flight)
+        self.chunk_size = max(3, chunk_size - chunk_size % 3)
+        self.idle_timeout_ms = idle_timeout * 1000
+        self._idle = {}
+        self._tls_context = None
+        # Compartido por todas las tareas: el límite de GitHub es por token
+        self.rate_limiter = RateLimiter()
+
+    # --- Transporte -----------------------------------------------------
+
+    async def _io(self, awaitable):
+        """Espera una operación de red como mucho self.timeout segundos"""
+        if self.timeout is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, self.timeout)
+        except asyncio.TimeoutError:
+            raise github_http.Timeout('Tiempo agotado esperando al servidor')
+
+    async def _connect(self, scheme, host, port):
+        ssl_arg = None
+        if scheme == 'https':
+            if self._tls_context is None:
+                self._tls_context = github_http.make_tls_context() or True
+            ssl_arg = self._tls_context
+        # La dirección sale de la caché DNS compartida con el cliente síncrono
+        address = github_http.resolver.resolve(host, port)[-1]
+        if isinstance(address, tuple):
+            kwargs = {'server_hostname': host} if ssl_arg else {}
+            try:
+                reader, writer = await self._io(asyncio.open_connection(
+                    address[0], port, ssl=ssl_arg, **kwargs))
+            except TypeError:
+                # uasyncio antiguo sin server_hostname
+                reader, writer = await self._io(asyncio.open_connection(host, port, ssl=ssl_arg))
+            except OSError:
+                github_http.resolver.invalidate(host)
+                raise
+        else:
+            reader, writer = await self._io(asyncio.open_connection(host, port, ssl=ssl_arg))
+        return _AsyncConnection((scheme, host, port), reader, writer)
+
+    async def _acquire(self, scheme, host, port):
+        """Devuelve (conexión, reutilizada)"""
+        idle = self._idle.get((scheme, host, port))
+        while idle:
+            conn = idle.pop()
+            # Las conexiones solo sirven dentro del bucle de eventos que las abrió
+            if (conn.loop is _current_loop()
+                    and github_http._elapsed_ms(conn.last_used) < self.idle_timeout_ms):
+                return conn, True
+            conn.close()
+        return await self._connect(scheme, host, port), False
+
+    def _release(self, conn):
+        conn.last_used = github_http._now_ms()
+        idle = self._idle.setdefault(conn.key, [])
+        if len(idle) < self.max_in_flight:
+            idle.append(conn)
+        else:
+            conn.close()
+
+    async def _read_head(self, conn):
+        line = await self._io(conn.reader.readline())
+        if not line:
+            raise OSError('Conexión cerrada por el servidor')
+        status = int(line.split(None, 2)[1])
+        headers = {}
+        while True:
+            line = await self._io(conn.reader.readline())
+            if not line or line == b'\r\n':
+                break
+            name, _, value = line.decode('utf-8').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        return status, headers
+
+    async def _read_body(self, conn, status, headers, sink):
+        """
+        Lee el cuerpo entero. Si hay sink, le pasa los bloques en lugar de acumularlos.
+
+        Returns:
+            tuple: (cuerpo o None, conexión reutilizable)
+        """
+        reader = conn.reader
+        out = None if sink else bytearray()
+
+        def emit(data):
+            if sink:
+                sink(data)
+            else:
+                out.extend(data)
+
+        if status in (204, 304):
+            return out, True
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            while True:
+                line = await self._io(reader.readline())
+                if line == b'\r\n':
+                    line = await self._io(reader.readline())
+                size = int(line.split(b';')[0].strip(), 16)
+                if size == 0:
+                    while True:
+                        line = await self._io(reader.readline())
+                        if not line or line == b'\r\n':
+                            break
+                    break
+                while size:
+                    data = await self._io(reader.read(min(size, self.chunk_size)))
+                    if not data:
+                        raise OSError('Respuesta chunked incompleta')
+                    size -= len(data)
+                    emit(data)
+            reusable = True
+        elif 'content-length' in headers:
+            left = int(headers['content-length'])
+            while left:
+                data = await self._io(reader.read(min(left, self.chunk_size)))
+                if not data:
+                    raise OSError('Respuesta incompleta')
+                left -= len(data)
+                emit(data)
+            reusable = True
+        else:
+            while True:
+                data = await self._io(reader.read(self.chunk_size))
+                if not data:
+                    break
+                emit(data)
+            reusable = False
+        if headers.get('connection', '').lower() == 'close':
+            reusable = False
+        return out, reusable
+
+    async def _request(self, method, url, headers=None, body=None, body_length=None, sink=None):
+        """
+        Envía una petición por una conexión keep-alive del pool.
+
+        Args:
+            method (str): Método HTTP
+            url (str): URL completa
+            headers (dict, opcional): Cabeceras de la petición
+            body (bytes/str/función, opcional): Cuerpo, o función que devuelve
+                un iterable de bloques (ver file_json_body)
+            body_length (int, opcional): Longitud total si body es una función
+            sink (callable, opcional): Recibe el cuerpo de la respuesta por bloques
+
+        Returns:
+            tuple: (código de estado, cabeceras, cuerpo en bytes o None si hay sink)
+        """
+        scheme, host, port, path = github_http.parse_url(url)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        if body_length is None:
+            body_length = len(body) if body is not None and not callable(body) else 0
+
+        retries = 3
+        while True:
+            delay = self.rate_limiter.delay()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            conn, reused = await self._acquire(scheme, host, port)
+            head_read = False
+            try:
+                writer = conn.writer
+                lines = [f"{method} {path} HTTP/1.1\r\nHost: {host}\r\n"]
+                if headers:
+                    for name, value in headers.items():
+                        if name.lower() not in ('content-length', 'host', 'connection'):
+                            lines.append(f"{name}: {value}\r\n")
+                if body is not None or method in ('POST', 'PUT', 'PATCH', 'DELETE'):
+                    lines.append(f"Content-Length: {body_length}\r\n")
+                lines.append("Connection: keep-alive\r\n\r\n")
+                writer.write(''.join(lines).encode('utf-8'))
+                if callable(body):
+                    for chunk in body():
+                        writer.write(chunk)
+                        await self._io(writer.drain())
+                elif body is not None:
+                    writer.write(body)
+                await self._io(writer.drain())
+
+                status, resp_headers = await self._read_head(conn)
+                head_read = True
+                data, reusable = await self._read_body(conn, status, resp_headers, sink)
+            except OSError:
+                conn.close()
+                # Reintentar solo si la conexión reutilizada falló antes de recibir respuesta
+                if reused and not head_read:
+                    continue
+                raise
+            if reusable:
+                self._release(conn)
+            else:
+                conn.close()
+            message = None
+            if status == 403 and data:
+                try:
+                    message = bytes(data).decode('utf-8')
+                except UnicodeError:
+                    pass
+            wait = self.rate_limiter.update(status, resp_headers, message)
+            if wait is not None and retries > 0 and sink is None:
+                print(f"Límite de peticiones de GitHub alcanzado, esperando {wait} s...")
+                retries -= 1
+                continue
+            return status, resp_headers, bytes(data) if data is not None else None
+
+    async def _json(self, method, url, data=None):
+        """
+        Petición JSON a la API.
+
+        Returns:
+            tuple: (código de estado, dict/str con la respuesta)
+        """
+        body = ujson.dumps(data) if data is not None else None
+        status, _, content = await self._request(method, url, headers=self.headers, body=body)
+        try:
+            return status, ujson.loads(content)
+        except:
+            return status, content.decode('utf-8')
+
+    async def _bounded(self, items, worker):
+        """
+        Ejecuta worker(item, buf) para cada elemento con como máximo
+        max_in_flight tareas a la vez. Cada tarea tiene su propio buffer.
+        """
+        it = iter(items)
+
+        async def run():
+            buf = bytearray(self.chunk_size)
+            for item in it:
+                await worker(item, buf)
+
+        await asyncio.gather(*[run() for _ in range(self.max_in_flight)])
+
+    def close(self):
+        """Cierra las conexiones abiertas con GitHub"""
+        for idle in self._idle.values():
+            for conn in idle:
+                conn.close()
+        self._idle = {}
+
+    # --- Operaciones ----------------------------------------------------
+
+    async def get_file_sha(self, owner, repo_name, file_path):
+        """
+        Obtiene el SHA de un archivo en el repositorio.
+
+        Returns:
+            str/None: SHA del archivo o None si no existe o hay error
+        """
+        file_path = file_path.lstrip('/')
+        try:
+            url = f"{self.api_base_url}/repos/{owner}/{repo_name}/contents/{file_path}"
+            status, data = await self._json('GET', url)
+            if status == 200:
+                return data.get('sha')
+            return None
+        except Exception as e:
+            print(f"Error al obtener SHA: {e}")
+            return None
+
+    async def get_file_shas(self, owner, repo_name, paths):
+        """
+        Obtiene el SHA de varios archivos con peticiones concurrentes.
+
+        Returns:
+            dict: {ruta: sha o None}
+        """
+        shas = {}
+
+        async def worker(path, buf):
+            shas[path] = await self.get_file_sha(owner, repo_name, path)
+
+        await self._bounded(paths, worker)
+        return shas
+
+    async def upload_files(self, owner, repo_name, files, branch="main", commit_message=None):
+        """
+        Sube varios archivos en un único commit, creando los blobs en paralelo.
+
+        Args:
+            owner (str): Propietario del repositorio
+            repo_name (str): Nombre del repositorio
+            files (iterable): Pares (ruta_local, ruta_remota)
+            branch (str, opcional): Rama a actualizar
+            commit_message (str, opcional): Mensaje del commit
+
+        Returns:
+            dict: Igual que GitHubRepoManager.upload_files
+        """
+        repo_url = f"{self.api_base_url}/repos/{owner}/{repo_name}"
+        results = {}
+        tree = []
+
+        async def worker(item, buf):
+            local_path, remote_path = item
+            remote_path = remote_path.lstrip('/')
+            try:
+                body, length = file_json_body({"encoding": "base64"}, local_path, buf)
+                status, _, content = await self._request('POST', f"{repo_url}/git/blobs",
+                                                         headers=self.headers, body=body,
+                                                         body_length=length)
+                try:
+                    blob = ujson.loads(content)
+                except:
+                    blob = content.decode('utf-8')
+                if status == 201:
+                    tree.append({"path": remote_path, "mode": "100644", "type": "blob", "sha": blob['sha']})
+                    results[remote_path] = {'sha': blob['sha']}
+                else:
+                    results[remote_path] = {'error': f'Error al crear blob: {status}', 'details': blob}
+            except Exception as e:
+                print(f"Excepción al crear blob de {local_path}: {e}")
+                results[remote_path] = {'error': f'Error en la solicitud: {e}'}
+
+        try:
+            # La consulta de la rama se solapa con la creación de los blobs
+            head_task = asyncio.create_task(self._json('GET', f"{repo_url}/branches/{branch}"))
+            await self._bounded(files, worker)
+            status, branch_info = await head_task
+            if status != 200:
+                return {'error': f'Error al obtener la rama {branch}: {status}',
+                        'details': branch_info, 'results': results}
+            if not tree:
+                return {'error': 'No se pudo subir ningún archivo', 'results': results}
+
+            status, new_tree = await self._json('POST', f"{repo_url}/git/trees", {
+                "base_tree": branch_info['commit']['commit']['tree']['sha'],
+                "tree": tree
+            })
+            if status != 201:
+                return {'error': f'Error al crear árbol: {status}', 'details': new_tree, 'results': results}
+
+            if commit_message is None:
+                commit_message = f"Subir {len(tree)} archivos desde MicroPython"
+            status, commit = await self._json('POST', f"{repo_url}/git/commits", {
+                "message": commit_message,
+                "tree": new_tree['sha'],
+                "parents": [branch_info['commit']['sha']]
+            })
+            if status != 201:
+                return {'error': f'Error al crear commit: {status}', 'details': commit, 'results': results}
+
+            status, ref = await self._json('PATCH', f"{repo_url}/git/refs/heads/{branch}", {
+                "sha": commit['sha']
+            })
+            if status != 200:
+                return {'error': f'Error al actualizar la rama {branch}: {status}',
+                        'details': ref, 'results': results}
+            return {'commit': commit['sha'], 'results': results}
+        except Exception as e:
+            print(f"Excepción al subir archivos: {e}")
+            return {'error': f'Error en la solicitud: {e}', 'results': results}
+
+    async def download_file(self, owner, repo_name, remote_path, local_path=None):
+        """
+        Descarga un archivo del repositorio escribiéndolo por bloques en un
+        temporal que se renombra al terminar.
+
+        Returns:
+            bool/dict: True si éxito, diccionario con error si falla
+        """
+        remote_path = remote_path.lstrip('/')
+        if local_path is None:
+            local_path = remote_path.split('/')[-1]
+        try:
+            url = f"{self.api_base_url}/repos/{owner}/{repo_name}/contents/{remote_path}"
+            status, file_info = await self._json('GET', url)
+            if status != 200:
+                return {'error': f'Error al obtener información del archivo: {status}',
+                        'details': file_info}
+            if file_info.get('type') != 'file':
+                return {'error': 'El path proporcionado no es un archivo'}
+            download_url = file_info.get('download_url')
+            file_info = None
+            if not download_url:
+                return {'error': 'No se pudo obtener la URL de descarga'}
+
+            tmp_path = local_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                status, _, _ = await self._request('GET', download_url, sink=f.write)
+            if status != 200:
+                remove_file(tmp_path)
+                return {'error': f'Error al descargar archivo: {status}'}
+            replace_file(tmp_path, local_path)
+            return True
+        except Exception as e:
+            print(f"Excepción al descargar archivo: {e}")
+            return {'error': f'Error en la solicitud: {e}'}
+
+    async def download_files(self, owner, repo_name, files):
+        """
+        Descarga varios archivos en paralelo.
+
+        Args:
+            files (iterable): Pares (ruta_remota, ruta_local)
+
+        Returns:
+            dict: {ruta_remota: True o información de error}
+        """
+        results = {}
+
+        async def worker(item, buf):
+            remote_path, local_path = item
+            results[remote_path] = await self.download_file(owner, repo_name, remote_path, local_path)
+
+        await self._bounded(files, worker)
+        return results
+
+
+def run(coro):
+    """Ejecuta una corrutina del cliente asíncrono desde código síncrono"""
+    return asyncio.run(coro)
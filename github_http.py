@@ -0,0 +1,781 @@
+# github_http.py
+try:
+    import usocket as socket
+except ImportError:
+    import socket
+try:
+    import ssl
+except ImportError:
+    import ussl as ssl
+try:
+    import ujson as json
+except ImportError:
+    import json
+import time
+
+
+def _now_ms():
+    """Milisegundos monotónicos (ticks_ms en MicroPython)"""
+    if hasattr(time, 'ticks_ms'):
+        return time.ticks_ms()
+    return int(time.time() * 1000)
+
+
+def _elapsed_ms(start):
+    if hasattr(time, 'ticks_diff'):
+        return time.ticks_diff(time.ticks_ms(), start)
+    return _now_ms() - start
+
+
+_MONTHS = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+
+
+def parse_http_date(value):
+    """
+    Convierte una fecha HTTP ('Wed, 21 Oct 2015 07:28:00 GMT') a segundos
+    desde 1970, sin depender de que el reloj del dispositivo esté en hora.
+
+    Returns:
+        int/None: Segundos Unix o None si el formato no es válido
+    """
+    try:
+        _, day, month, year, clock, _ = value.split()
+        hour, minute, second = clock.split(':')
+        y = int(year)
+        m = _MONTHS.index(month) + 1
+        # Días desde 1970-01-01 (algoritmo days_from_civil)
+        if m <= 2:
+            y -= 1
+        era = y // 400
+        yoe = y - era * 400
+        doy = (153 * (m + (-3 if m > 2 else 9)) + 2) // 5 + int(day) - 1
+        doe = yoe * 365 + yoe // 4 - yoe // 100 + doy
+        days = era * 146097 + doe - 719468
+        return days * 86400 + int(hour) * 3600 + int(minute) * 60 + int(second)
+    except (ValueError, AttributeError):
+        return None
+
+
+def next_link(link):
+    """
+    Extrae la URL rel="next" de una cabecera Link de paginación.
+
+    Returns:
+        str/None: URL de la página siguiente o None si es la última
+    """
+    if not link:
+        return None
+    for part in link.split(','):
+        url, _, params = part.partition(';')
+        if 'rel="next"' in params:
+            return url.strip()[1:-1]
+    return None
+
+
+def parse_url(url):
+    """
+    Separa una URL en sus componentes.
+
+    Args:
+        url (str): URL http:// o https://
+
+    Returns:
+        tuple: (esquema, host, puerto, ruta)
+    """
+    scheme, _, rest = url.partition('://')
+    host, slash, path = rest.partition('/')
+    path = slash + path if slash else '/'
+    if ':' in host:
+        host, port = host.split(':', 1)
+        port = int(port)
+    else:
+        port = 443 if scheme == 'https' else 80
+    return scheme, host, port, path
+
+
+def make_tls_context():
+    """
+    Crea un contexto TLS de cliente reutilizable, o None si el puerto de
+    MicroPython solo ofrece ssl.wrap_socket.
+    """
+    if hasattr(ssl, 'create_default_context'):
+        # CPython
+        return ssl.create_default_context()
+    if hasattr(ssl, 'SSLContext'):
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        if hasattr(ssl, 'CERT_NONE'):
+            context.verify_mode = ssl.CERT_NONE
+        return context
+    return None
+
+
+def _wrap_tls(sock, host, context=None, session=None):
+    """
+    Envuelve un socket en TLS con SNI para el host dado.
+    Si hay una sesión TLS previa y el puerto lo soporta, la reanuda.
+    """
+    if context is None:
+        context = make_tls_context()
+    if context is None:
+        return ssl.wrap_socket(sock, server_hostname=host)
+    if session is not None:
+        try:
+            return context.wrap_socket(sock, server_hostname=host, session=session)
+        except TypeError:
+            pass
+    return context.wrap_socket(sock, server_hostname=host)
+
+
+def _sockaddr_ip(sockaddr):
+    """IP en texto de una dirección de getaddrinfo (None si no es una tupla)"""
+    if isinstance(sockaddr, tuple):
+        return sockaddr[0]
+    return None
+
+
+class Resolver:
+    """
+    Caché DNS de los hosts de la API, para que las llamadas repetidas no
+    vuelvan a resolver el nombre.
+
+    getaddrinfo no devuelve el TTL de los registros, así que cada dirección
+    se guarda un tiempo fijo (ttl) y se descarta antes si la conexión a ella
+    falla. Si el DNS no responde se usa la última dirección conocida aunque
+    haya caducado. Las direcciones fijadas con pin() no consultan nunca el
+    DNS (pruebas en redes aisladas).
+    """
+    # Hosts que se resuelven por adelantado con warm()
+    HOSTS = ('api.github.com', 'raw.githubusercontent.com')
+
+    def __init__(self, ttl=300, path=None, pins=None, max_entries=8):
+        """
+        Args:
+            ttl (int, opcional): Segundos que se guarda cada dirección
+            path (str, opcional): Archivo en flash donde persistir la caché
+                                  entre reinicios
+            pins (dict, opcional): Direcciones fijas {host: ip}
+            max_entries (int, opcional): Número máximo de hosts guardados
+        """
+        self.ttl = ttl
+        self.path = path
+        self.max_entries = max_entries
+        self._pinned = dict(pins or {})
+        # host -> [ip, caducidad en segundos de time.time()]
+        self._entries = {}
+        self.hits = 0
+        self.lookups = 0
+        self._dirty = False
+        if path:
+            try:
+                with open(path) as f:
+                    data = json.load(f)
+                now = time.time()
+                for host, entry in data.items():
+                    # Si el reloj cambió (NTP), no alargar el TTL
+                    if now < entry[1] <= now + ttl:
+                        self._entries[host] = entry
+            except (OSError, ValueError, TypeError, IndexError, AttributeError):
+                pass
+
+    def pin(self, host, address):
+        """Fija la dirección de un host (no se consultará el DNS)"""
+        self._pinned[host] = address
+
+    def unpin(self, host):
+        self._pinned.pop(host, None)
+
+    @staticmethod
+    def _lookup(host, port):
+        return socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)[0]
+
+    def resolve(self, host, port):
+        """
+        Resuelve un host usando la caché.
+
+        Returns:
+            tuple: Entrada de getaddrinfo (familia, tipo, protocolo, nombre, dirección)
+        """
+        address = self._pinned.get(host)
+        if address is None:
+            entry = self._entries.get(host)
+            if entry is not None and entry[1] > time.time():
+                self.hits += 1
+                address = entry[0]
+            else:
+                try:
+                    info = self._lookup(host, port)
+                except OSError:
+                    if entry is None:
+                        raise
+                    # DNS caído: la última dirección conocida suele seguir valiendo
+                    address = entry[0]
+                else:
+                    self.lookups += 1
+                    ip = _sockaddr_ip(info[-1])
+                    if ip is not None and ip != host:
+                        if host not in self._entries and len(self._entries) >= self.max_entries:
+                            del self._entries[min(self._entries, key=lambda h: self._entries[h][1])]
+                        self._entries[host] = [ip, time.time() + self.ttl]
+                        self._dirty = True
+                    return info
+        # Una IP numérica se convierte sin consultar el DNS
+        return self._lookup(address, port)
+
+    def invalidate(self, host):
+        """Olvida la dirección de un host (p. ej. si la conexión falló)"""
+        if self._entries.pop(host, None) is not None:
+            self._dirty = True
+
+    def warm(self, hosts=None, port=443):
+        """
+        Resuelve por adelantado los hosts dados (por defecto HOSTS) y
+        persiste la caché.
+
+        Returns:
+            int: Hosts resueltos
+        """
+        resolved = 0
+        for host in hosts or self.HOSTS:
+            try:
+                self.resolve(host, port)
+                resolved += 1
+            except OSError as e:
+                print(f"No se pudo resolver {host}: {e}")
+        self.save()
+        return resolved
+
+    def clear(self):
+        self._entries = {}
+        self._dirty = True
+
+    def save(self):
+        """Persiste la caché en flash si tiene ruta y cambió"""
+        if not self.path or not self._dirty:
+            return
+        try:
+            with open(self.path, 'w') as f:
+                json.dump(self._entries, f)
+            self._dirty = False
+        except OSError as e:
+            print("No se pudo guardar la caché DNS:", e)
+
+
+# Caché DNS compartida por todas las conexiones (se puede reemplazar)
+resolver = Resolver()
+
+
+# Segundos máximos que puede bloquear una conexión, una lectura o una escritura
+DEFAULT_TIMEOUT = 20
+
+# errno de ETIMEDOUT (Linux/MicroPython y lwIP)
+_ETIMEDOUT = (110, 116)
+
+
+class Timeout(OSError):
+    """El servidor no respondió dentro del timeout de la conexión"""
+
+
+def _is_timeout(error):
+    timeout = getattr(socket, 'timeout', None)
+    if timeout is not None and isinstance(error, timeout):
+        return True
+    return bool(error.args) and error.args[0] in _ETIMEDOUT
+
+
+class Connection:
+    """
+    Conexión TCP/TLS con un host, con lectura y escritura tipo stream.
+    Si el servidor deja de responder durante timeout segundos, las
+    operaciones lanzan Timeout en lugar de bloquear para siempre.
+    """
+    def __init__(self, scheme, host, port, tls_context=None, tls_session=None, dns=None,
+                 timeout=DEFAULT_TIMEOUT):
+        """
+        Abre la conexión.
+
+        Args:
+            scheme (str): 'http' o 'https'
+            host (str): Nombre del host
+            port (int): Puerto
+            tls_context (opcional): Contexto TLS reutilizable
+            tls_session (opcional): Sesión TLS a reanudar
+            dns (Resolver, opcional): Caché DNS (por defecto la del módulo)
+            timeout (float, opcional): Segundos máximos de espera de cada
+                operación del socket (None para esperar sin límite)
+        """
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.requests = 0
+        self.last_used = _now_ms()
+        self.timed_out = False
+        dns = dns or resolver
+        info = dns.resolve(host, port)
+        sock = socket.socket(info[0], socket.SOCK_STREAM, info[2])
+        try:
+            if timeout is not None:
+                sock.settimeout(timeout)
+            try:
+                sock.connect(info[-1])
+            except OSError as e:
+                # La dirección guardada puede haber cambiado
+                dns.invalidate(host)
+                if _is_timeout(e):
+                    raise Timeout(f'Tiempo agotado al conectar con {host}')
+                raise
+            if scheme == 'https':
+                sock = _wrap_tls(sock, host, tls_context, tls_session)
+        except:
+            sock.close()
+            raise
+        self.sock = sock
+        self.tls_session = getattr(sock, 'session', None)
+        # En MicroPython el socket ya es un stream; en CPython se usa makefile
+        if hasattr(sock, 'readinto'):
+            self.stream = sock
+        else:
+            self.stream = sock.makefile('rwb')
+
+    def _timeout(self, error):
+        if _is_timeout(error):
+            # La conexión queda en un estado desconocido: no se reutiliza
+            self.timed_out = True
+            return Timeout(f'Tiempo agotado esperando a {self.host}')
+        return error
+
+    def write(self, data):
+        if isinstance(data, str):
+            data = data.encode('utf-8')
+        try:
+            self.stream.write(data)
+        except OSError as e:
+            raise self._timeout(e)
+
+    def flush(self):
+        if hasattr(self.stream, 'flush'):
+            try:
+                self.stream.flush()
+            except OSError as e:
+                raise self._timeout(e)
+
+    def readline(self):
+        try:
+            return self.stream.readline()
+        except OSError as e:
+            raise self._timeout(e)
+
+    def readinto(self, buf):
+        try:
+            return self.stream.readinto(buf)
+        except OSError as e:
+            raise self._timeout(e)
+
+    def read(self, size):
+        try:
+            return self.stream.read(size)
+        except OSError as e:
+            raise self._timeout(e)
+
+    def close(self):
+        if self.stream is not self.sock:
+            try:
+                self.stream.close()
+            except:
+                pass
+        try:
+            self.sock.close()
+        except:
+            pass
+
+
+class _ZlibReader:
+    """
+    Stream descomprimido sobre zlib.decompressobj, para CPython (sin
+    deflate.DeflateIO ni zlib.DecompIO). Nunca descomprime más de lo que
+    cabe en el buffer pedido.
+    """
+    def __init__(self, stream, wbits=31, chunk_size=512):
+        import zlib
+        self.stream = stream
+        self._decomp = zlib.decompressobj(wbits)
+        self._error = zlib.error
+        self._in = bytearray(chunk_size)
+        self._pending = b''
+
+    def readinto(self, buf):
+        while not self._pending:
+            data = self._decomp.unconsumed_tail
+            if not data:
+                if self._decomp.eof:
+                    return 0
+                n = self.stream.readinto(self._in)
+                if not n:
+                    # El stream terminó antes del final del gzip
+                    raise OSError('Datos gzip incompletos')
+                data = bytes(self._in[:n])
+            try:
+                self._pending = self._decomp.decompress(data, len(buf))
+            except self._error as e:
+                # Igual que deflate en MicroPython: datos corruptos -> OSError
+                raise OSError(e)
+        n = min(len(buf), len(self._pending))
+        buf[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+    def read(self, size):
+        buf = bytearray(size)
+        return bytes(buf[:self.readinto(buf)])
+
+
+try:
+    import io
+    _IOBase = io.IOBase
+except (ImportError, AttributeError):
+    _IOBase = object
+
+
+class _StreamAdapter(_IOBase):
+    """
+    Presenta una respuesta HTTP como stream nativo (io.IOBase) para que
+    deflate.DeflateIO pueda leer de ella en MicroPython.
+    """
+    def __init__(self, stream):
+        self.stream = stream
+
+    def readinto(self, buf):
+        return self.stream.readinto(buf)
+
+
+def gunzip_stream(stream):
+    """
+    Envuelve un stream gzip para leerlo descomprimido por bloques, sin
+    cargarlo entero: deflate.DeflateIO en MicroPython >= 1.21, zlib.DecompIO
+    en versiones anteriores y zlib.decompressobj en CPython. La ventana de
+    deflate ocupa 32 KB.
+
+    Returns:
+        Objeto con readinto(buf) y read(n)
+    """
+    try:
+        import deflate
+        return deflate.DeflateIO(_StreamAdapter(stream), deflate.GZIP)
+    except ImportError:
+        pass
+    import zlib
+    if hasattr(zlib, 'DecompIO'):
+        return zlib.DecompIO(_StreamAdapter(stream), 31)
+    return _ZlibReader(stream)
+
+
+def gzip_supported():
+    """True si hay un descompresor para leer respuestas gzip (deflate o zlib)"""
+    for name in ('deflate', 'zlib'):
+        try:
+            __import__(name)
+            return True
+        except ImportError:
+            pass
+    return False
+
+
+class _RawBody:
+    """Cuerpo de una Response tal como llega por la conexión (sin descomprimir)"""
+    def __init__(self, response):
+        self.readinto = response._read_raw
+
+
+class Response:
+    """
+    Respuesta HTTP con lectura incremental del cuerpo.
+
+    Expone la misma interfaz básica que urequests (status_code, text,
+    content, close) y además read/readinto para consumir el cuerpo por
+    bloques sin cargarlo entero en RAM. Si el servidor la envía con
+    Content-Encoding: gzip, se descomprime al leerla.
+    """
+    def __init__(self, conn, release=None):
+        """
+        Lee la línea de estado y las cabeceras.
+
+        Args:
+            conn (Connection): Conexión de la que leer
+            release (callable, opcional): Función que recibe la conexión cuando
+                el cuerpo se ha leído entero y puede reutilizarse
+        """
+        self.conn = conn
+        self._release = release
+        line = conn.readline()
+        if not line:
+            raise OSError('Conexión cerrada por el servidor')
+        parts = line.split(None, 2)
+        self.status_code = int(parts[1])
+        self.reason = parts[2].strip().decode('utf-8') if len(parts) > 2 else ''
+        self.headers = {}
+        while True:
+            line = conn.readline()
+            if not line or line == b'\r\n':
+                break
+            name, _, value = line.decode('utf-8').partition(':')
+            self.headers[name.strip().lower()] = value.strip()
+
+        self._chunked = self.headers.get('transfer-encoding', '').lower() == 'chunked'
+        self._chunk_left = 0
+        length = self.headers.get('content-length')
+        self._remaining = int(length) if length is not None else -1
+        if self.status_code in (204, 304):
+            self._remaining = 0
+            self._chunked = False
+        self._content = None
+        # Content-Length y Range se refieren a los bytes comprimidos
+        self._decoder = None
+        if self._remaining != 0 and self.headers.get('content-encoding', '').lower() == 'gzip':
+            self._decoder = gunzip_stream(_RawBody(self))
+
+    def _next_chunk(self):
+        """Lee la cabecera del siguiente bloque chunked; devuelve su tamaño"""
+        line = self.conn.readline()
+        if line == b'\r\n':
+            line = self.conn.readline()
+        size = int(line.split(b';')[0].strip(), 16)
+        if size == 0:
+            # Consumir trailers hasta la línea vacía
+            while True:
+                line = self.conn.readline()
+                if not line or line == b'\r\n':
+                    break
+            self._chunked = False
+            self._remaining = 0
+        return size
+
+    def readinto(self, buf):
+        """
+        Lee parte del cuerpo (ya descomprimido) en buf.
+
+        Args:
+            buf (bytearray/memoryview): Buffer de destino
+
+        Returns:
+            int: Bytes leídos (0 al final del cuerpo)
+        """
+        if self._decoder is not None:
+            return self._decoder.readinto(buf) or 0
+        return self._read_raw(buf)
+
+    def _read_raw(self, buf):
+        if self._remaining == 0:
+            return 0
+        mv = memoryview(buf)
+        if self._chunked:
+            if self._chunk_left == 0:
+                self._chunk_left = self._next_chunk()
+                if self._chunk_left == 0:
+                    return 0
+            if len(mv) > self._chunk_left:
+                mv = mv[:self._chunk_left]
+            n = self.conn.readinto(mv)
+            if not n:
+                raise OSError('Respuesta chunked incompleta')
+            self._chunk_left -= n
+            return n
+        if self._remaining > 0 and len(mv) > self._remaining:
+            mv = mv[:self._remaining]
+        n = self.conn.readinto(mv) or 0
+        if self._remaining > 0:
+            if n == 0:
+                raise OSError('Respuesta incompleta')
+            self._remaining -= n
+        elif n == 0:
+            self._remaining = 0
+        return n
+
+    def read(self, size=-1):
+        """
+        Lee hasta size bytes del cuerpo (todo el cuerpo si size < 0).
+        """
+        if size < 0:
+            out = bytearray()
+            buf = bytearray(1024)
+            while True:
+                n = self.readinto(buf)
+                if not n:
+                    return bytes(out)
+                out.extend(buf[:n])
+        buf = bytearray(size)
+        n = self.readinto(buf)
+        return bytes(buf[:n])
+
+    @property
+    def content(self):
+        if self._content is None:
+            self._content = self.read()
+        return self._content
+
+    @property
+    def text(self):
+        return self.content.decode('utf-8')
+
+    # Cuerpos pendientes hasta este tamaño se descartan para poder reutilizar la conexión
+    DRAIN_LIMIT = 4096
+
+    def close(self):
+        """
+        Termina la respuesta. Si el cuerpo se ha leído (o queda poco) y el
+        servidor admite keep-alive, la conexión vuelve al pool.
+        """
+        # Soltar el descompresor (y su ventana de 32 KB) en cuanto se termina
+        self._decoder = None
+        conn = self.conn
+        if not conn:
+            return
+        self.conn = None
+        reusable = (self._release is not None
+                    and not conn.timed_out
+                    and self.headers.get('connection', '').lower() != 'close'
+                    and (self._chunked or self._remaining >= 0))
+        if reusable and self._remaining != 0:
+            if not self._chunked and self._remaining > self.DRAIN_LIMIT:
+                reusable = False
+            else:
+                try:
+                    self.conn = conn
+                    buf = bytearray(256)
+                    drained = 0
+                    while drained <= self.DRAIN_LIMIT:
+                        n = self._read_raw(buf)
+                        if not n:
+                            break
+                        drained += n
+                    reusable = self._remaining == 0
+                except OSError:
+                    reusable = False
+                self.conn = None
+        if reusable:
+            self._release(conn)
+        else:
+            conn.close()
+
+
+def _write_request(conn, method, path, headers, body, body_length):
+    """Escribe la línea de petición, las cabeceras y el cuerpo en la conexión"""
+    conn.write(f"{method} {path} HTTP/1.1\r\nHost: {conn.host}\r\n")
+    if headers:
+        for name, value in headers.items():
+            if name.lower() in ('content-length', 'host', 'connection'):
+                continue
+            conn.write(f"{name}: {value}\r\n")
+    if body is not None or method in ('POST', 'PUT', 'PATCH', 'DELETE'):
+        conn.write(f"Content-Length: {body_length}\r\n")
+    conn.write("Connection: keep-alive\r\n\r\n")
+
+    if callable(body):
+        body = body()
+    if isinstance(body, (bytes, bytearray, memoryview)):
+        conn.write(body)
+    elif body is not None:
+        for chunk in body:
+            conn.write(chunk)
+    conn.flush()
+
+
+class ConnectionPool:
+    """
+    Mantiene una conexión HTTP/1.1 keep-alive por host para que una serie de
+    llamadas a la API cueste un solo handshake TLS.
+
+    Las conexiones inactivas más de idle_timeout se cierran y se vuelven a
+    abrir; si una conexión reutilizada resulta estar cerrada por el servidor,
+    la petición se repite de forma transparente en una conexión nueva.
+    """
+    def __init__(self, idle_timeout=20, max_requests=100, dns=None, timeout=DEFAULT_TIMEOUT):
+        """
+        Args:
+            idle_timeout (int, opcional): Segundos máximos de inactividad de una conexión
+            max_requests (int, opcional): Peticiones máximas por conexión
+            dns (Resolver, opcional): Caché DNS (por defecto la del módulo)
+            timeout (float, opcional): Segundos máximos que puede bloquear el
+                socket (ver Connection); al agotarse se lanza Timeout
+        """
+        self.idle_timeout_ms = idle_timeout * 1000
+        self.timeout = timeout
+        self.max_requests = max_requests
+        self.dns = dns
+        self._idle = {}
+        self._sessions = {}
+        self._tls_context = None
+        self.handshakes = 0
+
+    def _connect(self, scheme, host, port):
+        key = (scheme, host, port)
+        if scheme == 'https' and self._tls_context is None:
+            self._tls_context = make_tls_context()
+        conn = Connection(scheme, host, port, self._tls_context, self._sessions.get(key),
+                          self.dns, self.timeout)
+        self.handshakes += 1
+        if conn.tls_session is not None:
+            self._sessions[key] = conn.tls_session
+        return conn
+
+    def _acquire(self, scheme, host, port):
+        """Devuelve (conexión, reutilizada)"""
+        conn = self._idle.pop((scheme, host, port), None)
+        if conn is not None:
+            if _elapsed_ms(conn.last_used) < self.idle_timeout_ms:
+                return conn, True
+            conn.close()
+        return self._connect(scheme, host, port), False
+
+    def _release(self, conn):
+        conn.requests += 1
+        conn.last_used = _now_ms()
+        # Guardar la sesión TLS (puede no estar disponible hasta el primer intercambio)
+        session = getattr(conn.sock, 'session', None)
+        if session is not None:
+            self._sessions[(conn.scheme, conn.host, conn.port)] = session
+        key = (conn.scheme, conn.host, conn.port)
+        if conn.requests >= self.max_requests or key in self._idle:
+            conn.close()
+        else:
+            self._idle[key] = conn
+
+    def request(self, method, url, headers=None, body=None, body_length=None):
+        """
+        Envía una petición HTTP/1.1 por una conexión del pool.
+
+        Args:
+            method (str): Método HTTP
+            url (str): URL completa
+            headers (dict, opcional): Cabeceras adicionales
+            body (bytes/str/iterable/función, opcional): Cuerpo de la petición.
+                Si es un iterable de bloques se escribe bloque a bloque en el
+                socket; si es una función que lo devuelve, el envío se puede
+                repetir cuando la conexión reutilizada estaba cerrada
+            body_length (int, opcional): Longitud total del cuerpo, obligatoria
+                si body es un iterable o una función
+
+        Returns:
+            Response: Respuesta con el cuerpo pendiente de leer
+        """
+        scheme, host, port, path = parse_url(url)
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        if body_length is None:
+            body_length = len(body) if body is not None and not callable(body) else 0
+
+        while True:
+            conn, reused = self._acquire(scheme, host, port)
+            try:
+                _write_request(conn, method, path, headers, body, body_length)
+                return Response(conn, self._release)
+            except OSError:
+                conn.close()
+                # Solo se reintenta si la conexión venía del pool y el cuerpo se puede repetir
+                if not reused or not (body is None or callable(body)
+                                      or isinstance(body, (bytes, bytearray))):
+                    raise
+
+    def close(self):
+        """Cierra todas las conexiones inactivas"""
+        for conn in self._idle.values():
+            conn.close()
+        self._idle = {}
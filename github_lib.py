@@ -1,27 +1,1792 @@
 # github_lib.py
-import urequests
+import gc
+import os
+import sys
+import time
+import ubinascii
 import ujson
+import github_http
+try:
+    import hashlib
+except ImportError:
+    import uhashlib as hashlib
+
+
+def git_blob_sha(file_path, buf=None):
+    """
+    Calcula el SHA-1 que git asigna al contenido de un archivo
+    ("blob <tamaño>\\0" + contenido), leyéndolo por bloques.
+
+    Args:
+        file_path (str): Ruta local del archivo
+        buf (bytearray, opcional): Buffer de lectura reutilizable
+
+    Returns:
+        str: SHA en hexadecimal
+    """
+    size = os.stat(file_path)[6]
+    h = hashlib.sha1(('blob %d\x00' % size).encode())
+    if buf is None:
+        buf = bytearray(512)
+    mv = memoryview(buf)
+    with open(file_path, 'rb') as f:
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            h.update(mv[:n])
+    return ubinascii.hexlify(h.digest()).decode()
+
+
+def file_json_body(data, file_path, buf, on_chunk=None):
+    """
+    Prepara un cuerpo JSON cuyo campo "content" es el archivo en base64,
+    generado por bloques para no cargar el archivo entero en RAM.
+
+    Args:
+        data (dict): Resto de campos del JSON
+        file_path (str): Ruta local del archivo
+        buf (bytearray): Buffer de lectura; su tamaño (múltiplo de 3) fija el bloque
+        on_chunk (callable, opcional): Se llama tras leer cada bloque (p. ej. para
+                                       medir la memoria con MemoryProfiler)
+
+    Returns:
+        tuple: (función que genera los bloques, longitud total en bytes).
+               Al ser una función, el envío puede repetirse si hay que reconectar
+    """
+    size = os.stat(file_path)[6]
+    prefix = ujson.dumps(data)[:-1]
+    if data:
+        prefix += ', '
+    prefix = (prefix + '"content": "').encode('utf-8')
+    suffix = b'"}'
+    length = len(prefix) + (size + 2) // 3 * 4 + len(suffix)
+
+    chunk_size = len(buf)
+
+    def body():
+        yield prefix
+        mv = memoryview(buf)
+        with open(file_path, 'rb') as f:
+            while True:
+                # Llenar el bloque completo para que solo el último lleve relleno
+                n = 0
+                while n < chunk_size:
+                    r = f.readinto(mv[n:])
+                    if not r:
+                        break
+                    n += r
+                if not n:
+                    break
+                if on_chunk is not None:
+                    on_chunk()
+                yield ubinascii.b2a_base64(mv[:n])[:-1]
+                if n < chunk_size:
+                    break
+        yield suffix
+
+    return body, length
+
+
+def remove_file(path):
+    """Elimina un archivo ignorando si no existe"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def replace_file(src_path, dst_path):
+    """
+    Reemplaza dst_path por src_path con un rename.
+    En FAT el rename falla si el destino existe, así que se borra antes.
+    """
+    try:
+        os.rename(src_path, dst_path)
+    except OSError:
+        remove_file(dst_path)
+        os.rename(src_path, dst_path)
+
+
+def make_dirs(path):
+    """
+    Crea una carpeta y las que falten por encima (MicroPython no tiene
+    os.makedirs). Las que ya existen se ignoran.
+    """
+    current = '/' if path.startswith('/') else ''
+    for part in path.split('/'):
+        if not part or part == '.':
+            continue
+        current += part
+        try:
+            os.mkdir(current)
+        except OSError:
+            pass
+        current += '/'
+
+
+def _glob_match(pattern, name):
+    """
+    Compara un nombre con un patrón con comodines '*' y '?'
+    (sin cruzar '/', como en .gitignore).
+    """
+    p = n = 0
+    star = -1
+    mark = 0
+    while n < len(name):
+        if p < len(pattern) and (pattern[p] == '?' and name[n] != '/' or pattern[p] == name[n]):
+            p += 1
+            n += 1
+        elif p < len(pattern) and pattern[p] == '*':
+            star = p
+            mark = n
+            p += 1
+        elif star >= 0 and name[mark] != '/':
+            p = star + 1
+            mark += 1
+            n = mark
+        else:
+            return False
+    while p < len(pattern) and pattern[p] == '*':
+        p += 1
+    return p == len(pattern)
+
+
+def is_excluded(path, patterns):
+    """
+    Indica si una ruta relativa coincide con algún patrón estilo .gitignore.
+
+    - 'nombre' o '*.pyc' coincide con cualquier componente de la ruta
+    - 'dir/' solo coincide con directorios (y excluye todo su contenido)
+    - '/ruta' o 'a/b' se comparan desde la raíz del directorio sincronizado
+
+    Args:
+        path (str): Ruta relativa con '/' como separador
+        patterns (list): Patrones de exclusión
+
+    Returns:
+        bool: True si la ruta está excluida
+    """
+    if not patterns:
+        return False
+    parts = path.split('/')
+    for pattern in patterns:
+        dir_only = pattern.endswith('/')
+        anchored = pattern.startswith('/') or '/' in pattern.strip('/')
+        pattern = pattern.strip('/')
+        if not pattern:
+            continue
+        # Si el patrón es de directorio, el último componente (el archivo) no cuenta
+        last = len(parts) - 1 if dir_only else len(parts)
+        if anchored:
+            for i in range(1, last + 1):
+                if _glob_match(pattern, '/'.join(parts[:i])):
+                    return True
+        else:
+            for i in range(last):
+                if _glob_match(pattern, parts[i]):
+                    return True
+    return False
+
+
+def walk_files(base, rel=''):
+    """
+    Recorre recursivamente un directorio local de forma perezosa, sin
+    construir la lista completa de archivos en RAM.
+
+    Args:
+        base (str): Directorio raíz
+        rel (str, opcional): Subdirectorio relativo desde el que empezar
+
+    Yields:
+        tuple: (ruta_relativa, tamaño, mtime) de cada archivo, con '/' como separador
+    """
+    path = base.rstrip('/') + '/' + rel if rel else base.rstrip('/')
+    if hasattr(os, 'ilistdir'):
+        entries = os.ilistdir(path)
+    else:
+        # CPython: no hay ilistdir, se emula nivel a nivel
+        entries = ((name, os.stat(path + '/' + name)[0] & 0xF000) for name in os.listdir(path))
+    for entry in entries:
+        name = entry[0]
+        rel_path = rel + '/' + name if rel else name
+        if entry[1] == 0x4000:
+            yield from walk_files(base, rel_path)
+        else:
+            st = os.stat(path + '/' + name)
+            yield rel_path, st[6], st[8]
+
+
+def load_exclude_patterns(path):
+    """
+    Lee patrones de exclusión de un archivo estilo .gitignore.
+
+    Returns:
+        list: Patrones (vacía si el archivo no existe)
+    """
+    patterns = []
+    try:
+        with open(path) as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith('#'):
+                    patterns.append(line)
+    except OSError:
+        pass
+    return patterns
+
+
+# Bytes de la sintaxis JSON
+_QUOTE = 0x22
+_COMMA = 0x2c
+_COLON = 0x3a
+_BACKSLASH = 0x5c
+_LBRACE = 0x7b
+_RBRACE = 0x7d
+_LBRACKET = 0x5b
+_RBRACKET = 0x5d
+_ESCAPES = {0x22: b'"', 0x5c: b'\\', 0x2f: b'/', 0x62: b'\b', 0x66: b'\f',
+            0x6e: b'\n', 0x72: b'\r', 0x74: b'\t'}
+
+
+def _is_space(c):
+    return c == 0x20 or c == 0x0a or c == 0x0d or c == 0x09
+
+
+class _JsonReader:
+    """
+    Lector JSON incremental sobre un stream con read(n). Solo mantiene en
+    RAM un bloque del texto y los valores que se piden explícitamente.
+    """
+    def __init__(self, stream, chunk_size=512):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buf = b''
+        self.pos = 0
+
+    def _fill(self):
+        self.buf = self.stream.read(self.chunk_size)
+        self.pos = 0
+        if not self.buf:
+            raise ValueError('JSON incompleto')
+
+    def _take(self):
+        """Consume un byte tal cual"""
+        if self.pos >= len(self.buf):
+            self._fill()
+        c = self.buf[self.pos]
+        self.pos += 1
+        return c
+
+    def peek(self):
+        """Devuelve el siguiente byte que no sea espacio sin consumirlo"""
+        while True:
+            if self.pos >= len(self.buf):
+                self._fill()
+            c = self.buf[self.pos]
+            if not _is_space(c):
+                return c
+            self.pos += 1
+
+    def next(self):
+        """Consume y devuelve el siguiente byte que no sea espacio"""
+        c = self.peek()
+        self.pos += 1
+        return c
+
+    def expect(self, expected):
+        if self.next() != expected:
+            raise ValueError('JSON inválido')
+
+    def _escape(self):
+        """Decodifica una secuencia de escape (tras la barra invertida)"""
+        c = self._take()
+        if c != 0x75:
+            return _ESCAPES.get(c, bytes((c,)))
+        code = int(bytes(self._take() for _ in range(4)), 16)
+        if 0xd800 <= code < 0xdc00:
+            # Par sustituto UTF-16 (caracteres fuera del plano básico)
+            if self._take() == _BACKSLASH and self._take() == 0x75:
+                low = int(bytes(self._take() for _ in range(4)), 16)
+                code = 0x10000 + ((code - 0xd800) << 10) + (low - 0xdc00)
+        return chr(code).encode('utf-8')
+
+    def read_string(self):
+        """Lee un string (con la comilla inicial ya consumida)"""
+        out = b''
+        while True:
+            if self.pos >= len(self.buf):
+                self._fill()
+            buf = self.buf
+            q = buf.find(b'"', self.pos)
+            b = buf.find(b'\\', self.pos)
+            if b >= 0 and (q < 0 or b < q):
+                out += buf[self.pos:b]
+                self.pos = b + 1
+                out += self._escape()
+            elif q >= 0:
+                out += buf[self.pos:q]
+                self.pos = q + 1
+                return out.decode('utf-8')
+            else:
+                out += buf[self.pos:]
+                self.pos = len(buf)
+
+    def _skip_string(self):
+        """Salta un string (con la comilla inicial ya consumida) sin guardarlo"""
+        while True:
+            if self.pos >= len(self.buf):
+                self._fill()
+            buf = self.buf
+            q = buf.find(b'"', self.pos)
+            b = buf.find(b'\\', self.pos)
+            if b >= 0 and (q < 0 or b < q):
+                self.pos = b + 1
+                self._take()
+            elif q >= 0:
+                self.pos = q + 1
+                return
+            else:
+                self.pos = len(buf)
+
+    def _scalar(self, c):
+        """Lee un número, true, false o null que empieza por el byte c"""
+        out = bytearray((c,))
+        while True:
+            if self.pos >= len(self.buf):
+                self.buf = self.stream.read(self.chunk_size)
+                self.pos = 0
+                if not self.buf:
+                    break
+            c = self.buf[self.pos]
+            if c == _COMMA or c == _RBRACE or c == _RBRACKET or _is_space(c):
+                break
+            out.append(c)
+            self.pos += 1
+        text = bytes(out)
+        if text == b'true':
+            return True
+        if text == b'false':
+            return False
+        if text == b'null':
+            return None
+        if b'.' in text or b'e' in text or b'E' in text:
+            return float(text)
+        return int(text)
+
+    def skip_value(self):
+        """Salta un valor completo sin construirlo"""
+        c = self.next()
+        if c == _QUOTE:
+            self._skip_string()
+        elif c == _LBRACE or c == _LBRACKET:
+            depth = 1
+            while depth:
+                if self.pos >= len(self.buf):
+                    self._fill()
+                buf = self.buf
+                i = self.pos
+                n = len(buf)
+                c = 0
+                while i < n:
+                    c = buf[i]
+                    i += 1
+                    if c == _QUOTE:
+                        break
+                    if c == _LBRACE or c == _LBRACKET:
+                        depth += 1
+                    elif c == _RBRACE or c == _RBRACKET:
+                        depth -= 1
+                        if not depth:
+                            break
+                self.pos = i
+                if c == _QUOTE:
+                    self._skip_string()
+        else:
+            self._scalar(c)
+
+    def parse_value(self):
+        """Lee y construye un valor completo"""
+        c = self.next()
+        if c == _QUOTE:
+            return self.read_string()
+        if c == _LBRACE:
+            obj = {}
+            if self.peek() == _RBRACE:
+                self.pos += 1
+                return obj
+            while True:
+                self.expect(_QUOTE)
+                key = self.read_string()
+                self.expect(_COLON)
+                obj[key] = self.parse_value()
+                c = self.next()
+                if c == _RBRACE:
+                    return obj
+                if c != _COMMA:
+                    raise ValueError('JSON inválido')
+        if c == _LBRACKET:
+            items = []
+            if self.peek() == _RBRACKET:
+                self.pos += 1
+                return items
+            while True:
+                items.append(self.parse_value())
+                c = self.next()
+                if c == _RBRACKET:
+                    return items
+                if c != _COMMA:
+                    raise ValueError('JSON inválido')
+        return self._scalar(c)
+
+    def project(self, prefix, wanted, parents, out):
+        """
+        Recorre un objeto (con la llave inicial ya consumida) guardando en out
+        solo las rutas de wanted y descendiendo solo por las de parents.
+        """
+        if self.peek() == _RBRACE:
+            self.pos += 1
+            return
+        while True:
+            self.expect(_QUOTE)
+            path = prefix + self.read_string()
+            self.expect(_COLON)
+            if path in wanted:
+                out[path] = self.parse_value()
+            elif path in parents and self.peek() == _LBRACE:
+                self.pos += 1
+                self.project(path + '.', wanted, parents, out)
+            else:
+                self.skip_value()
+            c = self.next()
+            if c == _RBRACE:
+                return
+            if c != _COMMA:
+                raise ValueError('JSON inválido')
+
+
+def _field_paths(fields):
+    """Rutas pedidas y sus prefijos ('owner.login' -> {'owner'})"""
+    wanted = set(fields)
+    parents = set()
+    for field in fields:
+        parts = field.split('.')
+        for i in range(1, len(parts)):
+            parents.add('.'.join(parts[:i]))
+    return wanted, parents
+
+
+def project_json(stream, fields, chunk_size=512):
+    """
+    Lee de un stream un objeto JSON y devuelve solo los campos pedidos,
+    sin construir el resto del objeto.
+
+    Args:
+        stream: Objeto con read(n) (p. ej. github_http.Response)
+        fields (tuple): Rutas de campos, con puntos para anidados ('owner.login')
+        chunk_size (int, opcional): Bytes leídos por bloque
+
+    Returns:
+        tuple/None: Valores en el orden de fields (None si falta alguno),
+                    o None si la raíz no es un objeto
+    """
+    reader = _JsonReader(stream, chunk_size)
+    if reader.next() != _LBRACE:
+        return None
+    wanted, parents = _field_paths(fields)
+    out = {}
+    reader.project('', wanted, parents, out)
+    return tuple(out.get(field) for field in fields)
+
+
+def iter_json_records(stream, fields=None, items=None, meta=None, chunk_size=512):
+    """
+    Recorre un array JSON leído de un stream y devuelve sus elementos de uno
+    en uno, reduciendo cada objeto a los campos pedidos.
+
+    Args:
+        stream: Objeto con read(n) (p. ej. github_http.Response)
+        fields (tuple, opcional): Rutas de campos a conservar. Si es None se
+                                  devuelve cada elemento completo
+        items (str, opcional): Clave del objeto raíz que contiene el array
+                               (p. ej. 'tree'); None si la raíz es el array
+        meta (dict, opcional): Claves del objeto raíz cuyo valor se quiere
+                               conservar; se rellenan al leerlas
+        chunk_size (int, opcional): Bytes leídos por bloque
+
+    Yields:
+        tuple/valor: Tupla con los campos en el orden de fields, o el elemento completo
+    """
+    reader = _JsonReader(stream, chunk_size)
+    if fields is not None:
+        wanted, parents = _field_paths(fields)
+
+    def root_key():
+        # Lee la siguiente clave del objeto raíz, o None al cerrarlo
+        c = reader.next()
+        if c == _COMMA:
+            c = reader.next()
+        if c == _RBRACE:
+            return None
+        if c != _QUOTE:
+            raise ValueError('JSON inválido')
+        key = reader.read_string()
+        reader.expect(_COLON)
+        return key
+
+    if items is not None:
+        reader.expect(_LBRACE)
+        while True:
+            key = root_key()
+            if key is None:
+                return
+            if key == items and reader.peek() == _LBRACKET:
+                break
+            if meta is not None and key in meta:
+                meta[key] = reader.parse_value()
+            else:
+                reader.skip_value()
+
+    reader.expect(_LBRACKET)
+    if reader.peek() == _RBRACKET:
+        reader.pos += 1
+    else:
+        while True:
+            if fields is None:
+                yield reader.parse_value()
+            elif reader.peek() == _LBRACE:
+                reader.pos += 1
+                out = {}
+                reader.project('', wanted, parents, out)
+                yield tuple(out.get(field) for field in fields)
+            else:
+                reader.skip_value()
+            c = reader.next()
+            if c == _RBRACKET:
+                break
+            if c != _COMMA:
+                raise ValueError('JSON inválido')
+
+    # Claves del objeto raíz que van detrás del array
+    if items is not None and meta is not None:
+        while True:
+            key = root_key()
+            if key is None:
+                return
+            if key in meta:
+                meta[key] = reader.parse_value()
+            else:
+                reader.skip_value()
+
+
+# Vive en github_http, que también lo usa para las respuestas comprimidas
+gunzip_stream = github_http.gunzip_stream
+
+
+def _tar_number(field):
+    """Número de una cabecera tar: octal, o base 256 si el primer bit está activo"""
+    if field[0] & 0x80:
+        n = field[0] & 0x7f
+        for c in field[1:]:
+            n = (n << 8) | c
+        return n
+    field = bytes(field).split(b'\x00', 1)[0].strip()
+    return int(field, 8) if field else 0
+
+
+def _tar_text(field):
+    return bytes(field).split(b'\x00', 1)[0].decode('utf-8')
+
+
+def _pax_records(data):
+    """Registros 'longitud clave=valor\\n' de una cabecera pax"""
+    records = {}
+    i = 0
+    while i < len(data):
+        space = data.find(b' ', i)
+        if space < 0:
+            break
+        length = int(data[i:space])
+        if length <= 0:
+            break
+        key, _, value = data[space + 1:i + length - 1].partition(b'=')
+        records[key.decode('utf-8')] = value.decode('utf-8')
+        i += length
+    return records
+
+
+class TarReader:
+    """
+    Lector mínimo de archivos tar (ustar, pax y nombres largos GNU) que
+    avanza por el stream sin volver atrás: next() da la siguiente entrada
+    y readinto() lee su contenido por bloques.
+    """
+    # Tamaño máximo de una cabecera pax o de un nombre largo
+    MAX_HEADER = 32 * 1024
+
+    def __init__(self, stream):
+        """
+        Args:
+            stream: Stream con readinto(buf) (p. ej. gunzip_stream(respuesta))
+        """
+        self.stream = stream
+        # Cabeceras pax globales ('g'); en GitHub, 'comment' es el SHA del commit
+        self.meta = {}
+        self._block = bytearray(512)
+        self._left = 0
+        self._pad = 0
+
+    def _read_full(self, mv, eof_ok=False):
+        """
+        Llena mv. Con eof_ok, un final limpio del stream antes de leer nada
+        devuelve False; cualquier otro corte es un archivo incompleto.
+        """
+        start = len(mv)
+        while len(mv):
+            n = self.stream.readinto(mv)
+            if not n:
+                if eof_ok and len(mv) == start:
+                    return False
+                raise OSError('Archivo tar incompleto')
+            mv = mv[n:]
+        return True
+
+    def _skip(self, size):
+        mv = memoryview(self._block)
+        while size > 0:
+            n = min(size, 512)
+            self._read_full(mv[:n])
+            size -= n
+
+    def _read_data(self, size):
+        if size > self.MAX_HEADER:
+            raise OSError('Cabecera tar demasiado grande')
+        data = bytearray(size)
+        self._read_full(memoryview(data))
+        self._skip(-size % 512)
+        return bytes(data)
+
+    def next(self):
+        """
+        Avanza a la siguiente entrada (saltando lo que quede de la actual).
+
+        Returns:
+            tuple/None: (nombre, tipo, tamaño) o None al final del archivo.
+                        El tipo es '0' archivo, '5' carpeta, '2' enlace...
+        """
+        self._skip(self._left + self._pad)
+        self._left = self._pad = 0
+        pending = {}
+        block = self._block
+        while True:
+            # Algunos generadores no escriben los bloques de cierre: un final
+            # del stream justo entre bloques también termina el archivo
+            if not self._read_full(memoryview(block), True):
+                return None
+            if not any(block):
+                # Fin: dos bloques de ceros (o uno y el final del stream)
+                if self._read_full(memoryview(block), True) and any(block):
+                    raise OSError('Archivo tar corrupto')
+                # Leer el relleno hasta el final para que el descompresor
+                # compruebe el CRC y la longitud del gzip
+                while self.stream.readinto(block):
+                    pass
+                return None
+            kind = chr(block[156]) if block[156] else '0'
+            size = _tar_number(block[124:136])
+            if kind in ('x', 'g', 'L'):
+                data = self._read_data(size)
+                if kind == 'g':
+                    self.meta.update(_pax_records(data))
+                elif kind == 'x':
+                    pending.update(_pax_records(data))
+                else:
+                    pending['path'] = data.rstrip(b'\x00').decode('utf-8')
+                continue
+            name = _tar_text(block[0:100])
+            if block[257:262] == b'ustar':
+                prefix = _tar_text(block[345:500])
+                if prefix:
+                    name = prefix + '/' + name
+            name = pending.get('path', name)
+            if 'size' in pending:
+                size = int(pending['size'])
+            if kind == '7':
+                kind = '0'
+            elif kind in '123456':
+                # Enlaces, carpetas y dispositivos no llevan datos
+                size = 0
+            self._left = size
+            self._pad = -size % 512
+            return name, kind, size
+
+    def readinto(self, buf):
+        """
+        Lee parte del contenido de la entrada actual.
+
+        Returns:
+            int: Bytes leídos (0 al final de la entrada)
+        """
+        if not self._left:
+            return 0
+        mv = memoryview(buf)
+        if len(mv) > self._left:
+            mv = mv[:self._left]
+        n = self.stream.readinto(mv)
+        if not n:
+            raise OSError('Archivo tar incompleto')
+        self._left -= n
+        return n
+
+
+class BlobManifest:
+    """
+    Manifiesto persistente en flash con el SHA git de los archivos locales
+    (indexado por ruta, tamaño y mtime) y el último SHA subido a cada ruta
+    remota, para no volver a leer ni subir archivos que no han cambiado.
+    """
+    def __init__(self, path='.github_manifest.json'):
+        """
+        Args:
+            path (str, opcional): Archivo donde se guarda el manifiesto
+        """
+        self.path = path
+        self.files = {}
+        self.remote = {}
+        self._dirty = False
+        try:
+            with open(path) as f:
+                data = ujson.load(f)
+            self.files = data.get('files', {})
+            self.remote = data.get('remote', {})
+        except (OSError, ValueError):
+            pass
+
+    def local_sha(self, file_path, buf=None):
+        """
+        Devuelve el SHA git del archivo, recalculándolo solo si cambió su
+        tamaño o fecha de modificación.
+        """
+        st = os.stat(file_path)
+        entry = self.files.get(file_path)
+        if entry and entry[0] == st[6] and entry[1] == st[8]:
+            return entry[2]
+        sha = git_blob_sha(file_path, buf)
+        self.files[file_path] = [st[6], st[8], sha]
+        self._dirty = True
+        return sha
+
+    @staticmethod
+    def _key(owner, repo_name, branch, remote_path):
+        return f"{owner}/{repo_name}@{branch}:{remote_path}"
+
+    def remote_sha(self, owner, repo_name, branch, remote_path):
+        """Último SHA conocido en GitHub para una ruta remota"""
+        return self.remote.get(self._key(owner, repo_name, branch, remote_path))
+
+    def set_remote(self, owner, repo_name, branch, remote_path, sha):
+        """Registra el SHA que tiene una ruta remota tras subirla"""
+        key = self._key(owner, repo_name, branch, remote_path)
+        if sha is None:
+            if self.remote.pop(key, None) is not None:
+                self._dirty = True
+        elif self.remote.get(key) != sha:
+            self.remote[key] = sha
+            self._dirty = True
+
+    def set_local(self, file_path, sha):
+        """Registra el SHA de un archivo local recién escrito (p. ej. al descargarlo)"""
+        st = os.stat(file_path)
+        self.files[file_path] = [st[6], st[8], sha]
+        self._dirty = True
+
+    def save(self):
+        """Guarda el manifiesto si cambió (escribe un temporal y lo renombra)"""
+        if not self._dirty:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            ujson.dump({'files': self.files, 'remote': self.remote}, f)
+        replace_file(tmp, self.path)
+        self._dirty = False
+
+
+class RateLimiter:
+    """
+    Regula el ritmo de peticiones a partir de las cabeceras X-RateLimit-*
+    y Retry-After de cada respuesta.
+
+    Mientras queden más de `reserve` peticiones no añade ninguna espera; por
+    debajo reparte las restantes hasta el reinicio de la ventana, y ante un
+    403/429 por límite espera lo que indica GitHub antes de reintentar.
+    """
+    # Espera cuando GitHub corta por límite secundario sin indicar cuánto esperar
+    SECONDARY_BACKOFF = 60
+
+    def __init__(self, reserve=100, max_wait=900):
+        """
+        Args:
+            reserve (int, opcional): Peticiones restantes a partir de las cuales se espacian
+            max_wait (int, opcional): Segundos máximos a esperar antes de dar el error por bueno
+        """
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.limit = None
+        self.remaining = None
+        self._reset_at = None
+        self._blocked_until = None
+        self._backoff = self.SECONDARY_BACKOFF
+
+    def _seconds_until(self, deadline):
+        if deadline is None:
+            return 0
+        return max(0, -github_http._elapsed_ms(deadline)) / 1000
+
+    @staticmethod
+    def _is_secondary(data):
+        """True si el cuerpo de un 403 es el aviso de límite secundario de GitHub"""
+        if isinstance(data, dict):
+            data = data.get('message')
+        return isinstance(data, str) and 'secondary rate limit' in data.lower()
+
+    def _retry_after(self, headers):
+        """
+        Segundos de Retry-After (entero o fecha HTTP), o None si no se entiende.
+        """
+        value = headers.get('retry-after', '').strip()
+        try:
+            return max(0, int(value))
+        except ValueError:
+            pass
+        when = github_http.parse_http_date(value)
+        if when is None:
+            return None
+        server_now = github_http.parse_http_date(headers.get('date', ''))
+        return max(0, when - (server_now if server_now is not None else int(time.time())))
+
+    def update(self, status, headers, data=None):
+        """
+        Registra las cabeceras de una respuesta.
+
+        Args:
+            status (int): Código de estado
+            headers (dict): Cabeceras en minúsculas
+            data (opcional): Cuerpo de la respuesta, para reconocer los 403
+                             por límite secundario
+
+        Returns:
+            float/None: Segundos a esperar antes de repetir la petición si
+                        fue rechazada por límite, o None si no hay que repetirla
+        """
+        now = github_http._now_ms()
+        if 'x-ratelimit-remaining' in headers:
+            self.remaining = int(headers['x-ratelimit-remaining'])
+            self.limit = int(headers.get('x-ratelimit-limit', self.limit or 0))
+            reset = headers.get('x-ratelimit-reset')
+            if reset:
+                # Se usa la hora del servidor: el reloj del dispositivo puede no estar en hora
+                server_now = github_http.parse_http_date(headers.get('date', ''))
+                if server_now is not None:
+                    self._reset_at = now + max(0, int(reset) - server_now) * 1000
+                else:
+                    self._reset_at = now + max(0, int(reset) - int(time.time())) * 1000
+
+        if status not in (403, 429):
+            self._backoff = self.SECONDARY_BACKOFF
+            return None
+
+        wait = self._retry_after(headers) if 'retry-after' in headers else None
+        if wait is None:
+            if self.remaining == 0 and self._reset_at is not None:
+                wait = self._seconds_until(self._reset_at) + 1
+            elif status == 429 or 'retry-after' in headers or self._is_secondary(data):
+                # Límite secundario sin indicación (o ilegible): espera exponencial.
+                # La falta de X-RateLimit-* no basta (GitHub Enterprise sin
+                # límites, proxies, raw): sería esperar ante un 403 de permisos
+                wait = self._backoff
+                self._backoff *= 2
+            else:
+                # 403 por permisos, no por límite
+                return None
+        if wait > self.max_wait:
+            return None
+        self._blocked_until = now + int(wait * 1000)
+        return wait
+
+    def delay(self):
+        """
+        Segundos a esperar antes de la siguiente petición.
+        """
+        if self._blocked_until is not None:
+            wait = self._seconds_until(self._blocked_until)
+            if wait > 0:
+                return wait
+            self._blocked_until = None
+        if self.remaining is None or self.remaining > self.reserve:
+            return 0
+        until_reset = self._seconds_until(self._reset_at)
+        if self.remaining <= 0:
+            return until_reset
+        return until_reset / self.remaining
+
+    def wait(self):
+        """Espera (bloqueando) lo necesario antes de la siguiente petición"""
+        delay = self.delay()
+        if delay > 0:
+            time.sleep(delay)
+
+    def budget(self):
+        """
+        Estado actual del límite de peticiones.
+
+        Returns:
+            dict: {'limit', 'remaining', 'reset_in' (segundos), 'delay' (segundos)}
+        """
+        return {
+            'limit': self.limit,
+            'remaining': self.remaining,
+            'reset_in': self._seconds_until(self._reset_at) if self._reset_at is not None else None,
+            'delay': self.delay()
+        }
+
+    # Hooks del ejecutor de peticiones (GitHubRepoManager._request)
+
+    def before_send(self, request):
+        self.wait()
+
+    def after_response(self, request, result):
+        wait = self.update(result['status'], result['headers'], result['data'])
+        if wait is None:
+            return False
+        print(f"Límite de peticiones de GitHub alcanzado, esperando {wait} s...")
+        return True
+
+
+class ResponseCache:
+    """
+    Caché LRU de respuestas GET con revalidación condicional
+    (If-None-Match / If-Modified-Since). Guarda por URL el ETag, el
+    Last-Modified y un resultado ya reducido, de modo que una respuesta 304
+    no cuesta ni ancho de banda ni parseo (ni cuenta para el límite de GitHub).
+    """
+    def __init__(self, max_entries=16, path=None):
+        """
+        Args:
+            max_entries (int, opcional): Número máximo de URLs guardadas
+            path (str, opcional): Archivo en flash donde persistir la caché
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self._entries = {}
+        self._order = []
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        if path:
+            try:
+                with open(path) as f:
+                    data = ujson.load(f)
+                for url, entry in data:
+                    self._entries[url] = entry
+                    self._order.append(url)
+            except (OSError, ValueError):
+                pass
+
+    def get(self, url):
+        """
+        Returns:
+            list/None: [etag, last_modified, valor] o None si no está
+        """
+        entry = self._entries.get(url)
+        if entry is not None and self._order[-1] != url:
+            self._order.remove(url)
+            self._order.append(url)
+        return entry
+
+    def put(self, url, etag, last_modified, value):
+        """Guarda un resultado, expulsando la entrada usada hace más tiempo"""
+        if not etag and not last_modified:
+            return
+        if url in self._entries:
+            self._order.remove(url)
+        elif len(self._order) >= self.max_entries:
+            del self._entries[self._order.pop(0)]
+        self._entries[url] = [etag, last_modified, value]
+        self._order.append(url)
+        self._dirty = True
+
+    def clear(self):
+        self._entries = {}
+        self._order = []
+        self._dirty = True
+
+    def save(self):
+        """Persiste la caché en flash si tiene ruta y cambió"""
+        if not self.path or not self._dirty:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            ujson.dump([[url, self._entries[url]] for url in self._order], f)
+        replace_file(tmp, self.path)
+        self._dirty = False
+
+    # Hooks del ejecutor de peticiones: solo actúan si la petición tiene cache_key
+
+    def before_send(self, request):
+        key = request['cache_key']
+        if key is None:
+            return
+        entry = self.get(key)
+        request['cached'] = entry
+        if entry is not None:
+            headers = request['headers'].copy()
+            if entry[0]:
+                headers['If-None-Match'] = entry[0]
+            if entry[1]:
+                headers['If-Modified-Since'] = entry[1]
+            request['headers'] = headers
+
+    def after_response(self, request, result):
+        key = request['cache_key']
+        if key is None:
+            return False
+        entry = request.get('cached')
+        if result['status'] == 304 and entry is not None:
+            # Sin cambios: se devuelve el valor guardado como si fuera un 200
+            self.hits += 1
+            result['status'] = 200
+            result['ok'] = True
+            result['data'] = entry[2]
+        elif result['status'] == 200:
+            self.misses += 1
+            self.put(key, result['headers'].get('etag'),
+                     result['headers'].get('last-modified'), result['data'])
+        return False
+
+
+class RequestMetrics:
+    """
+    Hook de métricas para el ejecutor de peticiones: cuenta peticiones,
+    reintentos, errores y códigos de estado, y acumula el tiempo de red.
+
+    Uso: repo_manager.add_hook(RequestMetrics())
+    """
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.requests = 0
+        self.retries = 0
+        self.errors = 0
+        self.elapsed_ms = 0
+        self.statuses = {}
+
+    def before_send(self, request):
+        self.requests += 1
+        if request['attempt']:
+            self.retries += 1
+        request['started'] = github_http._now_ms()
+
+    def after_response(self, request, result):
+        self.elapsed_ms += github_http._elapsed_ms(request['started'])
+        status = result['status']
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        return False
+
+    def on_error(self, request, error):
+        self.elapsed_ms += github_http._elapsed_ms(request['started'])
+        self.errors += 1
+        return False
+
+    def summary(self):
+        """
+        Returns:
+            dict: {'requests', 'retries', 'errors', 'elapsed_ms', 'statuses'}
+        """
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': self.errors,
+            'elapsed_ms': self.elapsed_ms,
+            'statuses': self.statuses
+        }
+
+
+# SHA del blob vacío (archivos .gitkeep de las carpetas)
+EMPTY_BLOB_SHA = 'e69de29bb2d1d6434b8b29ae775ad8c2e48c5391'
+
+
+class UploadQueue:
+    """
+    Cola persistente de operaciones pendientes (subidas, carpetas y
+    borrados) para cuando no hay red.
+
+    Cada operación se añade al final de un diario en flash (una línea JSON
+    por operación), así que sobrevive a un reinicio aunque se corte la
+    corriente a mitad de escritura. En RAM solo se guarda la última
+    operación de cada ruta: si un archivo se sube diez veces sin red, al
+    volver la conexión se envía una vez, y todas las operaciones de un mismo
+    repositorio y rama van en un único commit (ver flush).
+
+    Las subidas guardan la ruta del archivo local, no su contenido: se
+    envía lo que tenga el archivo en el momento de vaciar la cola.
+    """
+    def __init__(self, path='.github_queue.jsonl'):
+        """
+        Args:
+            path (str, opcional): Archivo del diario en flash
+        """
+        self.path = path
+        # {"owner/repo@rama": {ruta_remota: ruta_local, '' (archivo vacío) o None (borrar)}}
+        self._ops = {}
+        self._load()
+
+    def _load(self):
+        try:
+            f = open(self.path)
+        except OSError:
+            return
+        with f:
+            for line in f:
+                try:
+                    op = ujson.loads(line)
+                except ValueError:
+                    # Línea cortada por un reinicio durante la escritura
+                    break
+                self._apply(op)
+
+    def _apply(self, op):
+        kind, owner, repo_name, branch, remote_path = op[:5]
+        group = self._ops.setdefault(f"{owner}/{repo_name}@{branch}", {})
+        group[remote_path] = op[5] if kind == 'put' else None
+
+    def _append(self, op):
+        self._apply(op)
+        with open(self.path, 'a') as f:
+            f.write(ujson.dumps(op) + '\n')
+
+    def put(self, owner, repo_name, branch, remote_path, local_path):
+        """Encola la subida de un archivo local (local_path '' crea un archivo vacío)"""
+        self._append(['put', owner, repo_name, branch, remote_path.lstrip('/'), local_path])
+
+    def delete(self, owner, repo_name, branch, remote_path):
+        """Encola el borrado de un archivo remoto"""
+        self._append(['del', owner, repo_name, branch, remote_path.lstrip('/')])
+
+    def mkdir(self, owner, repo_name, branch, folder_path):
+        """Encola la creación de una carpeta (un .gitkeep vacío)"""
+        folder_path = folder_path.strip('/')
+        self.put(owner, repo_name, branch, folder_path + '/.gitkeep', '')
+
+    def __len__(self):
+        return sum(len(group) for group in self._ops.values())
+
+    def pending(self):
+        """
+        Returns:
+            dict: {"owner/repo@rama": {ruta_remota: ruta_local, '' o None (borrar)}}
+        """
+        return self._ops
+
+    def save(self):
+        """Reescribe el diario solo con las operaciones pendientes (compacta)"""
+        if not self._ops:
+            remove_file(self.path)
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            for key, group in self._ops.items():
+                owner_repo, branch = key.rsplit('@', 1)
+                owner, repo_name = owner_repo.split('/', 1)
+                for remote_path, local_path in group.items():
+                    if local_path is None:
+                        op = ['del', owner, repo_name, branch, remote_path]
+                    else:
+                        op = ['put', owner, repo_name, branch, remote_path, local_path]
+                    f.write(ujson.dumps(op) + '\n')
+        replace_file(tmp, self.path)
+
+    def flush(self, manager, commit_message=None):
+        """
+        Envía las operaciones pendientes: un commit por repositorio y rama,
+        con la última versión de cada ruta. Las que fallan siguen en la cola.
+
+        Args:
+            manager (GitHubRepoManager): Cliente con el que enviarlas
+            commit_message (str, opcional): Mensaje de los commits
+
+        Returns:
+            dict: {'commits': [sha, ...], 'results': {"owner/repo@rama": resultado},
+                   'pending': operaciones que quedan en la cola}
+        """
+        commits = []
+        results = {}
+        for key in list(self._ops):
+            group = self._ops[key]
+            owner_repo, branch = key.rsplit('@', 1)
+            owner, repo_name = owner_repo.split('/', 1)
+
+            files = []
+            deletes = []
+            # Copia de los elementos: las subidas de archivos borrados se quitan del grupo
+            for remote_path, local_path in list(group.items()):
+                if local_path is None:
+                    deletes.append(remote_path)
+                    continue
+                if local_path:
+                    try:
+                        os.stat(local_path)
+                    except OSError:
+                        print(f"Cola: {local_path} ya no existe, se descarta la subida de {remote_path}")
+                        del group[remote_path]
+                        continue
+                files.append((local_path, remote_path))
+
+            if not files and not deletes:
+                if not group:
+                    del self._ops[key]
+                continue
+
+            # Los borrados de rutas que ya no existen se descartan (evita un 422)
+            tree_index = None
+            if deletes:
+                tree_index = manager.get_remote_tree(owner, repo_name, branch)
+                if tree_index is None:
+                    results[key] = {'error': f'No se pudo obtener el árbol de {branch}'}
+                    continue
+                for remote_path in deletes:
+                    if remote_path not in tree_index:
+                        del group[remote_path]
+                deletes = [p for p in deletes if p in tree_index]
+
+            result = manager._upload_files(owner, repo_name, files, branch, commit_message,
+                                           tree_index, deletes)
+            results[key] = result
+            if 'error' in result:
+                continue
+            if result['commit']:
+                commits.append(result['commit'])
+            for remote_path, status in result['results'].items():
+                if 'error' not in status:
+                    group.pop(remote_path, None)
+            if not group:
+                del self._ops[key]
+
+        self.save()
+        return {'commits': commits, 'results': results, 'pending': len(self)}
+
+
+class MemoryProfiler:
+    """
+    Mide la memoria de cada operación de GitHubRepoManager: antes de la
+    llamada, en cada bloque leído o escrito, tras cada petición y al terminar.
+    Sirve para ver qué operaciones acercan la placa a un MemoryError y para
+    dimensionar chunk_size y el tamaño de los archivos en cada placa.
+
+    En MicroPython usa gc.mem_alloc()/gc.mem_free(), que miden el heap de
+    MicroPython (el del GC). En ESP32 añade el mayor bloque libre del heap
+    de ESP-IDF (esp32.idf_heap_info), que es otro heap: el que usan la
+    pila TCP/IP y mbedTLS, y cuya fragmentación hace fallar los handshakes
+    TLS aunque el GC tenga memoria libre. En CPython recurre a tracemalloc
+    y solo mide la memoria usada.
+
+    Uso:
+        profiler = MemoryProfiler()
+        repo_manager = GitHubRepoManager(TOKEN, profiler=profiler)
+        ...
+        profiler.print_summary()
+    """
+    # Métodos públicos que se miden
+    OPERATIONS = ('create_repository', 'list_repositories', 'update_repository',
+                  'delete_repository', 'get_file_sha', 'get_remote_tree', 'upload_file',
+                  'upload_files', 'sync', 'pull', 'download_file', 'download_tree',
+                  'create_folder', 'get_repository_info', 'flush_queue')
+    # Generadores: se miden desde el primer elemento hasta agotarlos
+    GENERATORS = ('iter_repositories',)
+
+    def __init__(self, collect=True):
+        """
+        Args:
+            collect (bool, opcional): Ejecutar gc.collect() antes y después de cada
+                                      operación, para que 'retenida' mida lo que
+                                      la operación deja ocupado y no basura pendiente
+        """
+        self._gc = gc
+        self.collect = collect
+        self.stats = {}
+        self._frames = []
+        self._largest_block = None
+        self._tracemalloc = None
+        if hasattr(gc, 'mem_free'):
+            try:
+                import esp32
+                caps = esp32.HEAP_DATA
+                self._largest_block = lambda: max(h[2] for h in esp32.idf_heap_info(caps))
+            except (ImportError, AttributeError):
+                pass
+        else:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self._tracemalloc = tracemalloc
+
+    def _sample(self, peak=True):
+        """
+        Returns:
+            tuple: (bytes usados, bytes libres o None, mayor bloque libre del
+                   heap de ESP-IDF o None).
+                   En CPython, con peak=True los usados son el pico desde la
+                   medida anterior
+        """
+        if self._tracemalloc is not None:
+            current, top = self._tracemalloc.get_traced_memory()
+            if hasattr(self._tracemalloc, 'reset_peak'):
+                self._tracemalloc.reset_peak()
+            return (top if peak else current), None, None
+        largest = self._largest_block() if self._largest_block is not None else None
+        return self._gc.mem_alloc(), self._gc.mem_free(), largest
+
+    def begin(self, operation):
+        """Empieza a medir una operación (pueden anidarse)"""
+        if self.collect and not self._frames:
+            self._gc.collect()
+        if self._frames:
+            self.checkpoint()
+        used, free, block = self._sample(peak=False)
+        # [operación, usada al empezar, pico, libre mínima, bloque IDF mínimo]
+        self._frames.append([operation, used, used, free, block])
+
+    def checkpoint(self):
+        """Toma una medida intermedia para todas las operaciones en curso"""
+        if not self._frames:
+            return
+        used, free, block = self._sample()
+        for frame in self._frames:
+            if used > frame[2]:
+                frame[2] = used
+            if free is not None and (frame[3] is None or free < frame[3]):
+                frame[3] = free
+            if block is not None and (frame[4] is None or block < frame[4]):
+                frame[4] = block
+
+    def end(self, ok=True):
+        """Termina la operación en curso y acumula sus medidas"""
+        self.checkpoint()
+        operation, used_before, peak, free, block = self._frames.pop()
+        if self.collect and not self._frames:
+            self._gc.collect()
+        used_after = self._sample(peak=False)[0]
+
+        # [llamadas, errores, pico, libre mínima, bloque IDF mínimo, retenida máxima]
+        stat = self.stats.get(operation)
+        if stat is None:
+            stat = self.stats[operation] = [0, 0, 0, None, None, 0]
+        stat[0] += 1
+        if not ok:
+            stat[1] += 1
+        stat[2] = max(stat[2], peak - used_before)
+        if free is not None and (stat[3] is None or free < stat[3]):
+            stat[3] = free
+        if block is not None and (stat[4] is None or block < stat[4]):
+            stat[4] = block
+        stat[5] = max(stat[5], used_after - used_before)
+
+    def wrap(self, operation, func):
+        """Devuelve func envuelta para medir cada llamada como operation"""
+        def wrapper(*args, **kwargs):
+            self.begin(operation)
+            ok = False
+            try:
+                result = func(*args, **kwargs)
+                ok = not (isinstance(result, dict) and 'error' in result)
+                return result
+            finally:
+                self.end(ok)
+        return wrapper
+
+    def wrap_iter(self, operation, func):
+        """
+        Como wrap, para un generador: la medida abarca todo el recorrido. Si
+        se abandona sin agotarlo ni cerrarlo, la operación queda abierta
+        """
+        def wrapper(*args, **kwargs):
+            self.begin(operation)
+            ok = True
+            try:
+                for item in func(*args, **kwargs):
+                    if isinstance(item, dict) and 'error' in item:
+                        ok = False
+                    yield item
+            except Exception:
+                ok = False
+                raise
+            finally:
+                self.end(ok)
+        return wrapper
+
+    def attach(self, manager):
+        """Mide las operaciones públicas de un GitHubRepoManager y cada petición"""
+        for name in self.OPERATIONS:
+            method = getattr(manager, name, None)
+            if method is not None:
+                setattr(manager, name, self.wrap(name, method))
+        for name in self.GENERATORS:
+            method = getattr(manager, name, None)
+            if method is not None:
+                setattr(manager, name, self.wrap_iter(name, method))
+        manager.add_hook(self)
+
+    # Hook del ejecutor de peticiones: una medida tras cada respuesta
+    def after_response(self, request, result):
+        self.checkpoint()
+        return False
+
+    def summary(self):
+        """
+        Returns:
+            dict: {operación: {'calls', 'errors', 'peak', 'min_free', 'min_idf_block',
+                   'retained'}} en bytes ('peak' es lo que la operación llegó a
+                   ocupar sobre lo que había al empezar, 'min_idf_block' el menor
+                   bloque libre del heap de ESP-IDF y 'retained' lo máximo que
+                   dejó ocupado una llamada; None si no se puede medir)
+        """
+        result = {}
+        for operation, stat in self.stats.items():
+            result[operation] = {
+                'calls': stat[0],
+                'errors': stat[1],
+                'peak': stat[2],
+                'min_free': stat[3],
+                'min_idf_block': stat[4],
+                'retained': stat[5]
+            }
+        return result
+
+    def print_summary(self):
+        """Muestra una tabla con las medidas de cada operación"""
+        def cell(value):
+            return '-' if value is None else str(value)
+
+        print(f"{'Operación':<20}{'llamadas':>9}{'errores':>8}{'pico':>9}"
+              f"{'libre mín':>10}{'bloque IDF':>11}{'retenida':>9}")
+        for operation in sorted(self.stats):
+            stat = self.stats[operation]
+            print(f"{operation:<20}{stat[0]:>9}{stat[1]:>8}{stat[2]:>9}"
+                  f"{cell(stat[3]):>10}{cell(stat[4]):>11}{stat[5]:>9}")
+
 
 class GitHubRepoManager:
     """
     Cliente simplificado para gestionar repositorios en GitHub desde MicroPython
     """
-    def __init__(self, token):
+    # A partir de este tamaño los archivos se descargan desde la API de blobs
+    LARGE_FILE_SIZE = 1024 * 1024
+
+    # Memoria libre mínima para pedir gzip por defecto (la ventana de
+    # deflate ocupa 32 KB mientras se lee cada respuesta)
+    GZIP_MIN_FREE = 64 * 1024
+
+    # Campos que se conservan de cada repositorio al listarlos
+    REPO_FIELDS = ('name', 'full_name', 'private', 'description', 'html_url',
+                   'language', 'default_branch')
+
+    def __init__(self, token, chunk_size=1536, manifest=None, cache=None, hooks=None,
+                 api_base_url="https://api.github.com", profiler=None, queue=None,
+                 online=None, compress=None, timeout=github_http.DEFAULT_TIMEOUT):
         """
         Inicializa el cliente de GitHub.
         
         Args:
             token (str): Token de acceso personal de GitHub
+            chunk_size (int, opcional): Bytes leídos de flash por bloque al subir
+                                        archivos (se redondea a múltiplo de 3)
+            manifest (BlobManifest, opcional): Manifiesto para omitir archivos
+                                               que no han cambiado al subir
+            cache (ResponseCache, opcional): Caché de peticiones condicionales para
+                                             las consultas de solo lectura
+            hooks (list, opcional): Hooks adicionales del ejecutor de peticiones
+                                    (ver add_hook)
+            api_base_url (str, opcional): URL base de la API (GitHub Enterprise o un
+                                          servidor local para pruebas y benchmarks)
+            profiler (MemoryProfiler, opcional): Mide la memoria de cada operación
+            queue (UploadQueue, opcional): Cola en flash donde guardar subidas,
+                                           carpetas y borrados cuando no hay red
+            online (callable, opcional): Devuelve False si se sabe que no hay red
+                                         (p. ej. wlan.isconnected); así se encola
+                                         sin esperar a que falle la conexión
+            compress (bool, opcional): Pedir las respuestas JSON con gzip. Por
+                                       defecto se activa si hay descompresor y
+                                       al menos GZIP_MIN_FREE bytes libres
+            timeout (float, opcional): Segundos máximos que puede bloquear el
+                                       socket; al agotarse la conexión se descarta
+                                       y las peticiones idempotentes se repiten
         """
         self.token = token
-        self.api_base_url = "https://api.github.com"
+        self.api_base_url = api_base_url.rstrip('/')
+        # Múltiplo de 3 para que cada bloque se codifique en base64 sin relleno
+        self.chunk_size = max(3, chunk_size - chunk_size % 3)
+        self._io_buf = None
+        self.manifest = manifest
+        # Conexiones keep-alive reutilizadas entre llamadas
+        self.pool = github_http.ConnectionPool(timeout=timeout)
+        # Ritmo de peticiones según las cabeceras de límite de GitHub
+        self.rate_limiter = RateLimiter()
+        # Cadena de hooks por la que pasan todas las peticiones
+        self.hooks = [self.rate_limiter]
+        self._cache = None
+        self.cache = cache
+        for hook in hooks or ():
+            self.add_hook(hook)
+        self.profiler = profiler
+        if profiler is not None:
+            profiler.attach(self)
+        self.queue = queue
+        self.online = online
+        # Peticiones que fallaron por la conexión (no por la respuesta de GitHub)
+        self.link_errors = 0
+        # El enlace Wi-Fi cambió: las conexiones abiertas ya no sirven
+        self._stale_pool = False
+        # Último estado avisado por el vigilante de red (None: no hay aviso)
+        self._link_up = None
         self.headers = {
             'Authorization': f'token {token}',
             'Content-Type': 'application/json',
             'User-Agent': 'MicroPython-GitHub-Client',
             'Accept': 'application/vnd.github.v3+json'
         }
+        if compress is None:
+            compress = github_http.gzip_supported() and (
+                not hasattr(gc, 'mem_free') or gc.mem_free() >= self.GZIP_MIN_FREE)
+        if compress:
+            # Los listados y árboles JSON ocupan 5-10 veces menos comprimidos;
+            # github_http los descomprime al leerlos
+            self.headers['Accept-Encoding'] = 'gzip'
     
+    @property
+    def cache(self):
+        """Caché de consultas (ResponseCache) o None"""
+        return self._cache
+
+    @cache.setter
+    def cache(self, cache):
+        # La caché actúa como un hook más de la cadena
+        if self._cache in self.hooks:
+            self.hooks.remove(self._cache)
+        self._cache = cache
+        if cache is not None:
+            self.hooks.append(cache)
+
+    def add_hook(self, hook):
+        """
+        Añade un hook a la cadena del ejecutor de peticiones. Un hook es
+        cualquier objeto con alguno de estos métodos:
+
+            before_send(request): antes de enviar; puede cambiar request['headers']
+            after_response(request, result): con la respuesta ya leída; puede
+                modificar result y devolver True para repetir la petición
+            on_error(request, error): si falla la conexión; devuelve True para
+                reintentar
+
+        request es un dict con 'method', 'url', 'headers', 'cache_key' y
+        'attempt' (0 en el primer intento). Los hooks pueden guardar en él
+        sus propios datos entre before_send y after_response.
+
+        Returns:
+            El propio hook
+        """
+        self.hooks.append(hook)
+        return hook
+
+    def link_changed(self, connected):
+        """
+        Aviso del vigilante de red (Network.agregar_oyente) cuando el enlace
+        se cae o vuelve. Puede llegar en mitad de una petición, así que solo
+        se marca el pool y las conexiones viejas se cierran en el siguiente
+        intento del ejecutor. Se marca en los dos sentidos: un socket abierto
+        mientras el enlace estaba caído tampoco sirve al volver.
+
+        Mientras el enlace está caído, si no se dio el callback online, las
+        operaciones con cola se encolan sin intentar conectar.
+
+        Args:
+            connected (bool): True si el enlace volvió, False si se cayó
+        """
+        self._link_up = connected
+        self._stale_pool = True
+
+    def _request(self, method, url, json=None, data=None, body_length=None, headers=None,
+                 extract=None, ok=(200,), cache_key=None, retries=3):
+        """
+        Ejecutor único de peticiones a la API. Todas las llamadas pasan por
+        aquí y por la cadena de hooks (límite de peticiones, caché, métricas...).
+
+        Args:
+            method (str): Método HTTP
+            url (str): URL completa
+            json (dict, opcional): Cuerpo a enviar como JSON
+            data (bytes/str/función, opcional): Cuerpo ya preparado
+            body_length (int, opcional): Longitud del cuerpo si data es una función
+            headers (dict, opcional): Cabeceras (por defecto las de autenticación)
+            extract (callable, opcional): extract(respuesta, cabeceras) lee el cuerpo
+                                          de una respuesta correcta directamente del
+                                          socket (ver project_json / iter_json_records).
+                                          Si es None se parsea el JSON completo
+            ok (tuple, opcional): Códigos de estado que se consideran éxito
+            cache_key (str, opcional): Clave para revalidar la consulta contra la caché
+            retries (int, opcional): Repeticiones máximas que pueden pedir los hooks
+
+        Returns:
+            dict: {'status': código, 'ok': bool, 'data': valor, 'headers': cabeceras}.
+                  Si la petición no se pudo completar, 'status' es None y se añade 'error'
+        """
+        if headers is None:
+            headers = self.headers
+        if json is not None:
+            data = ujson.dumps(json)
+        request = {
+            'method': method,
+            'url': url,
+            'headers': headers,
+            'cache_key': cache_key,
+            'attempt': 0
+        }
+        while True:
+            for hook in self.hooks:
+                before_send = getattr(hook, 'before_send', None)
+                if before_send is not None:
+                    before_send(request)
+            if self._stale_pool:
+                self._stale_pool = False
+                self.pool.close()
+            try:
+                response = self.pool.request(method, url, headers=request['headers'],
+                                             body=data, body_length=body_length)
+                try:
+                    status = response.status_code
+                    if extract is not None and status in ok:
+                        value = extract(response, response.headers)
+                    elif status in (204, 304):
+                        value = None
+                    else:
+                        text = response.text
+                        try:
+                            value = ujson.loads(text)
+                        except:
+                            value = text
+                finally:
+                    response.close()
+            except Exception as e:
+                retry = False
+                for hook in self.hooks:
+                    on_error = getattr(hook, 'on_error', None)
+                    if on_error is not None and on_error(request, e):
+                        retry = True
+                # Tras un timeout la conexión ya se descartó: las peticiones
+                # idempotentes se repiten en una conexión nueva
+                if (isinstance(e, github_http.Timeout) and method not in ('POST', 'PATCH')
+                        and not hasattr(data, '__next__')):
+                    retry = True
+                if retry and request['attempt'] < retries:
+                    request['attempt'] += 1
+                    continue
+                print(f"Excepción en {method} {url}: {e}")
+                sys.print_exception(e)
+                self.link_errors += 1
+                return {'status': None, 'ok': False, 'data': None, 'headers': {},
+                        'error': f'Error en la solicitud: {e}'}
+
+            result = {'status': status, 'ok': status in ok, 'data': value,
+                      'headers': response.headers}
+            retry = False
+            for hook in self.hooks:
+                after_response = getattr(hook, 'after_response', None)
+                if after_response is not None and after_response(request, result):
+                    retry = True
+            if not retry or request['attempt'] >= retries:
+                return result
+            request['attempt'] += 1
+
+    @staticmethod
+    def _result(result, action):
+        """
+        Convierte el resultado del ejecutor en lo que devuelven los métodos
+        públicos: los datos si la petición tuvo éxito o un dict de error.
+
+        Args:
+            result (dict): Resultado de _request
+            action (str): Acción para el mensaje de error (p. ej. 'crear repositorio')
+        """
+        if 'error' in result:
+            return {'error': result['error']}
+        if result['ok']:
+            return result['data']
+        return {
+            'error': f"Error al {action}: {result['status']}",
+            'details': result['data']
+        }
+
+    def rate_limit_status(self):
+        """
+        Devuelve el presupuesto de peticiones actual (ver RateLimiter.budget).
+        """
+        return self.rate_limiter.budget()
+
+    @staticmethod
+    def _file_meta(response, headers=None):
+        """
+        Lee de la respuesta de /contents solo los metadatos que se usan (el
+        contenido en base64 se salta sin cargarlo), compartidos por
+        get_file_sha y download_file.
+        """
+        data = project_json(response, ('type', 'sha', 'size', 'download_url'))
+        if data is None:
+            # Es un directorio: la API devuelve una lista
+            return {'type': 'dir', 'sha': None, 'size': 0, 'download_url': None}
+        return {
+            'type': data[0],
+            'sha': data[1],
+            'size': data[2] or 0,
+            'download_url': data[3]
+        }
+
+    def _offline(self):
+        """True si hay cola y se sabe de antemano que no hay red"""
+        if self.queue is None:
+            return False
+        if self.online is not None:
+            return not self.online()
+        return self._link_up is False
+
+    def _enqueue(self, owner, repo_name, branch, files=(), deletes=()):
+        """Guarda operaciones en la cola offline"""
+        for local_path, remote_path in files:
+            self.queue.put(owner, repo_name, branch, remote_path, local_path or '')
+        for remote_path in deletes or ():
+            self.queue.delete(owner, repo_name, branch, remote_path)
+        print(f"Sin conexión: operación guardada en la cola ({len(self.queue)} pendientes)")
+        return {'queued': True, 'pending': len(self.queue)}
+
+    def flush_queue(self, commit_message=None):
+        """
+        Envía las operaciones de la cola offline en el menor número de
+        commits posible (ver UploadQueue.flush).
+
+        Returns:
+            dict: Resultado de UploadQueue.flush, o None si no hay cola o está vacía
+        """
+        if self.queue is None or not len(self.queue):
+            return None
+        if commit_message is None:
+            commit_message = "Enviar cambios pendientes desde MicroPython"
+        return self.queue.flush(self, commit_message)
+
+    def close(self):
+        """Cierra las conexiones abiertas con GitHub y guarda las cachés"""
+        self.pool.close()
+        if self.cache is not None:
+            self.cache.save()
+        (self.pool.dns or github_http.resolver).save()
+
     def create_repository(self, repo_name, description=None, private=False, auto_init=True):
         """
         Crea un nuevo repositorio en GitHub.
@@ -35,7 +1800,6 @@ class GitHubRepoManager:
         Returns:
             dict: Respuesta de la API de GitHub o información de error
         """
-        # Preparar datos para la API - usar diccionario con claves entre comillas
         data = {
             "name": repo_name,
             "private": private,
@@ -44,98 +1808,78 @@ class GitHubRepoManager:
         if description:
             data["description"] = description
 
-        # Convertir a JSON con ujson
-        json_data = ujson.dumps(data)
-
-        # Construimos una copia de las cabeceras y fijamos la longitud
-        headers = self.headers.copy()
-        headers['Content-Length'] = str(len(json_data))
+        result = self._request('POST', f"{self.api_base_url}/user/repos",
+                               json=data, ok=(200, 201))
+        print(f"Código de respuesta: {result['status']}")
+        return self._result(result, 'crear repositorio')
 
-        url = f"{self.api_base_url}/user/repos"
-        try:
-            response = urequests.post(
-                url,
-                headers=headers,
-                data=json_data
-            )
-            
-            print(f"Código de respuesta: {response.status_code}")
+    def iter_repositories(self, username=None, per_page=100, fields=None):
+        """
+        Recorre los repositorios página a página (siguiendo la cabecera Link
+        rel="next") y los devuelve de uno en uno, con memoria constante.
+        
+        Args:
+            username (str, opcional): Usuario específico cuyos repositorios se quieren listar
+                                     Si es None, lista los repositorios del usuario autenticado
+            per_page (int, opcional): Repositorios por página (máximo 100)
+            fields (tuple, opcional): Campos a leer (p. ej. ("name", "owner.login")).
+                                      Si se indica se devuelven tuplas en ese orden
+        
+        Yields:
+            dict/tuple: Repositorio (dict con los campos de REPO_FIELDS, o tupla con
+                        los de fields). Si hay un error se devuelve un único dict
+                        con la clave 'error' y se termina
+        """
+        if username:
+            url = f"{self.api_base_url}/users/{username}/repos?per_page={per_page}"
+        else:
+            url = f"{self.api_base_url}/user/repos?per_page={per_page}"
+        
+        as_tuples = fields is not None
+        if not as_tuples:
+            fields = self.REPO_FIELDS
+        else:
+            fields = tuple(fields)
+        
+        def extract(response, headers):
+            # Solo se guardan tuplas con los campos pedidos, leídas del socket
+            return [list(iter_json_records(response, fields)),
+                    github_http.next_link(headers.get('link'))]
+        
+        while url:
+            print(f"Listando repositorios: {url}")
+            # La caché distingue la proyección para no mezclar campos
+            result = self._request('GET', url, extract=extract,
+                                   cache_key=url + '#' + ','.join(fields) if as_tuples else url)
+            page = self._result(result, 'listar repositorios')
+            if not result['ok']:
+                yield page
+                return
             
-            if response.status_code in (200, 201):
-                result = ujson.loads(response.text)
-                response.close()
-                return result
-            else:
-                try:
-                    error_info = ujson.loads(response.text)
-                    response.close()
-                    return {
-                        'error': f'Error al crear repositorio: {response.status_code}',
-                        'details': error_info
-                    }
-                except:
-                    error_text = response.text
-                    response.close()
-                    return {
-                        'error': f'Error al crear repositorio: {response.status_code}',
-                        'details': error_text
-                    }
-                
-        except Exception as e:
-            print(f"Excepción al crear repositorio: {e}")
-            import sys
-            sys.print_exception(e)
-            return {'error': f'Error en la solicitud: {e}'}
+            repos, url = page
+            page = result = None
+            for repo in repos:
+                yield repo if as_tuples else dict(zip(fields, repo))
+            repos = None
     
     def list_repositories(self, username=None):
         """
-        Lista los repositorios del usuario.
+        Lista todos los repositorios del usuario (todas las páginas).
         
         Args:
             username (str, opcional): Usuario específico cuyos repositorios se quieren listar
                                      Si es None, lista los repositorios del usuario autenticado
         
         Returns:
-            list/dict: Lista de repositorios o información de error
+            list/dict: Lista de repositorios (solo con los campos de REPO_FIELDS)
+                       o información de error
         """
-        try:
-            if username:
-                url = f"{self.api_base_url}/users/{username}/repos"
-            else:
-                url = f"{self.api_base_url}/user/repos"
-            
-            print(f"Listando repositorios: {url}")
-            
-            response = urequests.get(
-                url,
-                headers=self.headers
-            )
-            
-            if response.status_code == 200:
-                repos = ujson.loads(response.text)
-                response.close()
-                return repos
-            else:
-                try:
-                    error_info = ujson.loads(response.text)
-                    response.close()
-                    return {
-                        'error': f'Error al listar repositorios: {response.status_code}',
-                        'details': error_info
-                    }
-                except:
-                    error_text = response.text
-                    response.close()
-                    return {
-                        'error': f'Error al listar repositorios: {response.status_code}',
-                        'details': error_text
-                    }
-                
-        except Exception as e:
-            print(f"Excepción al listar repositorios: {e}")
-            import sys
-            sys.print_exception(e)
-            return {'error': f'Error en la solicitud: {e}'}
+        repos = []
+        for repo in self.iter_repositories(username):
+            if 'error' in repo:
+                return repo
+            repos.append(repo)
+        return repos
     
     def update_repository(self, owner, repo_name, new_name=None, description=None, private=None):
         """
@@ -165,86 +1909,19 @@ class GitHubRepoManager:
         if not data:
             return {'error': 'No se especificaron cambios'}
         
-        try:
-            json_data = ujson.dumps(data)
-            
-            url = f"{self.api_base_url}/repos/{owner}/{repo_name}"
-            
-            response = urequests.patch(
-                url,
-                headers=self.headers,
-                data=json_data
-            )
-            
-            if response.status_code == 200:
-                result = ujson.loads(response.text)
-                response.close()
-                return result
-            else:
-                try:
-                    error_info = ujson.loads(response.text)
-                    response.close()
-                    return {
-                        'error': f'Error al actualizar repositorio: {response.status_code}',
-                        'details': error_info
-                    }
-                except:
-                    error_text = response.text
-                    response.close()
-                    return {
-                        'error': f'Error al actualizar repositorio: {response.status_code}',
-                        'details': error_text
-                    }
-                
-        except Exception as e:
-            print(f"Excepción al actualizar repositorio: {e}")
-            import sys
-            sys.print_exception(e)
-            return {'error': f'Error en la solicitud: {e}'}
-    
+        result = self._request('PATCH', f"{self.api_base_url}/repos/{owner}/{repo_name}", json=data)
+        return self._result(result, 'actualizar repositorio')
+
     def delete_repository(self, owner, repo_name):
         """
         Elimina un repositorio.
         """
-        try:
-            url = f"{self.api_base_url}/repos/{owner}/{repo_name}"
-
-            # Copiamos las cabeceras y forzamos Content-Length: 0
-            headers = self.headers.copy()
-            headers['Content-Length'] = '0'
-
-            response = urequests.delete(
-                url,
-                headers=headers,
-                data=b''  # Mandar data vacío
-            )
-
-            if response.status_code == 204:  # No Content = éxito
-                response.close()
-                return {'success': True, 'message': 'Repositorio eliminado correctamente'}
-            else:
-                try:
-                    error_info = ujson.loads(response.text)
-                    response.close()
-                    return {
-                        'error': f'Error al eliminar repositorio: {response.status_code}',
-                        'details': error_info
-                    }
-                except:
-                    error_text = response.text
-                    response.close()
-                    return {
-                        'error': f'Error al eliminar repositorio: {response.status_code}',
-                        'details': error_text
-                    }
-
-        except Exception as e:
-            print(f"Excepción al eliminar repositorio: {e}")
-            import sys
-            sys.print_exception(e)
-            return {'error': f'Error en la solicitud: {e}'}
+        result = self._request('DELETE', f"{self.api_base_url}/repos/{owner}/{repo_name}",
+                               data=b'', ok=(204,))  # 204 No Content = éxito
+        if result['ok']:
+            return {'success': True, 'message': 'Repositorio eliminado correctamente'}
+        return self._result(result, 'eliminar repositorio')
 
-            
     def get_file_sha(self, owner, repo_name, file_path):
         """
         Obtiene el SHA de un archivo en el repositorio.
@@ -261,29 +1938,69 @@ class GitHubRepoManager:
         if file_path.startswith('/'):
             file_path = file_path[1:]
             
-        try:
-            url = f"{self.api_base_url}/repos/{owner}/{repo_name}/contents/{file_path}"
-            
-            response = urequests.get(
-                url,
-                headers=self.headers
-            )
-            
-            if response.status_code == 200:
-                data = ujson.loads(response.text)
-                sha = data.get('sha')
-                response.close()
-                return sha
-            else:
-                # Si el archivo no existe, simplemente retornar None
-                response.close()
-                return None
-                
-        except Exception as e:
-            print(f"Error al obtener SHA: {e}")
+        url = f"{self.api_base_url}/repos/{owner}/{repo_name}/contents/{file_path}"
+        result = self._request('GET', url, extract=self._file_meta, cache_key=url)
+        
+        # Si el archivo no existe, simplemente retornar None
+        return result['data']['sha'] if result['ok'] else None
+
+    def get_remote_tree(self, owner, repo_name, branch="main"):
+        """
+        Obtiene en una sola petición el SHA de todos los archivos de una rama
+        (GET /git/trees/{rama}?recursive=1), sin descargar su contenido.
+
+        Args:
+            owner (str): Propietario del repositorio
+            repo_name (str): Nombre del repositorio
+            branch (str, opcional): Rama o SHA del árbol
+
+        Returns:
+            dict/None: Índice {ruta: sha} de los archivos, o None si hay error
+        """
+        meta = {'truncated': False}
+
+        def read_tree(response, headers):
+            # El árbol se lee entrada a entrada sin cargar el JSON completo
+            index = {}
+            for path, kind, sha in iter_json_records(
+                    response, ('path', 'type', 'sha'), items='tree', meta=meta):
+                if kind == 'blob':
+                    index[path] = sha
+            return index
+
+        url = f"{self.api_base_url}/repos/{owner}/{repo_name}/git/trees/{branch}?recursive=1"
+        result = self._request('GET', url, extract=read_tree)
+        if not result['ok']:
+            print(f"Error al obtener el árbol de {branch}: {result['status']}")
             return None
-            
-    def upload_file(self, owner, repo_name, file_path, remote_path=None, commit_message=None):
+        if meta['truncated']:
+            print("Advertencia: el árbol remoto está truncado, faltan archivos en el índice")
+        return result['data']
+
+    def _is_unchanged(self, owner, repo_name, branch, local_path, remote_path, tree_index):
+        """
+        Comprueba si un archivo local ya está en GitHub con el mismo contenido,
+        usando el índice del árbol remoto si se da o, si no, el manifiesto.
+
+        Returns:
+            tuple: (sin cambios, sha local o None si no se calculó)
+        """
+        if tree_index is None and self.manifest is None:
+            return False, None
+        if self.manifest is not None:
+            local_sha = self.manifest.local_sha(local_path, self._buffer())
+        else:
+            local_sha = git_blob_sha(local_path, self._buffer())
+        if tree_index is not None:
+            remote_sha = tree_index.get(remote_path)
+            if self.manifest is not None:
+                self.manifest.set_remote(owner, repo_name, branch, remote_path, remote_sha)
+        else:
+            remote_sha = self.manifest.remote_sha(owner, repo_name, branch, remote_path)
+        return local_sha == remote_sha, local_sha
+
+    def upload_file(self, owner, repo_name, file_path, remote_path=None, commit_message=None,
+                    tree_index=None):
         """
         Sube un archivo al repositorio.
         
@@ -293,15 +2010,15 @@ class GitHubRepoManager:
             file_path (str): Ruta local del archivo
             remote_path (str, opcional): Ruta remota donde guardar el archivo
             commit_message (str, opcional): Mensaje del commit
+            tree_index (dict, opcional): Índice {ruta: sha} de get_remote_tree;
+                                         evita consultar el SHA remoto del archivo
             
         Returns:
-            dict: Respuesta de la API de GitHub o información de error
+            dict: Respuesta de la API de GitHub o información de error.
+                  Si el archivo no cambió, {'skipped': True, 'content': {...}}
         """
-        import ubinascii
-        
         # Si no se especifica ruta remota, usar el nombre del archivo
         if remote_path is None:
-            import os
             # Obtener solo el nombre del archivo sin el path
             if '/' in file_path:
                 remote_path = file_path.split('/')[-1]
@@ -316,68 +2033,914 @@ class GitHubRepoManager:
         if commit_message is None:
             commit_message = f"Subir {remote_path} desde MicroPython"
             
+        if self._offline():
+            return self._enqueue(owner, repo_name, "main", [(file_path, remote_path)])
+            
         try:
-            # Leer el archivo
-            with open(file_path, 'rb') as f:
-                content = f.read()
-                
-            # Codificar en base64
-            content_base64 = ubinascii.b2a_base64(content).decode('utf-8').strip()
+            # No hacer nada si el contenido ya está en GitHub
+            unchanged, local_sha = self._is_unchanged(owner, repo_name, "main", file_path,
+                                                      remote_path, tree_index)
+            if unchanged:
+                if self.manifest is not None:
+                    self.manifest.save()
+                return {'skipped': True, 'content': {'path': remote_path, 'sha': local_sha}}
             
             # Verificar si el archivo ya existe para obtener su SHA
-            sha = self.get_file_sha(owner, repo_name, remote_path)
+            if tree_index is not None:
+                sha = tree_index.get(remote_path)
+            else:
+                sha = self.get_file_sha(owner, repo_name, remote_path)
+            
+            if local_sha is not None and sha == local_sha:
+                self.manifest.set_remote(owner, repo_name, "main", remote_path, sha)
+                self.manifest.save()
+                return {'skipped': True, 'content': {'path': remote_path, 'sha': sha}}
             
-            # Preparar datos para la API
+            # Preparar datos para la API (el contenido se añade en streaming)
             data = {
                 "message": commit_message,
-                "content": content_base64,
                 "branch": "main"  # <- Cambiar aquí"branch": "main"
             }
             
             # Si el archivo ya existe, incluir su SHA
             if sha:
                 data["sha"] = sha
-                
-            # Convertir a JSON
-            json_data = ujson.dumps(data)
             
             # URL para subir el archivo
             url = f"{self.api_base_url}/repos/{owner}/{repo_name}/contents/{remote_path}"
             
-            # Enviar solicitud
-            response = urequests.put(
-                url,
-                headers=self.headers,
-                data=json_data
-            )
-            
-            if response.status_code in (200, 201):
-                result = ujson.loads(response.text)
-                response.close()
-                return result
-            else:
-                try:
-                    error_info = ujson.loads(response.text)
-                    response.close()
-                    return {
-                        'error': f'Error al subir archivo: {response.status_code}',
-                        'details': error_info
-                    }
-                except:
-                    error_text = response.text
-                    response.close()
-                    return {
-                        'error': f'Error al subir archivo: {response.status_code}',
-                        'details': error_text
-                    }
+            # Enviar solicitud leyendo y codificando el archivo por bloques
+            link_errors = self.link_errors
+            result = self._send_file_json('PUT', url, data, file_path, ok=(200, 201))
+            if self.queue is not None and self.link_errors > link_errors:
+                return self._enqueue(owner, repo_name, "main", [(file_path, remote_path)])
+            if result['ok'] and self.manifest is not None:
+                self.manifest.set_remote(owner, repo_name, "main", remote_path,
+                                         result['data'].get('content', {}).get('sha'))
+                self.manifest.save()
+            return self._result(result, 'subir archivo')
                 
         except Exception as e:
             print(f"Excepción al subir archivo: {e}")
-            import sys
             sys.print_exception(e)
             return {'error': f'Error en la solicitud: {e}'}
-    
-    def download_file(self, owner, repo_name, remote_path, local_path=None):
+
+    def _send_file_json(self, method, url, data, file_path, ok=(200,)):
+        """
+        Envía un cuerpo JSON con el archivo en base64 escrito por bloques
+        directamente en el socket.
+
+        Args:
+            method (str): Método HTTP
+            url (str): URL completa del endpoint
+            data (dict): Resto de campos del JSON
+            file_path (str): Ruta local del archivo
+            ok (tuple, opcional): Códigos de estado que se consideran éxito
+
+        Returns:
+            dict: Resultado de _request
+        """
+        on_chunk = self.profiler.checkpoint if self.profiler is not None else None
+        body, length = file_json_body(data, file_path, self._buffer(), on_chunk)
+        return self._request(method, url, data=body, body_length=length, ok=ok)
+
+    def _branch_head(self, repo_url, branch):
+        """
+        Obtiene el commit y el árbol actuales de una rama en una sola petición.
+
+        Returns:
+            dict: {'commit': sha, 'tree': sha} o información de error. Si la rama
+                  no existe (o el repositorio está vacío) ambos valores son None
+        """
+        result = self._request('GET', f"{repo_url}/branches/{branch}")
+        branch_info = self._result(result, f'obtener la rama {branch}')
+        if result.get('status') in (404, 409):
+            return {'commit': None, 'tree': None}
+        if not result['ok']:
+            return branch_info
+        return {
+            'commit': branch_info['commit']['sha'],
+            'tree': branch_info['commit']['commit']['tree']['sha']
+        }
+
+    def _first_commit(self, repo_url, branch, local_path, remote_path, commit_message):
+        """
+        Crea el primer commit de un repositorio vacío con la API de contenidos:
+        la API de datos Git no acepta blobs hasta que existe algún commit.
+
+        Returns:
+            dict: {'commit': sha, 'tree': sha, 'sha': sha_del_blob} o información de error
+        """
+        url = f"{repo_url}/contents/{remote_path}"
+        data = {"message": commit_message, "branch": branch}
+        result = self._send_file_json('PUT', url, data, local_path, ok=(201,))
+        created = self._result(result, 'crear el primer commit')
+        if not result['ok']:
+            return created
+        return {
+            'commit': created['commit']['sha'],
+            'tree': created['commit']['tree']['sha'],
+            'sha': created['content']['sha']
+        }
+
+    def upload_files(self, owner, repo_name, files, branch="main", commit_message=None,
+                     tree_index=None, deletes=None):
+        """
+        Sube varios archivos en un único commit usando la API Git Data
+        (blobs -> tree -> commit -> ref).
+
+        Cuesta N+4 peticiones para N archivos en lugar de dos peticiones y un
+        commit por archivo. Con manifiesto o índice del árbol remoto, los
+        archivos sin cambios no generan ninguna petición. Si hay cola offline
+        y falla la conexión, lo que no llegó a GitHub se guarda en la cola.
+
+        Args:
+            owner (str): Propietario del repositorio
+            repo_name (str): Nombre del repositorio
+            files (iterable): Pares (ruta_local, ruta_remota). Una ruta local
+                              vacía crea un archivo vacío (p. ej. .gitkeep)
+            branch (str, opcional): Rama a actualizar
+            commit_message (str, opcional): Mensaje del commit
+            tree_index (dict, opcional): Índice {ruta: sha} de get_remote_tree para
+                                         omitir archivos idénticos a los remotos
+            deletes (list, opcional): Rutas remotas a eliminar en el mismo commit
+
+        Returns:
+            dict: {'commit': sha, 'results': {ruta_remota: resultado}} o información de error.
+                  Cada resultado es {'sha': sha_del_blob}, {'sha': ..., 'skipped': True},
+                  {'deleted': True} o {'error': ...}. 'commit' es None si no había cambios.
+                  Sin red y con cola: {'queued': True, 'pending': n}
+        """
+        if self.queue is None:
+            return self._upload_files(owner, repo_name, files, branch, commit_message,
+                                      tree_index, deletes)
+        if self._offline():
+            return self._enqueue(owner, repo_name, branch, files, deletes)
+
+        # Anotar en flash (no en RAM) los pares leídos para poder encolarlos
+        # si se corta la red a mitad de la subida
+        seen_path = self.queue.path + '.seen'
+        seen = open(seen_path, 'w')
+
+        def tracked():
+            for pair in files:
+                seen.write(ujson.dumps(pair) + '\n')
+                yield pair
+
+        def read_seen():
+            with open(seen_path) as f:
+                for line in f:
+                    yield ujson.loads(line)
+
+        pairs = tracked()
+        link_errors = self.link_errors
+        try:
+            result = self._upload_files(owner, repo_name, pairs, branch, commit_message,
+                                        tree_index, deletes)
+            if self.link_errors == link_errors:
+                return result
+            if 'error' in result:
+                # No se creó el commit: se encola todo
+                for pair in pairs:
+                    pass
+                seen.close()
+                queued = self._enqueue(owner, repo_name, branch, read_seen(), deletes)
+            else:
+                # Commit creado sin algunos archivos: se encolan solo esos
+                seen.close()
+                failed = [(l, r) for l, r in read_seen()
+                          if 'error' in result['results'].get(r.lstrip('/'), {})]
+                if not failed:
+                    return result
+                queued = self._enqueue(owner, repo_name, branch, failed)
+            result.update(queued)
+            return result
+        finally:
+            seen.close()
+            remove_file(seen_path)
+
+    def _upload_files(self, owner, repo_name, files, branch="main", commit_message=None,
+                      tree_index=None, deletes=None):
+        """
+        Implementación de upload_files, sin la cola offline.
+
+        Args:
+            owner (str): Propietario del repositorio
+            repo_name (str): Nombre del repositorio
+            files (iterable): Pares (ruta_local, ruta_remota)
+            branch (str, opcional): Rama a actualizar
+            commit_message (str, opcional): Mensaje del commit
+            tree_index (dict, opcional): Índice {ruta: sha} de get_remote_tree para
+                                         omitir archivos idénticos a los remotos
+            deletes (list, opcional): Rutas remotas a eliminar en el mismo commit
+
+        Returns:
+            dict: {'commit': sha, 'results': {ruta_remota: resultado}} o información de error.
+                  Cada resultado es {'sha': sha_del_blob}, {'sha': ..., 'skipped': True},
+                  {'deleted': True} o {'error': ...}. 'commit' es None si no había cambios
+        """
+        repo_url = f"{self.api_base_url}/repos/{owner}/{repo_name}"
+        results = {}
+
+        try:
+            # Crear un blob por archivo
+            head = None
+            first_commit = None
+            tree = []
+            for local_path, remote_path in files:
+                if remote_path.startswith('/'):
+                    remote_path = remote_path[1:]
+                if not local_path:
+                    # Archivo vacío: va en el propio árbol, sin crear blob
+                    if tree_index is not None and tree_index.get(remote_path) == EMPTY_BLOB_SHA:
+                        results[remote_path] = {'sha': EMPTY_BLOB_SHA, 'skipped': True}
+                        continue
+                    tree.append({
+                        "path": remote_path,
+                        "mode": "100644",
+                        "type": "blob",
+                        "content": ""
+                    })
+                    results[remote_path] = {'sha': EMPTY_BLOB_SHA}
+                    continue
+                try:
+                    # Omitir archivos cuyo contenido ya está en GitHub
+                    unchanged, local_sha = self._is_unchanged(owner, repo_name, branch, local_path,
+                                                              remote_path, tree_index)
+                    if unchanged:
+                        results[remote_path] = {'sha': local_sha, 'skipped': True}
+                        continue
+
+                    # Commit y árbol actuales de la rama en una sola petición
+                    if head is None:
+                        head = self._branch_head(repo_url, branch)
+                        if 'error' in head:
+                            head['results'] = results
+                            return head
+
+                    result = self._send_file_json('POST', f"{repo_url}/git/blobs", {
+                        "encoding": "base64"
+                    }, local_path, ok=(201,))
+                    if result.get('status') == 409 and head['commit'] is None:
+                        # Repositorio vacío: este archivo crea la rama y los demás
+                        # se añaden encima en el commit final
+                        head = self._first_commit(repo_url, branch, local_path, remote_path,
+                                                  commit_message or f"Subir {remote_path} desde MicroPython")
+                        if 'error' in head:
+                            head['results'] = results
+                            return head
+                        first_commit = head['commit']
+                        results[remote_path] = {'sha': head['sha']}
+                        if self.manifest is not None:
+                            self.manifest.set_remote(owner, repo_name, branch, remote_path, head['sha'])
+                        continue
+                    blob = self._result(result, 'crear blob')
+                    if result['ok']:
+                        tree.append({
+                            "path": remote_path,
+                            "mode": "100644",
+                            "type": "blob",
+                            "sha": blob['sha']
+                        })
+                        results[remote_path] = {'sha': blob['sha']}
+                    else:
+                        results[remote_path] = blob
+                except Exception as e:
+                    print(f"Excepción al crear blob de {local_path}: {e}")
+                    results[remote_path] = {'error': f'Error en la solicitud: {e}'}
+
+            if self.manifest is not None:
+                self.manifest.save()
+
+            # Nada que subir: todos los archivos estaban al día
+            uploaded = len(tree)
+
+            # Borrados: entradas con sha nulo sobre el árbol base. La rama se
+            # consulta aquí si aún no se hizo (p. ej. solo había archivos vacíos)
+            if deletes or (tree and head is None):
+                if head is None:
+                    head = self._branch_head(repo_url, branch)
+                    if 'error' in head:
+                        head['results'] = results
+                        return head
+                # Sin árbol base no hay nada que eliminar
+                for remote_path in deletes if head['tree'] else ():
+                    tree.append({
+                        "path": remote_path,
+                        "mode": "100644",
+                        "type": "blob",
+                        "sha": None
+                    })
+                    results[remote_path] = {'deleted': True}
+
+            if not tree and all(r.get('skipped') for r in results.values()):
+                return {'commit': None, 'results': results}
+
+            # El primer commit del repositorio vacío ya contenía todo
+            if not tree and first_commit is not None:
+                if self.manifest is not None:
+                    self.manifest.save()
+                return {'commit': first_commit, 'results': results}
+
+            if not tree:
+                return {'error': 'No se pudo subir ningún archivo', 'results': results}
+
+            # Crear el árbol sobre el de la rama actual (si la rama existe)
+            new_tree = {"tree": tree}
+            if head['tree']:
+                new_tree["base_tree"] = head['tree']
+            result = self._request('POST', f"{repo_url}/git/trees", json=new_tree, ok=(201,))
+            new_tree = self._result(result, 'crear árbol')
+            if not result['ok']:
+                new_tree['results'] = results
+                return new_tree
+
+            if commit_message is None:
+                commit_message = f"Subir {uploaded} archivos desde MicroPython"
+                if deletes:
+                    commit_message += f" y eliminar {len(deletes)}"
+
+            # Crear el commit
+            result = self._request('POST', f"{repo_url}/git/commits", json={
+                "message": commit_message,
+                "tree": new_tree['sha'],
+                "parents": [head['commit']] if head['commit'] else []
+            }, ok=(201,))
+            commit = self._result(result, 'crear commit')
+            if not result['ok']:
+                commit['results'] = results
+                return commit
+
+            # Mover la rama al nuevo commit, o crearla si aún no existía
+            if head['commit']:
+                result = self._request('PATCH', f"{repo_url}/git/refs/heads/{branch}", json={
+                    "sha": commit['sha']
+                })
+            else:
+                result = self._request('POST', f"{repo_url}/git/refs", json={
+                    "ref": f"refs/heads/{branch}",
+                    "sha": commit['sha']
+                }, ok=(201,))
+            ref = self._result(result, f'actualizar la rama {branch}')
+            if not result['ok']:
+                ref['results'] = results
+                return ref
+
+            if self.manifest is not None:
+                for entry in tree:
+                    self.manifest.set_remote(owner, repo_name, branch, entry['path'],
+                                             entry.get('sha', EMPTY_BLOB_SHA))
+                self.manifest.save()
+
+            return {'commit': commit['sha'], 'results': results}
+
+        except Exception as e:
+            print(f"Excepción al subir archivos: {e}")
+            sys.print_exception(e)
+            return {'error': f'Error en la solicitud: {e}', 'results': results}
+
+    def sync(self, owner, repo_name, local_dir, remote_prefix="", branch="main",
+             dry_run=False, exclude=None, commit_message=None):
+        """
+        Sincroniza una ruta del repositorio con un directorio local (como rsync
+        --delete): sube archivos nuevos o modificados y elimina los que ya no
+        existen en local, todo en un único commit.
+
+        Args:
+            owner (str): Propietario del repositorio
+            repo_name (str): Nombre del repositorio
+            local_dir (str): Directorio local de origen
+            remote_prefix (str, opcional): Carpeta del repositorio a sincronizar ('' = raíz)
+            branch (str, opcional): Rama a actualizar
+            dry_run (bool, opcional): Solo calcular e imprimir los cambios
+            exclude (list, opcional): Patrones estilo .gitignore a ignorar en ambos lados.
+                                      Si es None se usa el .gitignore de local_dir si existe
+            commit_message (str, opcional): Mensaje del commit
+
+        Returns:
+            dict: {'added': [...], 'modified': [...], 'deleted': [...], 'commit': sha/None,
+                   'results': {...}} o información de error
+        """
+        local_dir = local_dir.rstrip('/')
+        remote_prefix = remote_prefix.strip('/')
+        if remote_prefix:
+            remote_prefix += '/'
+        if exclude is None:
+            exclude = load_exclude_patterns(local_dir + '/.gitignore')
+
+        index = self.get_remote_tree(owner, repo_name, branch)
+        if index is None:
+            return {'error': 'No se pudo obtener el árbol remoto'}
+
+        # Archivos remotos bajo el prefijo que no están excluidos
+        remote = {}
+        for path, sha in index.items():
+            if path.startswith(remote_prefix):
+                rel = path[len(remote_prefix):]
+                if not is_excluded(rel, exclude):
+                    remote[path] = sha
+
+        added = []
+        modified = []
+        changed = []
+        try:
+            for rel, _, _ in walk_files(local_dir):
+                if is_excluded(rel, exclude):
+                    continue
+                remote_path = remote_prefix + rel
+                in_remote = remote.pop(remote_path, None) is not None
+                unchanged, _ = self._is_unchanged(owner, repo_name, branch, local_dir + '/' + rel,
+                                                  remote_path, index)
+                if unchanged:
+                    continue
+                (modified if in_remote else added).append(remote_path)
+                changed.append((local_dir + '/' + rel, remote_path))
+        except OSError as e:
+            return {'error': f"Error al leer el directorio '{local_dir}': {e}"}
+        deleted = list(remote)
+        remote = None
+        index = None
+        if self.manifest is not None:
+            self.manifest.save()
+
+        plan = {'added': added, 'modified': modified, 'deleted': deleted}
+        prefix = '[dry-run] ' if dry_run else ''
+        for label, paths in (('+', added), ('M', modified), ('-', deleted)):
+            for path in paths:
+                print(f"{prefix}{label} {path}")
+        print(f"{prefix}Nuevos: {len(added)}, Modificados: {len(modified)}, Eliminados: {len(deleted)}")
+
+        if dry_run or not (changed or deleted):
+            plan['commit'] = None
+            plan['results'] = {}
+            return plan
+
+        if commit_message is None:
+            commit_message = (f"Sincronizar {remote_prefix or '/'} desde MicroPython "
+                              f"(+{len(added)} ~{len(modified)} -{len(deleted)})")
+
+        # tree_index=None: los SHA remotos ya se anotaron en el manifiesto al
+        # comparar arriba, así que upload_files solo repite la comparación con
+        # las sumas guardadas (sin leer los archivos ni hacer peticiones); sin
+        # manifiesto no compara nada
+        result = self.upload_files(owner, repo_name, changed, branch=branch,
+                                   commit_message=commit_message, deletes=deleted)
+        result.update(plan)
+        return result
+
+    # Diario del pull en curso dentro de la carpeta de staging
+    PULL_JOURNAL = 'journal.json'
+
+    def pull(self, owner, repo_name, local_dir, remote_prefix="", branch="main",
+             dry_run=False, exclude=None, staging_dir='.github_staging'):
+        """
+        Actualiza un directorio local desde el repositorio (p. ej. el código
+        del dispositivo) descargando solo lo que cambió: compara el SHA git de
+        cada archivo local (del manifiesto) con el árbol remoto, descarga los
+        blobs nuevos o modificados a staging_dir verificando su SHA y después
+        los mueve a su sitio y borra los que ya no están en el repositorio.
+
+        Mientras se descarga no se toca ningún archivo, y lo ya descargado se
+        reutiliza si hay que repetir el pull. Los cambios se aplican siguiendo
+        un diario en flash: si se cortan a mitad, se completan en la siguiente
+        llamada o con recover_pull. Solo se borran archivos que vinieron del
+        repositorio y no se han modificado en el dispositivo.
+
+        Args:
+            owner (str): Propietario del repositorio
+            repo_name (str): Nombre del repositorio
+            local_dir (str): Directorio local a actualizar
+            remote_prefix (str, opcional): Carpeta del repositorio ('' = raíz)
+            branch (str, opcional): Rama de la que actualizar
+            dry_run (bool, opcional): Solo calcular e imprimir los cambios
+            exclude (list, opcional): Patrones estilo .gitignore a ignorar.
+                                      Si es None se usa el .gitignore de local_dir si existe
+            staging_dir (str, opcional): Carpeta temporal de las descargas
+
+        Returns:
+            dict: {'added': [...], 'modified': [...], 'deleted': [...],
+                   'bytes': bytes descargados} o información de error
+        """
+        if self.manifest is None:
+            return {'error': 'pull necesita un BlobManifest para comparar los archivos locales'}
+        self.recover_pull(staging_dir)
+
+        base = '' if local_dir in ('', '.') else local_dir.rstrip('/') + '/'
+        remote_prefix = remote_prefix.strip('/')
+        if remote_prefix:
+            remote_prefix += '/'
+        if exclude is None:
+            exclude = load_exclude_patterns(base + '.gitignore')
+        buf = self._buffer()
+
+        index = self.get_remote_tree(owner, repo_name, branch)
+        if index is None:
+            return {'error': 'No se pudo obtener el árbol remoto'}
+
+        def current_sha(path):
+            try:
+                return self.manifest.local_sha(path, buf)
+            except OSError:
+                return None
+
+        added = []
+        modified = []
+        fetch = []
+        remote = set()
+        for path, sha in index.items():
+            if not path.startswith(remote_prefix):
+                continue
+            rel = path[len(remote_prefix):]
+            if is_excluded(rel, exclude):
+                continue
+            remote.add(path)
+            local_sha = current_sha(base + rel)
+            if local_sha == sha:
+                self.manifest.set_remote(owner, repo_name, branch, path, sha)
+                continue
+            (modified if local_sha else added).append(path)
+            fetch.append((path, sha, base + rel))
+        index = None
+
+        # Archivos que vinieron del repositorio y ya no están en él
+        deleted = []
+        deletes = []
+        key_start = len(BlobManifest._key(owner, repo_name, branch, ''))
+        key_prefix = BlobManifest._key(owner, repo_name, branch, remote_prefix)
+        for key, sha in list(self.manifest.remote.items()):
+            path = key[key_start:]
+            if not key.startswith(key_prefix) or path in remote:
+                continue
+            rel = path[len(remote_prefix):]
+            if is_excluded(rel, exclude):
+                continue
+            local_sha = current_sha(base + rel)
+            if local_sha == sha:
+                deleted.append(path)
+                deletes.append([base + rel, path])
+            else:
+                # Ya no existe o se modificó en el dispositivo: se deja como está
+                self.manifest.set_remote(owner, repo_name, branch, path, None)
+        remote = None
+
+        plan = {'added': added, 'modified': modified, 'deleted': deleted, 'bytes': 0}
+        prefix = '[dry-run] ' if dry_run else ''
+        for label, paths in (('+', added), ('M', modified), ('-', deleted)):
+            for path in paths:
+                print(f"{prefix}{label} {path}")
+        print(f"{prefix}Nuevos: {len(added)}, Modificados: {len(modified)}, Eliminados: {len(deleted)}")
+        if dry_run or not (fetch or deletes):
+            self.manifest.save()
+            return plan
+
+        # 1. Descargar a staging (cada blob con su SHA como nombre) y verificar
+        make_dirs(staging_dir)
+        headers = self._raw_headers('application/vnd.github.raw')
+        for path, sha, _ in fetch:
+            staged = f"{staging_dir}/{sha}"
+            try:
+                if git_blob_sha(staged, buf) == sha:
+                    continue
+            except OSError:
+                pass
+            url = f"{self.api_base_url}/repos/{owner}/{repo_name}/git/blobs/{sha}"
+            result = self._download_to(url, headers, staged)
+            if result is not True:
+                self.manifest.save()
+                return {'error': f"Error al descargar {path}: {result['error']}"}
+            if git_blob_sha(staged, buf) != sha:
+                remove_file(staged)
+                self.manifest.save()
+                return {'error': f"El contenido descargado de {path} no coincide con su SHA"}
+            plan['bytes'] += os.stat(staged)[6]
+
+        # 2. Escribir el diario de forma atómica y aplicar los cambios
+        journal = {
+            'repo': [owner, repo_name, branch],
+            'moves': [[f"{staging_dir}/{sha}", target, path, sha] for path, sha, target in fetch],
+            'deletes': deletes
+        }
+        fetch = None
+        journal_path = f"{staging_dir}/{self.PULL_JOURNAL}"
+        with open(journal_path + '.tmp', 'w') as f:
+            ujson.dump(journal, f)
+        replace_file(journal_path + '.tmp', journal_path)
+        self._apply_pull(journal, staging_dir)
+        return plan
+
+    def recover_pull(self, staging_dir='.github_staging'):
+        """
+        Completa un pull que se cortó mientras aplicaba los cambios. Conviene
+        llamarlo al arrancar, antes de importar el código actualizado.
+
+        Returns:
+            bool: True si había un pull pendiente y se completó
+        """
+        try:
+            with open(f"{staging_dir}/{self.PULL_JOURNAL}") as f:
+                journal = ujson.load(f)
+        except (OSError, ValueError):
+            return False
+        print("Completando una actualización interrumpida...")
+        self._apply_pull(journal, staging_dir)
+        return True
+
+    def _apply_pull(self, journal, staging_dir):
+        """
+        Aplica el diario de un pull. Se puede repetir sin problema: los
+        archivos que ya se movieron no están en staging y se saltan.
+        """
+        owner, repo_name, branch = journal['repo']
+        moves = journal['moves']
+        # Un mismo blob puede ir a varias rutas: se copia salvo en la última
+        last = {}
+        for i, move in enumerate(moves):
+            last[move[0]] = i
+        buf = self._buffer()
+        mv = memoryview(buf)
+        for i, (staged, target, _, _) in enumerate(moves):
+            try:
+                os.stat(staged)
+            except OSError:
+                continue
+            if '/' in target:
+                make_dirs(target.rsplit('/', 1)[0])
+            if last[staged] == i:
+                replace_file(staged, target)
+            else:
+                with open(staged, 'rb') as src, open(target + '.tmp', 'wb') as dst:
+                    while True:
+                        n = src.readinto(buf)
+                        if not n:
+                            break
+                        dst.write(mv[:n])
+                replace_file(target + '.tmp', target)
+        for target, _ in journal['deletes']:
+            remove_file(target)
+
+        if self.manifest is not None:
+            for _, target, path, sha in moves:
+                try:
+                    self.manifest.set_local(target, sha)
+                except OSError:
+                    pass
+                self.manifest.set_remote(owner, repo_name, branch, path, sha)
+            for _, path in journal['deletes']:
+                self.manifest.set_remote(owner, repo_name, branch, path, None)
+            self.manifest.save()
+
+        # El pull queda completo al borrar el diario; después se limpia staging
+        remove_file(f"{staging_dir}/{self.PULL_JOURNAL}")
+        try:
+            for name in os.listdir(staging_dir):
+                remove_file(f"{staging_dir}/{name}")
+            os.rmdir(staging_dir)
+        except OSError:
+            pass
+
+    def _checkpoint(self):
+        """Medida de memoria en un límite de bloque (si hay MemoryProfiler)"""
+        if self.profiler is not None:
+            self.profiler.checkpoint()
+
+    def _buffer(self):
+        """Devuelve el buffer de E/S reutilizable (se crea una sola vez)"""
+        if self._io_buf is None:
+            self._io_buf = bytearray(self.chunk_size)
+        return self._io_buf
+
+    def _write_body(self, response, f):
+        """
+        Copia el cuerpo de una respuesta a un archivo por bloques.
+
+        Returns:
+            bool: True si se recibió el cuerpo completo
+        """
+        buf = self._buffer()
+        mv = memoryview(buf)
+        while True:
+            n = response.readinto(buf)
+            if not n:
+                return True
+            f.write(mv[:n])
+            self._checkpoint()
+
+    def _write_base64_field(self, response, field, f):
+        """
+        Busca un campo string base64 en una respuesta JSON y escribe su
+        contenido decodificado en un archivo a medida que llegan los datos.
+
+        Args:
+            response (github_http.Response): Respuesta con el JSON
+            field (str): Nombre del campo (p. ej. 'content')
+            f (file): Archivo abierto en modo binario
+
+        Returns:
+            bool: True si se encontró y decodificó el campo completo
+        """
+        buf = self._buffer()
+        marker = b'"' + field.encode('utf-8') + b'"'
+        data = b''
+
+        # Buscar el inicio del valor: "campo" : "
+        while True:
+            n = response.readinto(buf)
+            if not n:
+                return False
+            data += buf[:n]
+            i = data.find(marker)
+            if i < 0:
+                data = data[-len(marker):]
+                continue
+            j = data.find(b'"', i + len(marker))
+            if j >= 0:
+                data = data[j + 1:]
+                break
+            data = data[i:]
+
+        # Decodificar en múltiplos de 4 caracteres, quitando los \n escapados
+        pending = b''
+        while True:
+            end = data.find(b'"')
+            if end >= 0:
+                data = data[:end]
+            if data.endswith(b'\\') and end < 0:
+                # Escape partido entre dos bloques
+                data, carry = data[:-1], b'\\'
+            else:
+                carry = b''
+            data = pending + data.replace(b'\\n', b'').replace(b'\\/', b'/')
+            usable = len(data) - len(data) % 4
+            if usable:
+                f.write(ubinascii.a2b_base64(data[:usable]))
+            pending = data[usable:]
+            self._checkpoint()
+            if end >= 0:
+                return not pending
+            n = response.readinto(buf)
+            if not n:
+                return False
+            data = carry + buf[:n]
+
+    def _raw_headers(self, accept=None):
+        """
+        Cabeceras para descargar contenido tal cual, sin Accept-Encoding:
+        Range y los tamaños se refieren a los bytes del archivo, no a los
+        comprimidos (y un tarball ya viene comprimido).
+        """
+        headers = dict(self.headers)
+        headers.pop('Accept-Encoding', None)
+        if accept:
+            headers['Accept'] = accept
+        return headers
+
+    def _get(self, url, headers, extract, ok=(200,), max_redirects=3):
+        """
+        GET que sigue las redirecciones (tarballs, repositorios renombrados).
+        Al cambiar de host se quita el token de headers.
+
+        Returns:
+            tuple: (resultado de _request, URL final)
+        """
+        for _ in range(max_redirects + 1):
+            result = self._request('GET', url, headers=headers, extract=extract, ok=ok)
+            location = result['headers'].get('location')
+            if result['status'] not in (301, 302, 303, 307, 308) or not location:
+                break
+            if github_http.parse_url(location)[1] != github_http.parse_url(url)[1]:
+                headers.pop('Authorization', None)
+            url = location
+        return result, url
+
+    def _download_to(self, url, headers, local_path, resume=True, raw=False, attempts=3):
+        """
+        Descarga el cuerpo de url en local_path a través de local_path + '.tmp'.
+
+        Si la transferencia se corta, se pide el resto con Range desde lo que
+        ya tiene el temporal, con If-Range y el ETag de la respuesta para no
+        mezclar dos versiones del archivo (si cambió, llega entero). Si se
+        agotan los intentos, el temporal y su ETag ('.tmp.etag') se conservan
+        para que la siguiente llamada continúe donde se quedó. Si una respuesta
+        206 no empieza donde termina el temporal, este se descarta y la
+        descarga se repite una vez completa, sin Range.
+
+        Args:
+            url (str): URL del contenido
+            headers (dict): Cabeceras de la petición
+            local_path (str): Ruta local de destino
+            resume (bool, opcional): Reanudar descargas interrumpidas
+            raw (bool, opcional): La URL es /contents con el tipo raw; una
+                                  respuesta JSON significa que es un directorio
+            attempts (int, opcional): Reanudaciones dentro de esta llamada
+
+        Returns:
+            bool/dict: True si éxito, diccionario con error si falla
+        """
+        tmp_path = local_path + '.tmp'
+        tag_path = tmp_path + '.etag'
+        headers = dict(headers)
+        state = {'etag': None, 'offset': 0, 'dir': False, 'restart': False}
+        restarted = False
+        if resume:
+            try:
+                with open(tag_path) as f:
+                    state['etag'] = f.read().strip()
+                state['offset'] = os.stat(tmp_path)[6]
+            except OSError:
+                state['etag'] = None
+                state['offset'] = 0
+
+        def set_range():
+            # Las cabeceras son las mismas que ven los reintentos de los hooks
+            if state['etag'] and state['offset']:
+                headers['Range'] = f"bytes={state['offset']}-"
+                headers['If-Range'] = state['etag']
+            else:
+                headers.pop('Range', None)
+                headers.pop('If-Range', None)
+
+        def write(response, response_headers):
+            if raw and response_headers.get('content-type', '').startswith('application/json'):
+                state['dir'] = True
+                return False
+            partial = response.status_code == 206
+            if partial and not response_headers.get('content-range', '').startswith(
+                    f"bytes {state['offset']}-"):
+                # El rango no encaja con el temporal: no se puede continuar
+                state['restart'] = True
+                state['etag'] = None
+                state['offset'] = 0
+                remove_file(tmp_path)
+                remove_file(tag_path)
+                set_range()
+                return False
+            etag = response_headers.get('etag')
+            # Un ETag débil (W/) no sirve para If-Range
+            state['etag'] = etag if resume and etag and not etag.startswith('W/') else None
+            try:
+                with open(tmp_path, 'ab' if partial else 'wb') as f:
+                    return self._write_body(response, f)
+            finally:
+                try:
+                    state['offset'] = os.stat(tmp_path)[6]
+                except OSError:
+                    state['offset'] = 0
+                set_range()
+
+        while True:
+            set_range()
+            result, url = self._get(url, headers, write, ok=(200, 206))
+            status = result['status']
+            if state['restart']:
+                state['restart'] = False
+                if restarted:
+                    result = {'status': status, 'ok': False, 'data': None,
+                              'error': 'El servidor no respetó el rango pedido'}
+                    break
+                restarted = True
+                print("Rango de la respuesta inesperado, descargando desde el inicio...")
+                continue
+            if status == 416 and state['offset']:
+                # El temporal ya está completo o es de otra versión del archivo
+                if result['headers'].get('content-range') == f"bytes */{state['offset']}":
+                    result = {'status': 200, 'ok': True, 'data': True, 'headers': {}}
+                    break
+                remove_file(tmp_path)
+                state['etag'] = None
+                state['offset'] = 0
+            elif not (status is None and state['etag'] and state['offset']):
+                break
+            if attempts <= 0:
+                break
+            attempts -= 1
+            if state['offset']:
+                print(f"Descarga interrumpida en {state['offset']} bytes, reanudando...")
+
+        if result['ok'] and result['data']:
+            remove_file(tag_path)
+            replace_file(tmp_path, local_path)
+            return True
+
+        if status is None and state['etag'] and state['offset']:
+            # Guardar el ETag para reanudar en la siguiente llamada
+            try:
+                with open(tag_path, 'w') as f:
+                    f.write(state['etag'])
+            except OSError:
+                pass
+        else:
+            remove_file(tmp_path)
+            remove_file(tag_path)
+        if state['dir']:
+            return {'error': 'El path proporcionado no es un archivo'}
+        if 'error' in result:
+            return {'error': result['error']}
+        if not result['ok']:
+            return {'error': f"Error al descargar archivo: {status}"}
+        return {'error': 'Descarga incompleta'}
+
+    def download_file(self, owner, repo_name, remote_path, local_path=None, raw=True,
+                      resume=True):
         """
         Descarga un archivo del repositorio.
         
@@ -386,6 +2949,10 @@ class GitHubRepoManager:
             repo_name (str): Nombre del repositorio
             remote_path (str): Ruta del archivo en el repositorio
             local_path (str, opcional): Ruta local donde guardar el archivo
+            raw (bool, opcional): Pedir el contenido directamente a /contents
+                                  (Accept: application/vnd.github.raw), en una sola
+                                  petición. Con False se consultan antes los metadatos
+            resume (bool, opcional): Reanudar con Range las descargas interrumpidas
             
         Returns:
             bool/dict: True si éxito, diccionario con error si falla
@@ -402,64 +2969,140 @@ class GitHubRepoManager:
         if remote_path.startswith('/'):
             remote_path = remote_path[1:]
             
-        try:
-            # URL para obtener información del archivo
-            url = f"{self.api_base_url}/repos/{owner}/{repo_name}/contents/{remote_path}"
-            
-            # Obtener metadatos del archivo
-            response = urequests.get(
-                url,
-                headers=self.headers
-            )
-            
-            if response.status_code == 200:
-                file_info = ujson.loads(response.text)
-                response.close()
-                
-                # Verificar que es un archivo
-                if file_info.get('type') != 'file':
-                    return {'error': 'El path proporcionado no es un archivo'}
-                
-                # Obtener la URL de descarga directa
-                download_url = file_info.get('download_url')
-                
-                if not download_url:
-                    return {'error': 'No se pudo obtener la URL de descarga'}
-                
-                # Descargar el contenido del archivo
-                download_response = urequests.get(download_url)
-                
-                if download_response.status_code == 200:
-                    # Guardar el archivo localmente
-                    with open(local_path, 'wb') as f:
-                        f.write(download_response.content)
-                        
-                    download_response.close()
-                    return True
-                else:
-                    download_response.close()
-                    return {'error': f'Error al descargar archivo: {download_response.status_code}'}
-            else:
+        url = f"{self.api_base_url}/repos/{owner}/{repo_name}/contents/{remote_path}"
+        if raw:
+            headers = self._raw_headers('application/vnd.github.raw')
+            return self._download_to(url, headers, local_path, resume, raw=True)
+
+        # Obtener metadatos del archivo (sin guardar el contenido en caché)
+        result = self._request('GET', url, extract=self._file_meta, cache_key=url)
+        file_info = self._result(result, 'obtener información del archivo')
+        if not result['ok']:
+            return file_info
+        
+        # Verificar que es un archivo
+        if file_info.get('type') != 'file':
+            return {'error': 'El path proporcionado no es un archivo'}
+        
+        if file_info.get('size', 0) <= self.LARGE_FILE_SIZE:
+            # Obtener la URL de descarga directa
+            url = file_info.get('download_url')
+            if not url:
+                return {'error': 'No se pudo obtener la URL de descarga'}
+            return self._download_to(url, {}, local_path, resume)
+
+        # Archivos grandes: descargar el blob y decodificar base64 en streaming
+        url = f"{self.api_base_url}/repos/{owner}/{repo_name}/git/blobs/{file_info['sha']}"
+        file_info = None
+        
+        # Escribir por bloques en un temporal y reemplazar al terminar
+        tmp_path = local_path + '.tmp'
+        
+        def write(response, headers):
+            with open(tmp_path, 'wb') as f:
+                return self._write_base64_field(response, 'content', f)
+        
+        result = self._request('GET', url, extract=write)
+        if not result['ok']:
+            remove_file(tmp_path)
+            if 'error' in result:
+                return {'error': result['error']}
+            return {'error': f"Error al descargar archivo: {result['status']}"}
+        
+        if not result['data']:
+            remove_file(tmp_path)
+            return {'error': 'Descarga incompleta'}
+        
+        replace_file(tmp_path, local_path)
+        return True
+
+    def download_tree(self, owner, repo_name, ref=None, remote_prefix='', local_dir='.'):
+        """
+        Descarga todo el repositorio o una carpeta en una sola petición:
+        pide el tarball de ref, lo descomprime al vuelo y escribe en flash
+        las entradas que están bajo remote_prefix, sin guardar el archivo
+        comprimido. La memoria es constante (ventana de deflate y un buffer).
+
+        Args:
+            owner (str): Propietario del repositorio
+            repo_name (str): Nombre del repositorio
+            ref (str, opcional): Rama, etiqueta o commit (por defecto la rama principal)
+            remote_prefix (str, opcional): Carpeta del repositorio a descargar
+                                           (por defecto todo)
+            local_dir (str, opcional): Carpeta local donde escribirla
+
+        Returns:
+            dict: {'files': archivos escritos, 'bytes': bytes escritos,
+                   'commit': SHA del commit descargado} o información de error
+        """
+        url = f"{self.api_base_url}/repos/{owner}/{repo_name}/tarball"
+        if ref:
+            url += '/' + ref
+        prefix = remote_prefix.strip('/')
+        if prefix:
+            prefix += '/'
+        if local_dir in ('', '.'):
+            base = ''
+        else:
+            base = local_dir.rstrip('/') + '/'
+        stats = {'files': 0, 'bytes': 0}
+
+        def extract(response, headers):
+            buf = self._buffer()
+            mv = memoryview(buf)
+            tar = TarReader(gunzip_stream(response))
+            while True:
+                entry = tar.next()
+                if entry is None:
+                    break
+                name, kind, size = entry
+                if kind not in ('0', '5'):
+                    continue
+                # GitHub mete todo en una carpeta <owner>-<repo>-<sha>/
+                rel = name.split('/', 1)[1] if '/' in name else ''
+                if not rel.startswith(prefix):
+                    continue
+                rel = rel[len(prefix):].strip('/')
+                if not rel or '..' in rel.split('/'):
+                    continue
+                path = base + rel
+                if kind == '5':
+                    make_dirs(path)
+                    continue
+                if '/' in path:
+                    make_dirs(path.rsplit('/', 1)[0])
+                h = hashlib.sha1(('blob %d\x00' % size).encode())
+                tmp_path = path + '.tmp'
                 try:
-                    error_info = ujson.loads(response.text)
-                    response.close()
-                    return {
-                        'error': f'Error al obtener información del archivo: {response.status_code}',
-                        'details': error_info
-                    }
+                    with open(tmp_path, 'wb') as f:
+                        while True:
+                            n = tar.readinto(buf)
+                            if not n:
+                                break
+                            f.write(mv[:n])
+                            h.update(mv[:n])
+                            self._checkpoint()
                 except:
-                    error_text = response.text
-                    response.close()
-                    return {
-                        'error': f'Error al obtener información del archivo: {response.status_code}',
-                        'details': error_text
-                    }
-                
-        except Exception as e:
-            print(f"Excepción al descargar archivo: {e}")
-            import sys
-            sys.print_exception(e)
-            return {'error': f'Error en la solicitud: {e}'}
+                    # Stream cortado o corrupto: no dejar el archivo a medias
+                    remove_file(tmp_path)
+                    raise
+                replace_file(tmp_path, path)
+                if self.manifest is not None:
+                    self.manifest.set_local(path, ubinascii.hexlify(h.digest()).decode())
+                stats['files'] += 1
+                stats['bytes'] += size
+            return tar.meta.get('comment')
+
+        result, _ = self._get(url, self._raw_headers(), extract)
+        if self.manifest is not None:
+            self.manifest.save()
+        if not result['ok']:
+            if 'error' in result:
+                return {'error': result['error']}
+            return {'error': f"Error al descargar el repositorio: {result['status']}",
+                    'details': result['data']}
+        stats['commit'] = result['data']
+        return stats
 
     def create_folder(self, owner, repo_name, folder_path, commit_message=None):
         """
@@ -474,7 +3117,6 @@ class GitHubRepoManager:
         Returns:
             dict: Respuesta de la API de GitHub o información de error
         """
-        import ubinascii
         
         # Asegurarse de que no haya barra al inicio
         if folder_path.startswith('/'):
@@ -491,52 +3133,23 @@ class GitHubRepoManager:
         if commit_message is None:
             commit_message = f"Crear carpeta {folder_path} desde MicroPython"
             
-        try:
-            # Preparar datos para la API - contenido vacío para .gitkeep
-            data = {
-                "message": commit_message,
-                "content": ubinascii.b2a_base64(b"").decode('utf-8').strip(),
-                "branch": "main"
-            }
-                
-            # Convertir a JSON
-            json_data = ujson.dumps(data)
-            
-            # URL para crear el archivo
-            url = f"{self.api_base_url}/repos/{owner}/{repo_name}/contents/{file_path}"
-            
-            # Enviar solicitud
-            response = urequests.put(
-                url,
-                headers=self.headers,
-                data=json_data
-            )
-            
-            if response.status_code in (200, 201):
-                result = ujson.loads(response.text)
-                response.close()
-                return result
-            else:
-                try:
-                    error_info = ujson.loads(response.text)
-                    response.close()
-                    return {
-                        'error': f'Error al crear carpeta: {response.status_code}',
-                        'details': error_info
-                    }
-                except:
-                    error_text = response.text
-                    response.close()
-                    return {
-                        'error': f'Error al crear carpeta: {response.status_code}',
-                        'details': error_text
-                    }
-                
-        except Exception as e:
-            print(f"Excepción al crear carpeta: {e}")
-            import sys
-            sys.print_exception(e)
-            return {'error': f'Error en la solicitud: {e}'}
+        if self._offline():
+            return self._enqueue(owner, repo_name, "main", [('', file_path)])
+        
+        # Preparar datos para la API - contenido vacío para .gitkeep
+        data = {
+            "message": commit_message,
+            "content": ubinascii.b2a_base64(b"").decode('utf-8').strip(),
+            "branch": "main"
+        }
+        
+        # URL para crear el archivo
+        url = f"{self.api_base_url}/repos/{owner}/{repo_name}/contents/{file_path}"
+        
+        result = self._request('PUT', url, json=data, ok=(200, 201))
+        if self.queue is not None and result['status'] is None:
+            return self._enqueue(owner, repo_name, "main", [('', file_path)])
+        return self._result(result, 'crear carpeta')
     
     def get_repository_info(self, owner, repo_name):
         """
@@ -549,36 +3162,7 @@ class GitHubRepoManager:
         Returns:
             dict: Información del repositorio o error
         """
-        try:
-            url = f"{self.api_base_url}/repos/{owner}/{repo_name}"
-            
-            response = urequests.get(
-                url,
-                headers=self.headers
-            )
-            
-            if response.status_code == 200:
-                result = ujson.loads(response.text)
-                response.close()
-                return result
-            else:
-                try:
-                    error_info = ujson.loads(response.text)
-                    response.close()
-                    return {
-                        'error': f'Error al obtener información del repositorio: {response.status_code}',
-                        'details': error_info
-                    }
-                except:
-                    error_text = response.text
-                    response.close()
-                    return {
-                        'error': f'Error al obtener información del repositorio: {response.status_code}',
-                        'details': error_text
-                    }
-                
-        except Exception as e:
-            print(f"Excepción al obtener información del repositorio: {e}")
-            import sys
-            sys.print_exception(e)
-            return {'error': f'Error en la solicitud: {e}'}
\ No newline at end of file
+        url = f"{self.api_base_url}/repos/{owner}/{repo_name}"
+        result = self._request('GET', url, cache_key=url)
+        return self._result(result, 'obtener información del repositorio')
+
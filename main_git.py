@@ -1,13 +1,25 @@
 # main_git.py
-from github_lib import GitHubRepoManager
+# Importar este módulo no conecta la red ni crea el gestor: eso lo hace
+# iniciar(), que llama main()
+from github_lib import (GitHubRepoManager, BlobManifest, ResponseCache,
+                        UploadQueue, MemoryProfiler, walk_files)
 import time
-import sys
 import os
 from network_iot import Network
-import ubinascii
+import github_http
 import ujson
 import gc
 
+try:
+    from time import ticks_ms, ticks_diff
+except ImportError:
+    # CPython (pruebas y benchmarks)
+    def ticks_ms():
+        return int(time.time() * 1000)
+
+    def ticks_diff(a, b):
+        return a - b
+
 # Configuración de red Wi-Fi
 ssid = ""
 password = ""
@@ -16,24 +28,89 @@ static_ip_config = None
 # Carpeta por defecto para subir archivos
 CARPETA_PROYECTO = "proyecto"
 
-# Conectar a la red
-net = Network(ssid, password, static_ip_config)
-if not net.conectar():
-    print("Error al conectar la red. Saliendo...")
-    sys.exit()
-
-print("Conexión establecida.")
+# Caché DNS de api.github.com y raw.githubusercontent.com persistida en flash
+# entre reinicios (se precarga al conectar)
+CACHE_DNS = ".dns_cache.json"
 
 # Configuración
 TOKEN = ""  # Reemplaza con tu token real
 
-# Crear instancia del gestor
-repo_manager = GitHubRepoManager(TOKEN)
+# Manifiesto con los SHA de los archivos ya subidos
+MANIFIESTO = ".github_manifest.json"
+
+# Caché de consultas (ETag) persistida en flash entre ejecuciones
+CACHE_CONSULTAS = ".github_cache.json"
+
+# Cola en flash de subidas, carpetas y borrados hechos sin red
+COLA_PENDIENTES = ".github_queue.jsonl"
+
+# Resultado del modo por lotes: una línea JSON por trabajo y un resumen final
+REGISTRO_TRABAJOS = "trabajos_resultado.jsonl"
+
+# Medir la memoria de cada operación (útil para ajustar buffers en cada placa)
+PERFIL_MEMORIA = False
+
+# Red, gestor y perfil de memoria; los crea iniciar()
+net = None
+repo_manager = None
+perfil = None
+
+
+def crear_gestor(red=None, **opciones):
+    """
+    Crea el GitHubRepoManager con la configuración de este archivo
+    (manifiesto, caché de consultas, cola y perfil de memoria).
+
+    Args:
+        red (Network): Si se indica, el gestor sigue el estado de su enlace
+        **opciones: Argumentos extra para GitHubRepoManager (p. ej. api_base_url)
+
+    Returns:
+        GitHubRepoManager: Gestor listo para usar
+    """
+    profiler = None
+    if PERFIL_MEMORIA:
+        profiler = MemoryProfiler()
+    gestor = GitHubRepoManager(
+        TOKEN,
+        manifest=BlobManifest(MANIFIESTO),
+        cache=ResponseCache(path=CACHE_CONSULTAS),
+        profiler=profiler,
+        queue=UploadQueue(COLA_PENDIENTES),
+        online=red.wlan.isconnected if red is not None else None,
+        **opciones
+    )
+    if red is not None:
+        # El vigilante restablece la Wi-Fi en segundo plano: el gestor descarta
+        # las conexiones viejas y las peticiones en curso esperan al enlace y
+        # se repiten
+        red.agregar_oyente(gestor.link_changed)
+        gestor.add_hook(red)
+    return gestor
+
+
+def iniciar():
+    """
+    Conecta la Wi-Fi y crea el gestor (rellena net, repo_manager y perfil).
+    Sin red el programa sigue: las subidas se guardan en la cola y se envían
+    cuando vuelve la conexión.
+    """
+    global net, repo_manager, perfil
+    github_http.resolver = github_http.Resolver(path=CACHE_DNS)
+    net = Network(ssid, password, static_ip_config, resolver_dns=github_http.resolver)
+    if net.conectar():
+        print("Conexión establecida.")
+    else:
+        print("Error al conectar la red. Las subidas se guardarán en la cola pendiente.")
+    repo_manager = crear_gestor(net)
+    perfil = repo_manager.profiler
+    net.iniciar_vigilancia()
 
 # Función mejorada para subir archivos a un repositorio
 def subir_archivos(owner, repo_name, directorio_local=CARPETA_PROYECTO):
     """
-    Sube todos los archivos de un directorio al repositorio usando el método upload_file
+    Sube todos los archivos de un directorio y sus subdirectorios al repositorio
+    en un único commit usando el método upload_files
     
     Args:
         owner (str): Propietario del repositorio
@@ -47,59 +124,76 @@ def subir_archivos(owner, repo_name, directorio_local=CARPETA_PROYECTO):
         if not directorio_local.endswith('/'):
             directorio_local += '/'
             
-        archivos = os.listdir(directorio_local)
-        print(f"Encontrados {len(archivos)} elementos en '{directorio_local}'")
+        # Comprobar que el directorio existe antes de recorrerlo
+        os.stat(directorio_local)
+        
+        # Obtener de una vez el SHA de todos los archivos remotos
+        print("Consultando el árbol remoto...")
+        indice = repo_manager.get_remote_tree(owner, repo_name)
         
-        # Contar éxitos y errores
+        print("Subiendo archivos (incluidas subcarpetas) en un único commit...")
+        
+        # Recorrer el árbol local de forma perezosa conservando las rutas relativas
+        pendientes = (
+            (directorio_local + ruta, ruta)
+            for ruta, tamano, mtime in walk_files(directorio_local)
+        )
+        
+        # Usar el método upload_files de la clase GitHubRepoManager
+        resultado = repo_manager.upload_files(
+            owner=owner,
+            repo_name=repo_name,
+            files=pendientes,
+            commit_message=f"Subiendo {directorio_local} desde MicroPython",
+            tree_index=indice
+        )
+        
+        # Contar éxitos, omitidos y errores
         subidos = 0
+        omitidos = 0
         errores = 0
         
-        for archivo in archivos:
-            ruta_local = directorio_local + archivo
-            
-            # Verificar si es un archivo (no directorio)
-            try:
-                es_directorio = os.stat(ruta_local)[0] & 0x4000 != 0
-                if es_directorio:
-                    print(f"Omitiendo directorio: {archivo}")
-                    continue
-                    
-                print(f"Subiendo {ruta_local}...")
-                
-                # Usar el método upload_file de la clase GitHubRepoManager
-                resultado = repo_manager.upload_file(
-                    owner=owner,
-                    repo_name=repo_name,
-                    file_path=ruta_local,
-                    remote_path=archivo,
-                    commit_message=f"Subiendo {archivo} desde MicroPython"
-                )
-                
-                if 'error' in resultado:
-                    print(f"Error al subir {archivo}: {resultado['error']}")
-                    if 'details' in resultado:
-                        if isinstance(resultado['details'], dict) and 'message' in resultado['details']:
-                            print(f"Detalles: {resultado['details']['message']}")
-                        else:
-                            print(f"Detalles: {resultado['details']}")
-                    errores += 1
-                else:
-                    print(f"Archivo {archivo} subido correctamente")
-                    subidos += 1
-                
-                # Liberar memoria
-                gc.collect()
-                
-                # Esperar entre subidas para no sobrecargar la API
-                time.sleep(1)
-                
-            except Exception as e:
-                print(f"Error procesando {archivo}: {e}")
-                import sys
-                sys.print_exception(e)  # Muestra el traceback completo
+        for archivo, estado in resultado.get('results', {}).items():
+            if 'error' in estado:
+                print(f"Error al subir {archivo}: {estado['error']}")
                 errores += 1
+            elif estado.get('skipped'):
+                omitidos += 1
+            else:
+                print(f"Archivo {archivo} preparado correctamente")
+                subidos += 1
+        
+        if resultado.get('queued') and not resultado.get('commit'):
+            # Sin red (o se cortó antes del commit): todo quedó en la cola
+            print(f"Sin conexión: los archivos se enviarán al volver la red "
+                  f"({resultado['pending']} operaciones pendientes)")
+            subidos = 0
+        elif 'error' in resultado:
+            print(f"Error: {resultado['error']}")
+            if 'details' in resultado:
+                if isinstance(resultado['details'], dict) and 'message' in resultado['details']:
+                    print(f"Detalles: {resultado['details']['message']}")
+                else:
+                    print(f"Detalles: {resultado['details']}")
+            errores += subidos
+            subidos = 0
+        elif resultado['commit']:
+            print(f"Commit creado: {resultado['commit']}")
+            if resultado.get('queued'):
+                print(f"Los archivos que fallaron quedan en la cola "
+                      f"({resultado['pending']} operaciones pendientes)")
+        else:
+            print("Todos los archivos estaban al día, no se creó ningún commit.")
+        
+        # Liberar memoria
+        gc.collect()
                 
-        print(f"Proceso completado. Archivos subidos: {subidos}, Errores: {errores}")
+        print(f"Proceso completado. Archivos subidos: {subidos}, Sin cambios: {omitidos}, Errores: {errores}")
+        
+        # Mostrar cuántas peticiones quedan en la ventana actual de GitHub
+        presupuesto = repo_manager.rate_limit_status()
+        if presupuesto['remaining'] is not None:
+            print(f"Peticiones restantes a la API: {presupuesto['remaining']}/{presupuesto['limit']}")
         
     except OSError as e:
         print(f"Error al acceder al directorio '{directorio_local}': {e}")
@@ -116,6 +210,11 @@ def mostrar_menu():
     print("7. Crear repositorio y subir archivos automáticamente")
     print("8. Descargar archivo de un repositorio")
     print("9. Crear carpeta en un repositorio")
+    print("10. Sincronizar carpeta con un repositorio (incluye borrados)")
+    print("11. Ver uso de memoria por operación")
+    print("12. Reconectar y enviar cambios pendientes")
+    print("13. Descargar repositorio o carpeta completa")
+    print("14. Actualizar carpeta local desde un repositorio (solo cambios)")
     print("0. Salir")
     
     try:
@@ -156,24 +255,26 @@ def crear_repositorio():
 
 def listar_repositorios():
     print("Obteniendo tus repositorios...")
-    repos = repo_manager.list_repositories()
-    
-    if isinstance(repos, dict) and 'error' in repos:
-        print(f"Error: {repos['error']}")
-        return
-    
-    if not repos:
-        print("No se encontraron repositorios.")
-        return
     
-    print("\n=== TUS REPOSITORIOS ===")
-    for i, repo in enumerate(repos, 1):
+    # Se imprimen a medida que llegan las páginas
+    i = 0
+    for repo in repo_manager.iter_repositories():
+        if 'error' in repo:
+            print(f"Error: {repo['error']}")
+            return
+        
+        i += 1
+        if i == 1:
+            print("\n=== TUS REPOSITORIOS ===")
         privado = "Privado" if repo.get('private', False) else "Público"
         print(f"{i}. {repo.get('name')} [{privado}]")
         if repo.get('description'):
             print(f"   Descripción: {repo.get('description')}")
         print(f"   URL: {repo.get('html_url')}")
         print()
+    
+    if i == 0:
+        print("No se encontraron repositorios.")
 
 def actualizar_repositorio():
     try:
@@ -256,18 +357,17 @@ def listar_repos_usuario():
         return
     
     print(f"Obteniendo repositorios de {username}...")
-    repos = repo_manager.list_repositories(username)
-    
-    if isinstance(repos, dict) and 'error' in repos:
-        print(f"Error: {repos['error']}")
-        return
     
-    if not repos:
-        print("No se encontraron repositorios.")
-        return
-    
-    print(f"\n=== REPOSITORIOS DE {username.upper()} ===")
-    for i, repo in enumerate(repos, 1):
+    # Se imprimen a medida que llegan las páginas
+    i = 0
+    for repo in repo_manager.iter_repositories(username):
+        if 'error' in repo:
+            print(f"Error: {repo['error']}")
+            return
+        
+        i += 1
+        if i == 1:
+            print(f"\n=== REPOSITORIOS DE {username.upper()} ===")
         privado = "Privado" if repo.get('private', False) else "Público"
         print(f"{i}. {repo.get('name')} [{privado}]")
         if repo.get('description'):
@@ -276,6 +376,9 @@ def listar_repos_usuario():
         lenguaje = repo.get('language', 'No especificado')
         print(f"   Lenguaje principal: {lenguaje}")
         print()
+    
+    if i == 0:
+        print("No se encontraron repositorios.")
 
 def subir_archivos_a_repo():
     try:
@@ -376,6 +479,55 @@ def descargar_archivo():
             else:
                 print(f"Detalles: {resultado['details']}")
 
+def descargar_carpeta():
+    """Descarga un repositorio completo o una de sus carpetas en una sola petición"""
+    try:
+        owner = input("Propietario del repositorio: ")
+        repo_name = input("Nombre del repositorio: ")
+        remote_prefix = input("Carpeta del repositorio (o Enter para todo): ")
+        ref = input("Rama, etiqueta o commit (o Enter para la rama principal): ")
+        local_dir = input("Carpeta local de destino (o Enter para la actual): ")
+    except KeyboardInterrupt:
+        print("\nOperación cancelada")
+        return
+    
+    print(f"Descargando {owner}/{repo_name}/{remote_prefix}...")
+    resultado = repo_manager.download_tree(owner, repo_name, ref or None, remote_prefix,
+                                           local_dir or '.')
+    
+    if 'error' in resultado:
+        print(f"Error al descargar: {resultado['error']}")
+        if 'details' in resultado:
+            if isinstance(resultado['details'], dict) and 'message' in resultado['details']:
+                print(f"Detalles: {resultado['details']['message']}")
+            else:
+                print(f"Detalles: {resultado['details']}")
+    else:
+        print(f"{resultado['files']} archivos descargados ({resultado['bytes']} bytes)")
+        if resultado['commit']:
+            print(f"Commit: {resultado['commit']}")
+
+def actualizar_desde_repo():
+    """Trae a una carpeta local solo los archivos que cambiaron en el repositorio"""
+    try:
+        owner = input("Propietario del repositorio: ")
+        repo_name = input("Nombre del repositorio: ")
+        remote_prefix = input("Carpeta del repositorio (o Enter para todo): ")
+        local_dir = input("Carpeta local a actualizar (o Enter para la actual): ") or '.'
+        rama = input("Rama (o Enter para 'main'): ") or 'main'
+        dry_run = input("¿Solo mostrar los cambios? (s/n): ").lower() == 's'
+    except KeyboardInterrupt:
+        print("\nOperación cancelada")
+        return
+    
+    resultado = repo_manager.pull(owner, repo_name, local_dir, remote_prefix, rama, dry_run)
+    if 'error' in resultado:
+        print(f"Error al actualizar: {resultado['error']}")
+    elif not dry_run and (resultado['added'] or resultado['modified'] or resultado['deleted']):
+        print(f"Actualización completada ({resultado['bytes']} bytes descargados).")
+    elif not dry_run:
+        print("La carpeta ya estaba actualizada.")
+
 def crear_carpeta():
     """Crea una carpeta en el repositorio"""
     try:
@@ -404,12 +556,397 @@ def crear_carpeta():
                 print(f"Detalles: {resultado['details']['message']}")
             else:
                 print(f"Detalles: {resultado['details']}")
+    elif resultado.get('queued'):
+        print(f"Sin conexión: la carpeta {folder_path} se creará al volver la red "
+              f"({resultado['pending']} operaciones pendientes)")
     else:
         print(f"Carpeta creada con éxito: {folder_path}")
 
+def sincronizar_carpeta():
+    """Refleja una carpeta local en una ruta del repositorio, incluidos los borrados"""
+    try:
+        owner = input("Propietario del repositorio: ")
+        repo_name = input("Nombre del repositorio: ")
+        directorio = input(f"Directorio local (o Enter para usar '{CARPETA_PROYECTO}'): ")
+        if not directorio:
+            directorio = CARPETA_PROYECTO
+        remote_prefix = input("Carpeta del repositorio (o Enter para la raíz): ")
+        patrones = input("Patrones a excluir separados por comas (o Enter para usar .gitignore): ")
+        exclude = [p.strip() for p in patrones.split(',') if p.strip()] or None
+        dry_run = input("¿Solo mostrar los cambios sin aplicarlos? (s/n): ").lower() == 's'
+    except KeyboardInterrupt:
+        print("\nOperación cancelada")
+        return
+    
+    print(f"Sincronizando '{directorio}' con {owner}/{repo_name}/{remote_prefix}...")
+    resultado = repo_manager.sync(
+        owner,
+        repo_name,
+        directorio,
+        remote_prefix,
+        dry_run=dry_run,
+        exclude=exclude
+    )
+    
+    if 'error' in resultado:
+        print(f"Error: {resultado['error']}")
+        if 'details' in resultado:
+            if isinstance(resultado['details'], dict) and 'message' in resultado['details']:
+                print(f"Detalles: {resultado['details']['message']}")
+            else:
+                print(f"Detalles: {resultado['details']}")
+    elif resultado['commit']:
+        print(f"Sincronización completada. Commit: {resultado['commit']}")
+    elif not dry_run:
+        print("El repositorio ya estaba sincronizado.")
+
+# Función para enviar las operaciones guardadas en la cola mientras no había red
+def enviar_pendientes(reconectar=False):
+    pendientes = len(repo_manager.queue)
+    if not pendientes:
+        if reconectar:
+            print("No hay cambios pendientes.")
+        return
+    if not net.wlan.isconnected():
+        if not reconectar or not net.conectar():
+            print(f"Sin conexión: {pendientes} cambios pendientes en la cola.")
+            return
+    print(f"Enviando {pendientes} cambios pendientes...")
+    resultado = repo_manager.flush_queue()
+    for commit in resultado['commits']:
+        print(f"Commit creado: {commit}")
+    for grupo, estado in resultado['results'].items():
+        if 'error' in estado:
+            print(f"Error en {grupo}: {estado['error']}")
+    print(f"Cambios que siguen pendientes: {resultado['pending']}")
+
+# Función para mostrar el uso de memoria de cada operación
+def mostrar_memoria():
+    gc.collect()
+    try:
+        print(f"Memoria libre: {gc.mem_free()} bytes, en uso: {gc.mem_alloc()} bytes")
+    except AttributeError:
+        pass
+    if perfil is None:
+        print("El perfil de memoria está desactivado (PERFIL_MEMORIA = False).")
+    elif not perfil.stats:
+        print("Todavía no se ha medido ninguna operación.")
+    else:
+        perfil.print_summary()
+
+# --- Modo por lotes ---------------------------------------------------------
+# Ejecuta sin consola una lista de trabajos en JSON (ver ejecutar_trabajos):
+#   {"defaults": {"owner": "yo"}, "stop_on_error": false, "jobs": [
+#       {"op": "create_repo", "name": "demo"},
+#       {"op": "push", "repo": "demo", "dir": "proyecto", "prefix": "src"},
+#       {"op": "pull", "repo": "config", "dir": "cfg"}]}
+
+# Operaciones disponibles y sus campos obligatorios
+OPERACIONES = {
+    'create_repo': ('name',),
+    'update_repo': ('owner', 'repo'),
+    'delete_repo': ('owner', 'repo'),
+    'push': ('owner', 'repo', 'dir'),
+    'mkdir': ('owner', 'repo', 'path'),
+    'sync': ('owner', 'repo', 'dir'),
+    'pull': ('owner', 'repo', 'dir'),
+    'download': ('owner', 'repo', 'path'),
+    'download_tree': ('owner', 'repo'),
+    'flush': (),
+}
+
+# Operaciones que se agrupan en un único commit por repositorio y rama
+ESCRITURAS = ('push', 'mkdir')
+
+# Campos del resultado de cada operación que se copian al registro
+CAMPOS_RESUMEN = ('commit', 'commits', 'added', 'modified', 'deleted', 'files', 'bytes',
+                  'pending', 'queued', 'success', 'full_name')
+
+
+def cargar_trabajos(origen):
+    """
+    Lee un archivo de trabajos y aplica 'defaults' a cada trabajo.
+
+    Args:
+        origen (str/dict/list): Ruta del archivo JSON, o su contenido ya cargado
+
+    Returns:
+        tuple: (lista de trabajos, detener al primer error)
+    """
+    if isinstance(origen, str):
+        with open(origen) as f:
+            origen = ujson.load(f)
+    if isinstance(origen, list):
+        origen = {'jobs': origen}
+    defaults = origen.get('defaults', {})
+    trabajos = []
+    for trabajo in origen.get('jobs', ()):
+        completo = dict(defaults)
+        completo.update(trabajo)
+        trabajos.append(completo)
+    return trabajos, bool(origen.get('stop_on_error'))
+
+
+def _recursos(trabajo):
+    """
+    Repositorio (propietario, nombre) y rutas locales que lee o modifica un
+    trabajo. create_repo sin owner crea el repositorio del usuario del token.
+    """
+    recursos = [('repo', (trabajo.get('owner'), trabajo.get('repo') or trabajo.get('name')))]
+    for campo in ('dir', 'local'):
+        if trabajo.get(campo):
+            recursos.append(('local', trabajo[campo].strip('/') + '/'))
+    return recursos
+
+
+def _comparten(a, b):
+    for tipo, valor in a:
+        for otro_tipo, otro in b:
+            if tipo != otro_tipo:
+                continue
+            if tipo == 'repo':
+                # Sin propietario conocido, se supone que puede ser el mismo
+                if valor[1] == otro[1] and (valor[0] == otro[0] or None in (valor[0], otro[0])):
+                    return True
+            # Una carpeta local choca con sus subcarpetas
+            elif valor.startswith(otro) or otro.startswith(valor):
+                return True
+    return False
+
+
+def planificar_trabajos(trabajos):
+    """
+    Convierte los trabajos en pasos a ejecutar, sin cambiar el resultado:
+
+    - Los push y mkdir sobre el mismo propietario, repositorio y rama se
+      juntan en un único commit si entre ellos no hay otro trabajo que use
+      ese repositorio o esas carpetas locales.
+    - Un trabajo idéntico al último que usó sus mismos recursos se ejecuta
+      una sola vez.
+    - flush separa siempre lo anterior de lo siguiente.
+
+    Returns:
+        tuple: (pasos, errores). Cada paso es {'op', 'jobs': [índices], 'args',
+               'writes': [trabajos] (solo en commits agrupados), 'recursos'};
+               errores es {índice: mensaje} de los trabajos no válidos
+    """
+    pasos = []
+    errores = {}
+    for i, trabajo in enumerate(trabajos):
+        op = trabajo.get('op')
+        if op not in OPERACIONES:
+            errores[i] = f"Operación desconocida: {op}"
+            continue
+        faltan = [campo for campo in OPERACIONES[op] if not trabajo.get(campo)]
+        if faltan:
+            errores[i] = "Faltan campos: " + ', '.join(faltan)
+            continue
+
+        recursos = _recursos(trabajo)
+        previo = None
+        for paso in reversed(pasos):
+            if paso['op'] == 'flush' or op == 'flush':
+                break
+            if _comparten(paso['recursos'], recursos):
+                previo = paso
+                break
+
+        if previo is not None:
+            anterior = previo['args']
+            if (op in ESCRITURAS and previo['op'] == 'write'
+                    and anterior['owner'] == trabajo['owner']
+                    and anterior['repo'] == trabajo['repo']
+                    and anterior.get('branch', 'main') == trabajo.get('branch', 'main')):
+                if trabajo not in previo['writes']:
+                    previo['writes'].append(trabajo)
+                    previo['recursos'] += recursos
+                previo['jobs'].append(i)
+                continue
+            if previo['args'] == trabajo:
+                previo['jobs'].append(i)
+                continue
+
+        paso = {'op': op, 'jobs': [i], 'args': trabajo, 'recursos': recursos}
+        if op in ESCRITURAS:
+            paso['op'] = 'write'
+            paso['writes'] = [trabajo]
+        pasos.append(paso)
+    return pasos, errores
+
+
+def _escribir(gestor, paso):
+    """Sube los push y mkdir de un paso en un único commit"""
+    args = paso['args']
+    rama = args.get('branch', 'main')
+    for trabajo in paso['writes']:
+        if trabajo['op'] == 'push':
+            os.stat(trabajo['dir'])
+
+    def archivos():
+        for trabajo in paso['writes']:
+            if trabajo['op'] == 'mkdir':
+                # Las carpetas se crean con un .gitkeep, como create_folder
+                yield '', trabajo['path'].strip('/') + '/.gitkeep'
+                continue
+            base = trabajo['dir'].rstrip('/') + '/'
+            prefijo = trabajo.get('prefix', '').strip('/')
+            if prefijo:
+                prefijo += '/'
+            for ruta, tamano, mtime in walk_files(base):
+                yield base + ruta, prefijo + ruta
+
+    mensajes = [t['message'] for t in paso['writes'] if t.get('message')]
+    return gestor.upload_files(
+        args['owner'], args['repo'], archivos(), branch=rama,
+        commit_message='; '.join(mensajes) or "Trabajos por lotes desde MicroPython",
+        tree_index=gestor.get_remote_tree(args['owner'], args['repo'], rama)
+    )
+
+
+def _ejecutar_paso(gestor, paso):
+    op = paso['op']
+    t = paso['args']
+    if op == 'write':
+        return _escribir(gestor, paso)
+    if op == 'create_repo':
+        return gestor.create_repository(t['name'], t.get('description'),
+                                        t.get('private', False), t.get('auto_init', True))
+    if op == 'update_repo':
+        return gestor.update_repository(t['owner'], t['repo'], t.get('new_name'),
+                                        t.get('description'), t.get('private'))
+    if op == 'delete_repo':
+        return gestor.delete_repository(t['owner'], t['repo'])
+    if op == 'sync':
+        return gestor.sync(t['owner'], t['repo'], t['dir'], t.get('prefix', ''),
+                           t.get('branch', 'main'), t.get('dry_run', False),
+                           t.get('exclude'), t.get('message'))
+    if op == 'pull':
+        return gestor.pull(t['owner'], t['repo'], t['dir'], t.get('prefix', ''),
+                           t.get('branch', 'main'), t.get('dry_run', False), t.get('exclude'))
+    if op == 'download':
+        resultado = gestor.download_file(t['owner'], t['repo'], t['path'], t.get('local'))
+        return {'success': True} if resultado is True else resultado
+    if op == 'download_tree':
+        return gestor.download_tree(t['owner'], t['repo'], t.get('ref'),
+                                    t.get('prefix', ''), t.get('dir', '.'))
+    # flush
+    return gestor.flush_queue(t.get('message')) or {'pending': 0}
+
+
+def _resumen(resultado):
+    """Parte del resultado de una operación que va al registro"""
+    if not isinstance(resultado, dict):
+        return {}
+    if 'error' in resultado:
+        resumen = {'error': resultado['error']}
+        detalles = resultado.get('details')
+        if isinstance(detalles, dict):
+            detalles = detalles.get('message')
+        if detalles:
+            resumen['details'] = detalles
+        return resumen
+    resumen = {}
+    for campo in CAMPOS_RESUMEN:
+        if campo in resultado:
+            valor = resultado[campo]
+            resumen[campo] = len(valor) if isinstance(valor, (list, tuple)) else valor
+    fallos = [ruta for ruta, estado in (resultado.get('results') or {}).items()
+              if isinstance(estado, dict) and 'error' in estado]
+    if fallos:
+        resumen['failed'] = fallos
+    return resumen
+
+
+def ejecutar_trabajos(origen, registro=REGISTRO_TRABAJOS, gestor=None):
+    """
+    Ejecuta una lista de trabajos seguidos, sin menú ni pausas, con un solo
+    gestor (conexiones, caché de consultas y manifiesto compartidos).
+
+    Cada línea del registro es un JSON {"job": índice, "op", "step", "ok",
+    "ms", "result"} (los trabajos agrupados en un mismo paso comparten
+    resultado); la última es {"summary": {"jobs", "steps", "ok", "failed", "ms"}}.
+
+    Args:
+        origen (str/dict/list): Archivo de trabajos o su contenido (ver cargar_trabajos)
+        registro (str, opcional): Archivo donde escribir el resultado (None para no escribirlo)
+        gestor (GitHubRepoManager, opcional): Por defecto repo_manager
+
+    Returns:
+        dict: {'jobs': [línea de cada trabajo], 'summary': resumen}
+    """
+    trabajos, detener = cargar_trabajos(origen)
+    pasos, errores = planificar_trabajos(trabajos)
+    if gestor is None:
+        gestor = repo_manager
+    print(f"{len(trabajos)} trabajos en {len(pasos)} pasos")
+
+    lineas = [None] * len(trabajos)
+    salida = open(registro, 'w') if registro else None
+
+    def anotar(linea):
+        lineas[linea['job']] = linea
+        if salida is not None:
+            salida.write(ujson.dumps(linea) + '\n')
+            salida.flush()
+
+    try:
+        for i, error in errores.items():
+            print(f"Trabajo {i} no válido: {error}")
+            anotar({'job': i, 'op': trabajos[i].get('op'), 'ok': False, 'result': {'error': error}})
+        # Con stop_on_error un archivo con trabajos no válidos no se ejecuta
+        fallido = detener and bool(errores)
+
+        inicio = ticks_ms()
+        for n, paso in enumerate(pasos):
+            if fallido and detener:
+                resumen = {'error': 'No ejecutado: falló un trabajo anterior'}
+                ms = 0
+            else:
+                t0 = ticks_ms()
+                try:
+                    resumen = _resumen(_ejecutar_paso(gestor, paso))
+                except Exception as e:
+                    resumen = {'error': f"{type(e).__name__}: {e}"}
+                ms = ticks_diff(ticks_ms(), t0)
+            ok = 'error' not in resumen and 'failed' not in resumen
+            fallido = fallido or not ok
+            print(f"[{n + 1}/{len(pasos)}] {paso['op']}: {'ok' if ok else resumen.get('error', 'con errores')} ({ms} ms)")
+            for i in paso['jobs']:
+                anotar({'job': i, 'op': trabajos[i]['op'], 'step': n, 'ok': ok, 'ms': ms,
+                        'result': resumen})
+
+        correctos = sum(1 for linea in lineas if linea['ok'])
+        totales = {
+            'jobs': len(trabajos),
+            'steps': len(pasos),
+            'ok': correctos,
+            'failed': len(trabajos) - correctos,
+            'ms': ticks_diff(ticks_ms(), inicio)
+        }
+        if salida is not None:
+            salida.write(ujson.dumps({'summary': totales}) + '\n')
+    finally:
+        if salida is not None:
+            salida.close()
+    print(f"Trabajos completados: {totales['ok']}/{totales['jobs']}")
+    return {'jobs': lineas, 'summary': totales}
+
 # Bucle principal
-def main():
+def main(trabajos=None):
+    """
+    Args:
+        trabajos (str/dict/list, opcional): Archivo de trabajos. Si se indica
+            se ejecuta en modo por lotes (sin menú) y se devuelve 0 si todos
+            terminaron bien o 1 si alguno falló
+    """
     try:
+        iniciar()
+
+        if trabajos is not None:
+            enviar_pendientes()
+            resultado = ejecutar_trabajos(trabajos)
+            return 0 if not resultado['summary']['failed'] else 1
+
         # Verificar si la carpeta proyecto existe
         try:
             os.stat(CARPETA_PROYECTO)
@@ -418,6 +955,9 @@ def main():
             print(f"Advertencia: La carpeta '{CARPETA_PROYECTO}' no existe o no es accesible.")
         
         while True:
+            # Enviar lo que quedó en la cola si ya hay conexión
+            enviar_pendientes()
+            
             opcion = mostrar_menu()
             
             if opcion == "1":
@@ -438,6 +978,16 @@ def main():
                 descargar_archivo()
             elif opcion == "9":
                 crear_carpeta()
+            elif opcion == "10":
+                sincronizar_carpeta()
+            elif opcion == "11":
+                mostrar_memoria()
+            elif opcion == "12":
+                enviar_pendientes(reconectar=True)
+            elif opcion == "13":
+                descargar_carpeta()
+            elif opcion == "14":
+                actualizar_desde_repo()
             elif opcion == "0":
                 print("Saliendo del programa...")
                 break
@@ -456,18 +1006,30 @@ def main():
         import sys
         sys.print_exception(e)  # Muestra el traceback completo
     finally:
+        # Cerrar conexiones y guardar la caché de consultas
+        if net is not None:
+            net.detener_vigilancia()
+        if repo_manager is not None:
+            repo_manager.close()
+        if perfil is not None and perfil.stats:
+            perfil.print_summary()
         print("Finalizando programa.")
+    if trabajos is not None:
+        # El modo por lotes no terminó
+        return 1
 
-# Necesario para que funcione la subida de archivos
-import urequests
-
-# Ejecutar el programa
+# Ejecutar el programa. Con un argumento (python main_git.py trabajos.json)
+# se ejecuta en modo por lotes y el código de salida indica si hubo fallos
 if __name__ == "__main__":
+    import sys
+    argumentos = getattr(sys, 'argv', [])
+    codigo = 1
     try:
-        main()
+        codigo = main(argumentos[1] if len(argumentos) > 1 else None)
     except Exception as e:
         print(f"Error fatal: {e}")
-        import sys
         sys.print_exception(e)
     finally:
-        print("Programa finalizado")
\ No newline at end of file
+        print("Programa finalizado")
+    if len(argumentos) > 1:
+        sys.exit(codigo)
\ No newline at end of file
@@ -4,42 +4,357 @@ import socket
 import json
 import time
 
+try:
+    from time import ticks_ms, ticks_diff, ticks_add, sleep_ms
+except ImportError:
+    # CPython (pruebas y benchmarks)
+    def ticks_ms():
+        return int(time.time() * 1000)
+
+    def ticks_diff(a, b):
+        return a - b
+
+    def ticks_add(ticks, delta):
+        return ticks + delta
+
+    def sleep_ms(ms):
+        time.sleep(ms / 1000)
+
+try:
+    import ubinascii as binascii
+except ImportError:
+    import binascii
+
+
+def _estados_fallo():
+    """Estados de WLAN.status() que indican que el intento ya ha fallado"""
+    nombres = ('STAT_WRONG_PASSWORD', 'STAT_NO_AP_FOUND', 'STAT_CONNECT_FAIL')
+    return tuple(getattr(network, n) for n in nombres if hasattr(network, n))
+
+
 class Network:
-    def __init__(self, ssid, password, static_ip_config=None):
+    # Archivo en flash con el último punto de acceso y la última IP
+    CACHE = '.wifi_cache.json'
+
+    def __init__(self, ssid, password, static_ip_config=None, cache_path=CACHE,
+                 reutilizar_ip=False, resolver_dns=None):
         """
         Inicializa la conexión Wi-Fi.
         ssid: Nombre de la red Wi-Fi.
         password: Contraseña de la red.
-        static_ip_config: Tupla con la configuración estática 
+        static_ip_config: Tupla con la configuración estática
             (ip, máscara, gateway, DNS) (opcional).
+        cache_path: Archivo donde guardar el BSSID, el canal y la IP de la
+            última conexión para reconectar sin escanear (None para no usarlo).
+        reutilizar_ip: Aplicar la última IP como estática para saltarse el
+            DHCP. Solo es seguro si el router reserva la IP al dispositivo.
+        resolver_dns: Caché DNS (github_http.Resolver) que se precarga al
+            conectar, para que la primera petición no espere al DNS.
         """
         self.ssid = ssid
         self.password = password
         self.static_ip_config = static_ip_config
+        self.cache_path = cache_path
+        self.reutilizar_ip = reutilizar_ip
+        self.resolver_dns = resolver_dns
         self.wlan = network.WLAN(network.STA_IF)
+        # Milisegundos que tardó la última conexión
+        self.ultima_conexion_ms = None
+        # Espera máxima (ms) de los hooks de GitHubRepoManager a que vuelva el enlace
+        self.espera_enlace_ms = 15000
+        self._oyentes = []
+        self._enlace = None
+        self._proximo_intento = None
+        self._espera = 500
+        self._timer = None
+        # conectar() en curso: el vigilante no debe interferir
+        self._en_conexion = False
+
+    # --- Caché del punto de acceso ------------------------------------------
+
+    def _leer_cache(self):
+        if not self.cache_path:
+            return None
+        try:
+            with open(self.cache_path) as f:
+                cache = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return cache if cache.get('ssid') == self.ssid else None
+
+    def _guardar_cache(self, bssid, canal):
+        if not self.cache_path:
+            return
+        cache = {
+            'ssid': self.ssid,
+            'bssid': binascii.hexlify(bssid).decode() if bssid else None,
+            'canal': canal,
+            'ip': list(self.wlan.ifconfig())
+        }
+        # Solo se escribe si cambió, para no desgastar la flash
+        if self._leer_cache() == cache:
+            return
+        try:
+            with open(self.cache_path, 'w') as f:
+                json.dump(cache, f)
+        except OSError as e:
+            print("No se pudo guardar la caché Wi-Fi:", e)
+
+    def _buscar_ap(self):
+        """Escanea y devuelve (bssid, canal) del punto de acceso con más señal"""
+        mejor = None
+        try:
+            for ssid, bssid, canal, rssi, *_ in self.wlan.scan():
+                if ssid == self.ssid.encode() and (mejor is None or rssi > mejor[2]):
+                    mejor = (bssid, canal, rssi)
+        except OSError:
+            pass
+        return (mejor[0], mejor[1]) if mejor else (None, None)
+
+    # --- Conexión -------------------------------------------------------------
 
-    def conectar(self):
+    def _iniciar_conexion(self, bssid=None):
+        """Lanza un intento de conexión sin esperar a que termine"""
+        try:
+            self.wlan.disconnect()
+        except OSError:
+            pass
+        if bssid:
+            try:
+                # Con BSSID el driver no necesita escanear todos los canales
+                self.wlan.connect(self.ssid, self.password, bssid=bssid)
+                return
+            except TypeError:
+                pass
+        self.wlan.connect(self.ssid, self.password)
+
+    def _asociando(self):
+        """
+        True si el driver está en mitad de un intento (asociación o DHCP) o
+        reconectando por su cuenta: reiniciarlo solo lo retrasaría.
+        """
+        estado = getattr(network, 'STAT_CONNECTING', None)
+        if estado is None:
+            return False
+        try:
+            return self.wlan.status() == estado
+        except (OSError, TypeError):
+            return False
+
+    def _esperar(self, limite_ms):
+        """
+        Espera a que termine el intento en curso comprobando cada pocos
+        milisegundos (el intervalo crece de 10 a 200 ms).
+        """
+        fallos = _estados_fallo()
+        inicio = ticks_ms()
+        intervalo = 10
+        while ticks_diff(ticks_ms(), inicio) < limite_ms:
+            if self.wlan.isconnected():
+                return True
+            try:
+                if self.wlan.status() in fallos:
+                    return False
+            except (OSError, TypeError):
+                pass
+            sleep_ms(intervalo)
+            intervalo = min(intervalo * 2, 200)
+        return self.wlan.isconnected()
+
+    def conectar(self, timeout=30):
         """
         Activa la interfaz Wi-Fi y se conecta a la red.
         Si se proporciona static_ip_config, configura la IP estática.
-        Espera hasta 30 segundos para lograr la conexión.
+
+        Si hay una conexión anterior en la caché, conecta directamente a su
+        BSSID sin escanear; si falla, escanea de nuevo y reintenta con
+        esperas crecientes entre intentos. Espera hasta timeout segundos.
+        Mientras tanto el vigilante no hace nada.
         """
+        self._en_conexion = True
+        try:
+            return self._conectar(timeout)
+        finally:
+            self._en_conexion = False
+
+    def _conectar(self, timeout):
+        inicio = ticks_ms()
         self.wlan.active(True)
         # Configurar IP estática si se proporciona
         if self.static_ip_config:
             print("Configurando IP estática:", self.static_ip_config)
             self.wlan.ifconfig(self.static_ip_config)
+
+        bssid, canal = None, None
         if not self.wlan.isconnected():
-            print("Conectando a la red:", self.ssid)
-            self.wlan.connect(self.ssid, self.password)
-            timeout = 30  # segundos de espera
-            start_time = time.time()
-            while not self.wlan.isconnected() and time.time() - start_time < timeout:
-                print("Esperando conexión...")
-                time.sleep(1)
+            cache = self._leer_cache()
+            ip_reutilizada = False
+            if cache and self.reutilizar_ip and not self.static_ip_config and cache.get('ip'):
+                self.wlan.ifconfig(tuple(cache['ip']))
+                ip_reutilizada = True
+
+            rapido = ip_reutilizada or bool(cache and cache.get('bssid'))
+            if cache and cache.get('bssid'):
+                print("Conectando a la red:", self.ssid, "(reconexión rápida)")
+                bssid, canal = binascii.unhexlify(cache['bssid']), cache.get('canal')
+            else:
+                print("Conectando a la red:", self.ssid)
+                bssid, canal = self._buscar_ap()
+
+            espera = 500
+            while True:
+                restante = timeout * 1000 - ticks_diff(ticks_ms(), inicio)
+                if restante <= 0:
+                    break
+                self._iniciar_conexion(bssid)
+                if self._esperar(min(restante, 10000)):
+                    break
+                if rapido:
+                    # El punto de acceso o la IP de la caché ya no sirven
+                    print("Reconexión rápida fallida, buscando la red de nuevo")
+                    rapido = False
+                    bssid, canal = self._buscar_ap()
+                    if ip_reutilizada:
+                        try:
+                            self.wlan.ipconfig(dhcp4=True)
+                        except (AttributeError, OSError, TypeError):
+                            pass
+                        ip_reutilizada = False
+                    continue
+                sleep_ms(min(espera, max(0, restante)))
+                espera = min(espera * 2, 8000)
+
         if self.wlan.isconnected():
-            print("Conexión establecida. Configuración:", self.wlan.ifconfig())
+            self.ultima_conexion_ms = ticks_diff(ticks_ms(), inicio)
+            print(f"Conexión establecida en {self.ultima_conexion_ms} ms. Configuración:",
+                  self.wlan.ifconfig())
+            if bssid:
+                self._guardar_cache(bssid, canal)
+            if self.resolver_dns is not None:
+                self.resolver_dns.warm()
+            self._cambio_enlace(True)
             return True
         else:
             print("No se pudo conectar a la red.")
-            return False
\ No newline at end of file
+            self._cambio_enlace(False)
+            return False
+
+    # --- Vigilante del enlace ---------------------------------------------
+
+    def agregar_oyente(self, funcion):
+        """
+        Registra una función que se llama con True cuando vuelve el enlace
+        y con False cuando se cae (p. ej. GitHubRepoManager.link_changed).
+        """
+        self._oyentes.append(funcion)
+
+    def _cambio_enlace(self, conectado):
+        if self._enlace == conectado:
+            return
+        self._enlace = conectado
+        if conectado:
+            self._proximo_intento = None
+            self._espera = 500
+        for funcion in self._oyentes:
+            try:
+                funcion(conectado)
+            except Exception as e:
+                print("Error en oyente de red:", e)
+
+    def vigilar(self):
+        """
+        Un paso del vigilante, sin bloquear: detecta caídas y vueltas del
+        enlace, avisa a los oyentes y lanza reintentos de conexión con
+        esperas crecientes (de 0,5 s hasta 60 s).
+
+        Returns:
+            bool: True si hay conexión
+        """
+        if self._en_conexion:
+            # conectar() ya está llamando a disconnect/connect
+            return self.wlan.isconnected()
+        if self.wlan.isconnected():
+            self._cambio_enlace(True)
+            return True
+        if self._enlace is not False:
+            print("Enlace Wi-Fi perdido, reconectando...")
+            self._cambio_enlace(False)
+            self._proximo_intento = ticks_ms()
+        if self._proximo_intento is not None and ticks_diff(ticks_ms(), self._proximo_intento) >= 0:
+            if self._asociando():
+                # Dejar terminar el intento en curso y volver a mirar más tarde
+                self._proximo_intento = ticks_add(ticks_ms(), self._espera)
+                return False
+            cache = self._leer_cache()
+            bssid = binascii.unhexlify(cache['bssid']) if cache and cache.get('bssid') else None
+            try:
+                self._iniciar_conexion(bssid)
+            except OSError as e:
+                print("Error al reconectar:", e)
+            self._proximo_intento = ticks_add(ticks_ms(), self._espera)
+            self._espera = min(self._espera * 2, 60000)
+        return False
+
+    def _vigilar_programado(self, _):
+        try:
+            self.vigilar()
+        except Exception as e:
+            print("Error en el vigilante de red:", e)
+
+    def iniciar_vigilancia(self, periodo_ms=1000, timer_id=-1):
+        """
+        Comprueba el enlace periódicamente con un machine.Timer. La
+        comprobación se ejecuta fuera de la interrupción (micropython.schedule)
+        y nunca bloquea.
+
+        Returns:
+            bool: False si la placa no tiene machine.Timer
+        """
+        try:
+            from machine import Timer
+            import micropython
+        except ImportError:
+            return False
+        self.detener_vigilancia()
+        self._timer = Timer(timer_id)
+        self._timer.init(period=periodo_ms, mode=Timer.PERIODIC,
+                         callback=lambda t: micropython.schedule(self._vigilar_programado, None))
+        return True
+
+    def detener_vigilancia(self):
+        if self._timer is not None:
+            self._timer.deinit()
+            self._timer = None
+
+    def esperar_enlace(self, limite_ms=None):
+        """
+        Espera (como mucho limite_ms) a que vuelva el enlace, reintentando
+        la conexión con el vigilante.
+
+        Returns:
+            bool: True si hay conexión
+        """
+        if limite_ms is None:
+            limite_ms = self.espera_enlace_ms
+        inicio = ticks_ms()
+        intervalo = 10
+        while not self.vigilar():
+            if ticks_diff(ticks_ms(), inicio) >= limite_ms:
+                return False
+            sleep_ms(intervalo)
+            intervalo = min(intervalo * 2, 200)
+        return True
+
+    # --- Hooks para GitHubRepoManager.add_hook --------------------------------
+    # Con la red caída, las peticiones esperan a que vuelva el enlace y las
+    # que fallan por su culpa se repiten en lugar de perderse.
+
+    def before_send(self, request):
+        if not self.wlan.isconnected():
+            self.esperar_enlace()
+
+    def on_error(self, request, error):
+        if self.wlan.isconnected():
+            # El fallo no es del enlace Wi-Fi
+            return False
+        return self.esperar_enlace()
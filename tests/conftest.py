@@ -0,0 +1,9 @@
+"""
+Configuración común de las pruebas (CPython).
+"""
+import sys
+import traceback
+
+# MicroPython tiene sys.print_exception; la biblioteca la usa al informar de errores
+if not hasattr(sys, 'print_exception'):
+    sys.print_exception = lambda e, f=None: traceback.print_exception(type(e), e, e.__traceback__)
@@ -0,0 +1,146 @@
+"""
+Pruebas de la reanudación de descargas (Range / If-Range) de
+GitHubRepoManager._download_to contra el servidor local de
+bench/fake_github.py.
+"""
+import hashlib
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, 'bench')
+sys.path[:0] = [os.path.join(BENCH_DIR, 'shims'), ROOT, BENCH_DIR]
+
+import pytest  # noqa: E402
+
+import fake_github  # noqa: E402
+import github_lib  # noqa: E402
+
+DATA = bytes(range(256)) * 40
+TAG = '"%s"' % hashlib.sha1(DATA).hexdigest()
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = fake_github.FakeGitHub(user='bench').start()
+    repo = server.store.create_repo('bench', 'demo')
+    server.store.commit_files(repo, 'main', {'datos.bin': DATA}, 'datos')
+    # Cabeceras Range/If-Range de cada descarga
+    server.ranges = []
+    original = fake_github.Handler.send_raw
+
+    def send_raw(self, data):
+        server.ranges.append((self.headers.get('Range'), self.headers.get('If-Range')))
+        return original(self, data)
+
+    monkeypatch.setattr(fake_github.Handler, 'send_raw', send_raw)
+    try:
+        yield server
+    finally:
+        server.shutdown()
+
+
+def _download(server, local_path):
+    manager = github_lib.GitHubRepoManager('tok', api_base_url=server.url)
+    try:
+        return manager.download_file('bench', 'demo', 'datos.bin', str(local_path))
+    finally:
+        manager.close()
+
+
+def _leftovers(local_path):
+    return [p for p in (str(local_path) + '.tmp', str(local_path) + '.tmp.etag')
+            if os.path.exists(p)]
+
+
+def test_resume_from_partial_file(server, tmp_path):
+    local_path = tmp_path / 'datos.bin'
+    (tmp_path / 'datos.bin.tmp').write_bytes(DATA[:1000])
+    (tmp_path / 'datos.bin.tmp.etag').write_text(TAG)
+
+    assert _download(server, local_path) is True
+    assert local_path.read_bytes() == DATA
+    assert server.ranges == [('bytes=1000-', TAG)]
+    assert not _leftovers(local_path)
+
+
+def test_changed_file_is_downloaded_whole(server, tmp_path):
+    local_path = tmp_path / 'datos.bin'
+    (tmp_path / 'datos.bin.tmp').write_bytes(b'x' * 1000)
+    (tmp_path / 'datos.bin.tmp.etag').write_text('"otra-version"')
+
+    # If-Range no coincide: el servidor responde 200 con el archivo entero
+    assert _download(server, local_path) is True
+    assert local_path.read_bytes() == DATA
+
+
+def test_interrupted_transfer_resumes_in_the_same_call(server, tmp_path, monkeypatch):
+    send_raw = fake_github.Handler.send_raw
+    cut = {'done': False}
+
+    def cut_once(self, data):
+        if cut['done'] or self.headers.get('Range'):
+            return send_raw(self, data)
+        cut['done'] = True
+        server.ranges.append((None, None))
+        # Cabeceras del archivo completo, la mitad del cuerpo y se cierra
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(data)))
+        self.send_header('ETag', TAG)
+        self.end_headers()
+        self.wfile.write(data[:len(data) // 2])
+        self.wfile.flush()
+        self.close_connection = True
+
+    monkeypatch.setattr(fake_github.Handler, 'send_raw', cut_once)
+    local_path = tmp_path / 'datos.bin'
+    assert _download(server, local_path) is True
+    assert local_path.read_bytes() == DATA
+    assert server.ranges[0] == (None, None)
+    assert server.ranges[-1] == ('bytes=%d-' % (len(DATA) // 2), TAG)
+    assert not _leftovers(local_path)
+
+
+def _mismatched_206(times):
+    original = fake_github.Handler.send_raw
+
+    def send_raw(self, data):
+        if self.headers.get('Range') and times['left'] > 0:
+            times['left'] -= 1
+            self.server.ranges.append((self.headers.get('Range'), self.headers.get('If-Range')))
+            # Rango distinto del pedido
+            return self.send(206, data[100:], ctype='application/octet-stream', etag=False,
+                             headers={'Content-Range': 'bytes 100-%d/%d' % (len(data) - 1, len(data)),
+                                      'ETag': TAG})
+        return original(self, data)
+    return send_raw
+
+
+def test_mismatched_206_restarts_without_range(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(fake_github.Handler, 'send_raw', _mismatched_206({'left': 1}))
+    local_path = tmp_path / 'datos.bin'
+    (tmp_path / 'datos.bin.tmp').write_bytes(DATA[:500])
+    (tmp_path / 'datos.bin.tmp.etag').write_text(TAG)
+
+    assert _download(server, local_path) is True
+    assert local_path.read_bytes() == DATA
+    assert [r for r, _ in server.ranges] == ['bytes=500-', None]
+    assert not _leftovers(local_path)
+
+
+def test_repeated_mismatched_206_is_an_error(server, tmp_path, monkeypatch):
+    def always_206(self, data):
+        # Ni sin Range se respeta: siempre el mismo 206
+        return self.send(206, data[100:], ctype='application/octet-stream', etag=False,
+                         headers={'Content-Range': 'bytes 100-%d/%d' % (len(data) - 1, len(data)),
+                                  'ETag': TAG})
+
+    monkeypatch.setattr(fake_github.Handler, 'send_raw', always_206)
+    local_path = tmp_path / 'datos.bin'
+    (tmp_path / 'datos.bin.tmp').write_bytes(DATA[:500])
+    (tmp_path / 'datos.bin.tmp.etag').write_text(TAG)
+
+    assert _download(server, local_path) == {'error': 'El servidor no respetó el rango pedido'}
+    assert not local_path.exists()
+    assert not _leftovers(local_path)
@@ -0,0 +1,104 @@
+"""
+Pruebas del lector JSON incremental de github_lib (_JsonReader,
+project_json, iter_json_records): el resultado debe coincidir con
+json.loads sea cual sea el tamaño de bloque con que llegue el texto.
+"""
+import io
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, 'bench', 'shims'), ROOT]
+
+import pytest  # noqa: E402
+
+import github_lib  # noqa: E402
+
+# 1 byte: todo se parte; 2, 3 y 5 cortan escapes y \uXXXX por distintos puntos
+CHUNK_SIZES = (1, 2, 3, 5, 7, 64, 512)
+
+RECORDS = [
+    {
+        "name": "uno",
+        "path": "dir/\"comillas\" y \\barras\\",
+        "owner": {"login": "alice", "id": 1, "extra": {"a": [1, [2, [3, {"b": "]}"}]]]}},
+        "size": 123,
+        "private": False,
+        "description": None,
+        "topics": [],
+        "meta": {},
+    },
+    {
+        "name": "ñandú € \U0001f600",
+        "path": "tab\tnueva\nlínea\r/\u0001",
+        "owner": {"login": "böb", "id": -2},
+        "size": 1.5e3,
+        "private": True,
+        "description": "texto con { [ , : ] } dentro",
+        "topics": [[[]], [[], [1, -2.25, True, None]]],
+        "meta": {"x": {"y": {"z": "fin\\"}}},
+    },
+]
+
+# Se serializa dos veces: con escapes ASCII (\uXXXX, pares sustitutos) y en UTF-8
+DOCUMENTS = [
+    json.dumps(RECORDS, ensure_ascii=True).encode(),
+    json.dumps(RECORDS, ensure_ascii=False, indent=2).encode('utf-8'),
+]
+
+
+def _stream(text):
+    return io.BytesIO(text)
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('text', DOCUMENTS)
+def test_parse_full_records(text, chunk_size):
+    records = list(github_lib.iter_json_records(_stream(text), chunk_size=chunk_size))
+    assert records == json.loads(text)
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('text', DOCUMENTS)
+def test_project_fields_of_each_record(text, chunk_size):
+    fields = ('name', 'owner.login', 'topics', 'meta.x', 'missing', 'owner.extra.a')
+    records = list(github_lib.iter_json_records(_stream(text), fields, chunk_size=chunk_size))
+
+    expected = []
+    for record in json.loads(text):
+        values = []
+        for field in fields:
+            value = record
+            for part in field.split('.'):
+                value = value.get(part) if isinstance(value, dict) else None
+            values.append(value)
+        expected.append(tuple(values))
+    assert records == expected
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+def test_items_and_meta_around_the_array(chunk_size):
+    document = {"sha": "abc", "skip": [{"tree": "no"}, "\\\""], "tree": RECORDS,
+                "truncated": False, "after": {"n": [1, 2]}}
+    text = json.dumps(document).encode()
+    meta = {'sha': None, 'truncated': None}
+    names = list(github_lib.iter_json_records(_stream(text), ('name',), items='tree',
+                                              meta=meta, chunk_size=chunk_size))
+    assert names == [(r['name'],) for r in RECORDS]
+    assert meta == {'sha': 'abc', 'truncated': False}
+
+
+@pytest.mark.parametrize('chunk_size', CHUNK_SIZES)
+@pytest.mark.parametrize('text', DOCUMENTS)
+def test_project_json(text, chunk_size):
+    document = json.dumps({"skipped": json.loads(text), "repo": RECORDS[1]}).encode()
+    values = github_lib.project_json(_stream(document), ('repo.name', 'repo.owner.login',
+                                                         'repo.size', 'nope'), chunk_size)
+    assert values == (RECORDS[1]['name'], RECORDS[1]['owner']['login'], 1500.0, None)
+
+
+def test_truncated_document_is_an_error():
+    text = json.dumps(RECORDS).encode()[:-5]
+    with pytest.raises(ValueError):
+        list(github_lib.iter_json_records(_stream(text), chunk_size=3))
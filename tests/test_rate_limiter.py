@@ -0,0 +1,53 @@
+"""
+Pruebas de RateLimiter.update con respuestas 403/429 (sin red).
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, 'bench', 'shims'), ROOT]
+
+import github_lib  # noqa: E402
+
+
+def test_permission_403_is_not_retried():
+    limiter = github_lib.RateLimiter()
+    # Sin cabeceras X-RateLimit-* (GitHub Enterprise, proxies, raw)
+    assert limiter.update(403, {}, {'message': 'Resource not accessible by integration'}) is None
+    assert limiter.update(403, {}) is None
+    # Con cabeceras y presupuesto disponible
+    headers = {'x-ratelimit-remaining': '4999', 'x-ratelimit-limit': '5000'}
+    assert limiter.update(403, headers, {'message': 'Must have admin rights'}) is None
+    assert limiter.delay() == 0
+
+
+def test_secondary_limit_message_backs_off_exponentially():
+    limiter = github_lib.RateLimiter()
+    data = {'message': 'You have exceeded a secondary rate limit. Please wait a few minutes.'}
+    headers = {'x-ratelimit-remaining': '4000', 'x-ratelimit-limit': '5000'}
+    assert limiter.update(403, headers, data) == 60
+    assert limiter.update(403, headers, data) == 120
+    # Una respuesta correcta reinicia la espera
+    limiter.update(200, headers)
+    assert limiter.update(403, headers, data) == 60
+
+
+def test_429_without_headers_backs_off():
+    assert github_lib.RateLimiter().update(429, {}) == 60
+
+
+def test_retry_after_seconds():
+    limiter = github_lib.RateLimiter()
+    assert limiter.update(403, {'retry-after': '30'}) == 30
+    assert 29 < limiter.delay() <= 30
+
+
+def test_retry_after_http_date():
+    limiter = github_lib.RateLimiter()
+    headers = {'retry-after': 'Wed, 21 Oct 2015 07:29:30 GMT',
+               'date': 'Wed, 21 Oct 2015 07:28:00 GMT'}
+    assert limiter.update(429, headers) == 90
+
+
+def test_unreadable_retry_after_backs_off():
+    assert github_lib.RateLimiter().update(403, {'retry-after': 'pronto'}) == 60
@@ -0,0 +1,155 @@
+"""
+Pruebas de TarReader (ustar, nombres largos GNU, pax, archivos cortados)
+y de download_tree contra el servidor local de bench/fake_github.py.
+"""
+import gzip
+import io
+import os
+import sys
+import tarfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, 'bench')
+sys.path[:0] = [os.path.join(BENCH_DIR, 'shims'), ROOT, BENCH_DIR]
+
+import pytest  # noqa: E402
+
+import fake_github  # noqa: E402
+import github_lib  # noqa: E402
+
+LONG_DIR = 'top/' + 'carpeta-larga-' * 5
+FILES = {
+    'top/a.txt': b'hola\n',
+    'top/vacio.txt': b'',
+    'top/sub/grande.bin': bytes(range(256)) * 3,
+    # > 100 caracteres: ustar lo parte en prefix/name, GNU usa 'L' y pax 'x'
+    LONG_DIR + '/' + 'nombre-de-archivo-largo-' * 3 + '.txt': b'largo',
+}
+
+
+def _tar(fmt, pax_headers=None):
+    buf = io.BytesIO()
+    with tarfile.open(fileobj=buf, mode='w', format=fmt, pax_headers=pax_headers) as tar:
+        for name in ('top', 'top/sub', LONG_DIR):
+            info = tarfile.TarInfo(name)
+            info.type = tarfile.DIRTYPE
+            tar.addfile(info)
+        for name, data in FILES.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return buf.getvalue()
+
+
+def _read_all(reader):
+    entries = {}
+    while True:
+        entry = reader.next()
+        if entry is None:
+            return entries
+        name, kind, size = entry
+        data = bytearray()
+        buf = bytearray(100)
+        while True:
+            n = reader.readinto(buf)
+            if not n:
+                break
+            data += buf[:n]
+        assert len(data) == size
+        entries[name.rstrip('/')] = (kind, bytes(data))
+
+
+@pytest.mark.parametrize('fmt', [tarfile.USTAR_FORMAT, tarfile.GNU_FORMAT, tarfile.PAX_FORMAT])
+def test_formats(fmt):
+    entries = _read_all(github_lib.TarReader(io.BytesIO(_tar(fmt))))
+    expected = {name: ('0', data) for name, data in FILES.items()}
+    for name in ('top', 'top/sub', LONG_DIR):
+        expected[name] = ('5', b'')
+    assert entries == expected
+
+
+def test_pax_global_header_and_gzip():
+    data = gzip.compress(_tar(tarfile.PAX_FORMAT, pax_headers={'comment': 'abc123'}))
+    reader = github_lib.TarReader(github_lib.gunzip_stream(io.BytesIO(data)))
+    entries = _read_all(reader)
+    assert reader.meta['comment'] == 'abc123'
+    assert entries['top/a.txt'] == ('0', b'hola\n')
+
+
+def test_missing_end_of_archive_blocks_is_accepted():
+    data = _tar(tarfile.USTAR_FORMAT)
+    # Sin los bloques de ceros finales (tarfile rellena hasta 10 KB)
+    end = data.rstrip(b'\x00')
+    end = data[:len(end) + (-len(end) % 512)]
+    assert len(_read_all(github_lib.TarReader(io.BytesIO(end)))) == len(FILES) + 3
+
+
+@pytest.mark.parametrize('cut', [100, 512 + 3, 1024 + 200])
+def test_truncated_archive(cut):
+    data = _tar(tarfile.GNU_FORMAT)
+    with pytest.raises(OSError):
+        _read_all(github_lib.TarReader(io.BytesIO(data[:cut])))
+
+
+def test_truncated_gzip_trailer():
+    data = gzip.compress(_tar(tarfile.PAX_FORMAT))[:-4]
+    with pytest.raises(OSError):
+        _read_all(github_lib.TarReader(github_lib.gunzip_stream(io.BytesIO(data))))
+
+
+def test_data_after_zero_block_is_corrupt():
+    data = bytearray(_tar(tarfile.USTAR_FORMAT))
+    end = len(bytes(data).rstrip(b'\x00'))
+    end += -end % 512
+    data[end + 512:end + 1024] = _tar(tarfile.USTAR_FORMAT)[:512]
+    with pytest.raises(OSError):
+        _read_all(github_lib.TarReader(io.BytesIO(bytes(data))))
+
+
+@pytest.fixture
+def server():
+    server = fake_github.FakeGitHub(user='bench').start()
+    repo = server.store.create_repo('bench', 'demo')
+    changes = {name[len('top/'):]: data for name, data in FILES.items()}
+    server.store.commit_files(repo, 'main', changes, 'archivos')
+    try:
+        yield server
+    finally:
+        server.shutdown()
+
+
+def test_download_tree(server, tmp_path):
+    manager = github_lib.GitHubRepoManager('tok', api_base_url=server.url)
+    result = manager.download_tree('bench', 'demo', local_dir=str(tmp_path))
+    manager.close()
+
+    repo = server.store.repos[('bench', 'demo')]
+    assert result['commit'] == repo['branches']['main']
+    assert result['files'] == len(FILES) + 1  # README.md
+    for name, data in FILES.items():
+        assert (tmp_path / name[len('top/'):]).read_bytes() == data
+
+
+def test_download_tree_prefix(server, tmp_path):
+    manager = github_lib.GitHubRepoManager('tok', api_base_url=server.url)
+    result = manager.download_tree('bench', 'demo', remote_prefix='sub', local_dir=str(tmp_path))
+    manager.close()
+    assert result['files'] == 1
+    assert os.listdir(tmp_path) == ['grande.bin']
+
+
+def test_download_tree_truncated(server, tmp_path, monkeypatch):
+    original = fake_github.Handler.send
+
+    def send(self, status, body=b'', *args, **kwargs):
+        if self.path.startswith('/_codeload/'):
+            # Cuerpo cortado a la mitad, con una longitud que lo declara completo
+            body = body[:len(body) // 2] + b'\x00' * (len(body) - len(body) // 2)
+        return original(self, status, body, *args, **kwargs)
+
+    monkeypatch.setattr(fake_github.Handler, 'send', send)
+    manager = github_lib.GitHubRepoManager('tok', api_base_url=server.url)
+    result = manager.download_tree('bench', 'demo', local_dir=str(tmp_path))
+    manager.close()
+    assert 'error' in result
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.tmp')]
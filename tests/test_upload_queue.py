@@ -0,0 +1,83 @@
+"""
+Pruebas de UploadQueue.flush contra el servidor local de bench/fake_github.py
+(CPython, con los sustitutos de bench/shims).
+"""
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(ROOT, 'bench')
+sys.path[:0] = [os.path.join(BENCH_DIR, 'shims'), ROOT, BENCH_DIR]
+
+import fake_github  # noqa: E402
+import github_lib  # noqa: E402
+
+
+def test_flush_discards_missing_local_file(tmp_path):
+    server = fake_github.FakeGitHub(user='bench').start()
+    try:
+        server.store.create_repo('bench', 'demo')
+        manager = github_lib.GitHubRepoManager('tok', api_base_url=server.url)
+
+        present = tmp_path / 'present.txt'
+        present.write_bytes(b'hola')
+        queue = github_lib.UploadQueue(str(tmp_path / 'queue.jsonl'))
+        queue.put('bench', 'demo', 'main', 'gone.txt', str(tmp_path / 'gone.txt'))
+        queue.put('bench', 'demo', 'main', 'present.txt', str(present))
+
+        result = queue.flush(manager, 'Enviar cola')
+
+        assert len(result['commits']) == 1
+        assert result['pending'] == 0
+        tree = manager.get_remote_tree('bench', 'demo')
+        assert 'present.txt' in tree and 'gone.txt' not in tree
+        manager.close()
+    finally:
+        server.shutdown()
+
+
+def test_flush_only_missing_files_empties_queue(tmp_path):
+    server = fake_github.FakeGitHub(user='bench').start()
+    try:
+        server.store.create_repo('bench', 'demo')
+        manager = github_lib.GitHubRepoManager('tok', api_base_url=server.url)
+        queue = github_lib.UploadQueue(str(tmp_path / 'queue.jsonl'))
+        queue.put('bench', 'demo', 'main', 'gone.txt', str(tmp_path / 'gone.txt'))
+
+        result = queue.flush(manager)
+
+        assert result == {'commits': [], 'results': {}, 'pending': 0}
+        assert not os.path.exists(tmp_path / 'queue.jsonl')
+        manager.close()
+    finally:
+        server.shutdown()
+
+
+def test_main_git_reports_queued_operations(tmp_path, monkeypatch, capsys):
+    import main_git
+
+    server = fake_github.FakeGitHub(user='bench').start()
+    try:
+        server.store.create_repo('bench', 'demo')
+        queue = github_lib.UploadQueue(str(tmp_path / 'queue.jsonl'))
+        manager = github_lib.GitHubRepoManager('tok', api_base_url=server.url, queue=queue,
+                                               online=lambda: False)
+        monkeypatch.setattr(main_git, 'repo_manager', manager)
+
+        local_dir = tmp_path / 'proyecto'
+        local_dir.mkdir()
+        (local_dir / 'a.txt').write_bytes(b'hola')
+        main_git.subir_archivos('bench', 'demo', str(local_dir))
+        assert 'Sin conexión' in capsys.readouterr().out
+
+        answers = iter(['bench', 'demo', 'docs'])
+        monkeypatch.setattr('builtins.input', lambda prompt='': next(answers))
+        main_git.crear_carpeta()
+        out = capsys.readouterr().out
+        assert 'Sin conexión' in out and 'creada con éxito' not in out
+
+        assert queue.pending() == {'bench/demo@main': {'a.txt': str(local_dir / 'a.txt'),
+                                                       'docs/.gitkeep': ''}}
+        manager.close()
+    finally:
+        server.shutdown()
@@ -0,0 +1,105 @@
+"""
+Compila las bibliotecas a bytecode .mpy con mpy-cross.
+
+En la placa, importar un .py obliga a compilarlo en cada arranque (tiempo y
+RAM); un .mpy se carga ya compilado. Copia los .mpy de dist/ al dispositivo
+en lugar de los .py, o congélalos en el firmware con el manifest.py generado.
+
+Uso:
+    python tools/build_mpy.py                       # dist/*.mpy
+    python tools/build_mpy.py --march xtensawin     # código nativo para ESP32
+    python tools/build_mpy.py --main -O 2 --manifest
+
+mpy-cross se busca en el PATH o como módulo de pip (pip install mpy-cross).
+Su versión debe coincidir con la del firmware: un .mpy de otra versión
+falla al importar con "incompatible .mpy file".
+"""
+import argparse
+import importlib.util
+import os
+import shutil
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Bibliotecas en el orden en que se importan
+MODULES = ('github_http.py', 'github_lib.py', 'github_async.py', 'network_iot.py')
+
+
+def find_mpy_cross():
+    """
+    Returns:
+        list: Orden para ejecutar mpy-cross, o None si no está instalado
+    """
+    path = shutil.which('mpy-cross')
+    if path:
+        return [path]
+    if importlib.util.find_spec('mpy_cross') is not None:
+        return [sys.executable, '-m', 'mpy_cross']
+    return None
+
+
+def build(command, source, out_dir, march=None, opt=None):
+    target = os.path.join(out_dir, os.path.splitext(os.path.basename(source))[0] + '.mpy')
+    args = command + ['-o', target]
+    if march:
+        args.append('-march=' + march)
+    if opt is not None:
+        args.append('-O%d' % opt)
+    # -s deja en las trazas el nombre del módulo y no la ruta del PC
+    args += ['-s', os.path.basename(source), source]
+    subprocess.run(args, check=True)
+    return target
+
+
+def write_manifest(out_dir, modules):
+    """manifest.py para congelar las bibliotecas en el firmware (FROZEN_MANIFEST)"""
+    path = os.path.join(out_dir, 'manifest.py')
+    with open(path, 'w') as f:
+        f.write('# Generado por tools/build_mpy.py\n')
+        f.write('include("$(PORT_DIR)/boards/manifest.py")\n')
+        for name in modules:
+            f.write('module(%r, base_path=%r)\n' % (name, ROOT))
+    return path
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Compila las bibliotecas a .mpy con mpy-cross')
+    parser.add_argument('--out', default=os.path.join(ROOT, 'dist'),
+                        help='Carpeta de salida (por defecto dist/)')
+    parser.add_argument('--march', help='Arquitectura para @native/@viper (p. ej. xtensawin, armv7m)')
+    parser.add_argument('-O', dest='opt', type=int, choices=range(4),
+                        help='Nivel de optimización (3 quita los asserts y __debug__)')
+    parser.add_argument('--main', action='store_true', help='Incluir también main_git.py')
+    parser.add_argument('--manifest', action='store_true',
+                        help='Escribir manifest.py para congelar en el firmware')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    modules = list(MODULES) + (['main_git.py'] if args.main else [])
+
+    command = find_mpy_cross()
+    if command is None:
+        print('No se encontró mpy-cross. Instálalo con "pip install mpy-cross" '
+              'o añade el compilador de MicroPython al PATH.', file=sys.stderr)
+        return 1
+
+    os.makedirs(args.out, exist_ok=True)
+    for name in modules:
+        try:
+            target = build(command, os.path.join(ROOT, name), args.out, args.march, args.opt)
+        except subprocess.CalledProcessError as e:
+            print(f'Error al compilar {name}: {e}', file=sys.stderr)
+            return 1
+        print(f'{name} -> {os.path.relpath(target, ROOT)} ({os.path.getsize(target)} bytes)')
+
+    if args.manifest:
+        print('Manifiesto:', os.path.relpath(write_manifest(args.out, modules), ROOT))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())